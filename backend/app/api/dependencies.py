@@ -0,0 +1,12 @@
+# app/api/dependencies.py
+from fastapi import HTTPException, status
+from app.services.airport import AirportService
+
+
+def require_airports() -> None:
+    """Endpointy korzystające z lotnisk - 503, dopóki start aplikacji nie załadował danych"""
+    if not AirportService.is_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Dane lotnisk nie są jeszcze załadowane - spróbuj ponownie za chwilę"
+        )
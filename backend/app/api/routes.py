@@ -1,33 +1,129 @@
 # app/api/routes.py
-from fastapi import APIRouter, HTTPException, Query, Depends, status
-from typing import List
-from app.models.schemas import FlightRequest, FlightResponse, AirportBase
+import logging
+from fastapi import APIRouter, HTTPException, Header, Query, Depends, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Hashable, List, Optional, Tuple
+from app.models.schemas import (
+    FlightRequest, FlightResponse, AirportBase, AirportDistance,
+    BatchFlightRequest, BatchFlightResponse, BatchFlightResult,
+    DepartureSearchRequest, DepartureSearchResponse
+)
+from app.api.dependencies import require_airports
 from app.services.flight import FlightRouteService
 from app.services.airport import AirportService
+from app.services.sun import SunCalculationService
+from app.services.weather import WeatherService
+from app.core.readiness import readiness
+from app.core.executor import ExecutorBusyError, compute_executor
+from app.core.metrics import registry, stage
+from app.core.response_cache import ResponseCache
+from app.core.config import settings
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 flight_service = FlightRouteService()
+# górny limit życia odpowiedzi - każdy wpis żyje też nie dłużej niż użyte dane pogodowe
+seat_response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_SIZE,
+    min(settings.RESPONSE_CACHE_TTL_SECONDS, settings.WEATHER_CACHE_TTL_SECONDS)
+)
+
+
+def _seat_cache_key(request: FlightRequest) -> Hashable:
+    """Znormalizowany klucz żądania (kody bez względu na wielkość liter, dostawca pogody)"""
+    return (
+        request.departure_airport.strip().upper(),
+        request.arrival_airport.strip().upper(),
+        request.departure_date.isoformat(),
+        request.departure_time.isoformat(),
+        request.airline.strip().upper() if request.airline else None,
+        request.sun_preference,
+        request.weather_profile,
+        WeatherService.get_provider().name
+    )
 
 
-@router.post("/calculate-seat", response_model=FlightResponse)
-async def calculate_best_seat(request: FlightRequest):
+@router.post("/calculate-seat", response_model=FlightResponse, dependencies=[Depends(require_airports)])
+async def calculate_best_seat(request: FlightRequest, if_none_match: Optional[str] = Header(None)):
     """
     Oblicza najlepsze miejsce w samolocie do obserwacji wschodu/zachodu słońca
+    
+    Odpowiedzi są zapisywane w cache (gotowy JSON) z nagłówkami ETag i Cache-Control
+    (do wygaśnięcia najstarszych użytych danych pogodowych), a żądanie z pasującym
+    If-None-Match dostaje 304 bez treści.
     """
+    async def compute() -> Tuple[bytes, Optional[float]]:
+        # odpowiedź jest aktualna tak długo, jak najstarszy użyty wpis cache pogody
+        with WeatherService.track_expiry() as weather_expiry:
+            result = await flight_service.get_seat_recommendation(request)
+        with stage("serialize"):
+            body = FlightResponse.model_validate(result).model_dump_json().encode()
+        return body, weather_expiry.remaining()
+    
     try:
-        print(f"Otrzymano żądanie: {request}")
-        result = await flight_service.get_seat_recommendation(request)
-        return result
+        logger.debug("Otrzymano żądanie: %s", request)
+        entry = await seat_response_cache.get_or_compute(_seat_cache_key(request), compute)
+        return seat_response_cache.respond(entry, if_none_match)
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"BŁĄD: {str(e)}")
-        print(f"STACKTRACE: {error_trace}")
+        logger.exception("Błąd podczas obliczania rekomendacji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd podczas obliczania: {str(e)}")
+
+
+@router.post("/calculate-seat/batch", response_model=BatchFlightResponse, dependencies=[Depends(require_airports)])
+async def calculate_best_seats_batch(batch: BatchFlightRequest):
+    """
+    Oblicza rekomendacje miejsc dla wielu lotów naraz (wyniki w kolejności żądań)
+    """
+    if not batch.requests:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lista żądań nie może być pusta")
+    if len(batch.requests) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Maksymalna liczba lotów w jednym żądaniu to {settings.BATCH_MAX_SIZE}"
+        )
     
+    try:
+        results = await flight_service.get_seat_recommendations_batch(batch.requests)
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    items = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            items.append(BatchFlightResult(index=i, error=str(result)))
+        else:
+            items.append(BatchFlightResult(index=i, result=result))
+    
+    return BatchFlightResponse(results=items)
+
 
-@router.get("/airports/search", response_model=List[AirportBase])
+@router.post("/departure-times/search", response_model=DepartureSearchResponse, dependencies=[Depends(require_airports)])
+async def search_departure_times(request: DepartureSearchRequest):
+    """
+    Zwraca godziny wylotu z zakresu dat uszeregowane według jakości widoku wschodu/zachodu słońca
+    """
+    candidates = len(FlightRouteService.departure_offsets(request))
+    if candidates > settings.DEPARTURE_SEARCH_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Maksymalna liczba sprawdzanych godzin wylotu to {settings.DEPARTURE_SEARCH_MAX_CANDIDATES} "
+                   f"(żądanie: {candidates}) - zawęź zakres dat lub zwiększ step_minutes"
+        )
+    
+    try:
+        return await flight_service.search_departure_times(request)
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        logger.exception("Błąd podczas wyszukiwania godzin wylotu: %s", e)
+        raise HTTPException(status_code=500, detail=f"Błąd podczas obliczania: {str(e)}")
+    
+
+@router.get("/airports/search", response_model=List[AirportBase], dependencies=[Depends(require_airports)])
 async def search_airports(query: str = Query(..., min_length=2), limit: int = Query(10, ge=1, le=50)):
     """
     Wyszukuje lotniska na podstawie kodu IATA, nazwy lub miasta
@@ -36,11 +132,32 @@ async def search_airports(query: str = Query(..., min_length=2), limit: int = Qu
         results = AirportService.search_airports(query, limit)
         return results
     except Exception as e:
-        print(f"Błąd podczas wyszukiwania lotnisk: {str(e)}")
+        logger.exception("Błąd podczas wyszukiwania lotnisk: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Błąd podczas wyszukiwania lotnisk")
 
 
-@router.get("/airports/{code}", response_model=AirportBase)
+@router.get("/airports/nearest", response_model=List[AirportDistance], dependencies=[Depends(require_airports)])
+async def nearest_airports(lat: float = Query(..., ge=-90, le=90),
+                           lon: float = Query(..., ge=-180, le=180),
+                           limit: int = Query(5, ge=1, le=50)):
+    """
+    Zwraca najbliższe lotniska dla podanych współrzędnych
+    """
+    return AirportService.nearest_airports(lat, lon, limit)
+
+
+@router.get("/airports/within", response_model=List[AirportDistance], dependencies=[Depends(require_airports)])
+async def airports_within(lat: float = Query(..., ge=-90, le=90),
+                          lon: float = Query(..., ge=-180, le=180),
+                          radius_km: float = Query(..., gt=0, le=20000),
+                          limit: int = Query(50, ge=1, le=500)):
+    """
+    Zwraca lotniska w promieniu radius_km od podanych współrzędnych
+    """
+    return AirportService.airports_within(lat, lon, radius_km, limit)
+
+
+@router.get("/airports/{code}", response_model=AirportBase, dependencies=[Depends(require_airports)])
 async def get_airport(code: str):
     """
     Pobiera szczegółowe informacje o lotnisku na podstawie kodu IATA
@@ -50,6 +167,35 @@ async def get_airport(code: str):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Lotnisko o kodzie {code} nie zostało znalezione")
     return airport
 
+def _cache_stats() -> dict:
+    return {
+        "route": flight_service.route_calculator.route_cache.stats(),
+        "ephemeris": SunCalculationService._ephemeris.stats(),
+        "weather": WeatherService.cache_stats(),
+        "response": seat_response_cache.stats()
+    }
+
+
+def _collect_metrics():
+    """Statystyki cache i puli obliczeń jako metryki Prometheusa (liczone przy odczycie /metrics)"""
+    caches = _cache_stats()
+    compute = compute_executor.stats()
+    return [
+        ("sunflight_cache_hits_total", "counter", "Trafienia cache",
+         [({"cache": name}, stats["hits"]) for name, stats in caches.items()]),
+        ("sunflight_cache_misses_total", "counter", "Chybienia cache",
+         [({"cache": name}, stats["misses"]) for name, stats in caches.items()]),
+        ("sunflight_cache_entries", "gauge", "Liczba wpisów w cache",
+         [({"cache": name}, stats["entries"]) for name, stats in caches.items()]),
+        ("sunflight_compute_pending", "gauge", "Zadania w toku i w kolejce puli obliczeń",
+         [({}, compute["pending"])]),
+        ("sunflight_compute_rejected_total", "counter", "Zadania odrzucone przy pełnej kolejce puli obliczeń",
+         [({}, compute["rejected"])]),
+    ]
+
+
+registry.add_collector(_collect_metrics)
+
 # testowe
 @router.get("/health")
 async def health_check():
@@ -57,5 +203,22 @@ async def health_check():
     return {
         "status": "ok",
         "timestamp": datetime.now().isoformat(),
-        "version": "0.1.0"
-    }
\ No newline at end of file
+        "version": "0.1.0",
+        "caches": _cache_stats(),
+        "weather_upstream": WeatherService.upstream_stats(),
+        "compute": compute_executor.stats()
+    }
+
+@router.get("/ready")
+async def readiness_check():
+    """Gotowość do obsługi ruchu - 503 dopóki trwa ładowanie danych i rozgrzewanie cache"""
+    snapshot = readiness.snapshot()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if snapshot["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=snapshot
+    )
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metryki w formacie tekstowym Prometheusa (liczniki, histogramy czasów etapów, cache)"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
\ No newline at end of file
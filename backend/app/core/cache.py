@@ -0,0 +1,187 @@
+# app/core/cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Ograniczony cache LRU z licznikami trafień i chybień (bezpieczny dla wątków)"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Zwraca wartość dla klucza lub None (i aktualizuje liczniki)"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Zapisuje wartość, usuwając najdawniej używane wpisy po przekroczeniu rozmiaru"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # przy przekazaniu do innego procesu (pula procesów) cache trafia tam pusty
+        state = self.__dict__.copy()
+        state.update(hits=0, misses=0, _data=OrderedDict())
+        del state["_lock"]
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statystyki cache: trafienia, chybienia, liczba wpisów i rozmiar"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._data),
+            "maxsize": self.maxsize
+        }
+
+
+class TTLCache(LRUCache):
+    """Cache LRU z wygasaniem wpisów po zadanym czasie (TTL w sekundach)"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.expirations = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Zwraca wartość dla klucza lub None, jeśli brak wpisu lub wygasł"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Zapisuje wartość z czasem życia ttl (domyślnie ttl cache)"""
+        super().set(key, (time.monotonic() + (self.ttl if ttl is None else ttl), value))
+    
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """Chwila wygaśnięcia wpisu (zegar monotoniczny) lub None - bez zmiany liczników i kolejności LRU"""
+        with self._lock:
+            item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[0]
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["expirations"] = self.expirations
+        stats["ttl_seconds"] = self.ttl
+        return stats
+
+
+class SingleFlight:
+    """
+    Łączy współbieżne wywołania dla tego samego klucza w jedno zadanie asyncio
+    
+    Pierwszy wywołujący uruchamia funkcję, kolejni (dopóki zadanie trwa) czekają
+    na ten sam wynik lub wyjątek zamiast wykonywać własne zapytanie.
+    """
+    
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Wykonuje fn() dla klucza lub dołącza do trwającego wywołania
+        
+        Args:
+            key: Klucz identyfikujący zapytanie
+            fn: Funkcja zwracająca korutynę wykonującą zapytanie
+        
+        Returns:
+            Wynik współdzielonego wywołania
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # shield - anulowanie jednego z oczekujących nie przerywa zapytania pozostałym
+        return await asyncio.shield(future)
+    
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # oznacza wyjątek jako odebrany, nawet gdy nikt już nie czeka
+            future.exception()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statystyki: liczba faktycznych wywołań, połączonych wywołań i trwających zadań"""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight)
+        }
+
+
+class ExpiryTracker:
+    """
+    Najwcześniejsze wygaśnięcie danych z cache użytych do zbudowania wyniku
+    
+    Wynik zbudowany z wpisów cache nie powinien żyć dłużej niż najstarszy z nich -
+    remaining() podaje, ile sekund pozostało do wygaśnięcia pierwszego użytego wpisu.
+    """
+    
+    def __init__(self):
+        self.expires_at: Optional[float] = None
+    
+    def note(self, expires_at: Optional[float]) -> None:
+        if expires_at is not None and (self.expires_at is None or expires_at < self.expires_at):
+            self.expires_at = expires_at
+    
+    def note_for(self, seconds: float) -> None:
+        """Dane aktualne jeszcze przez seconds sekund (np. krótko żyjące dane zastępcze)"""
+        self.note(time.monotonic() + seconds)
+    
+    def remaining(self) -> Optional[float]:
+        """Sekundy do wygaśnięcia pierwszego użytego wpisu lub None, gdy nie użyto żadnego"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
\ No newline at end of file
@@ -26,6 +26,94 @@ class Settings(BaseSettings):
     # Lotniska i dane - ścieżki do plików
     AIRPORTS_DATA_PATH: str = "data/airports.csv"
     AIRLINES_DATA_PATH: str = "data/airlines.csv"
+    # Binarny cache kolumn lotnisk (.npz), przebudowywany po zmianie CSV; pusty - bez cache
+    AIRPORTS_CACHE_PATH: str = "data/airports.npz"
+    
+    # Obliczenia słoneczne - tolerancja czasu wschodu/zachodu (w sekundach)
+    SUN_EVENT_TOLERANCE_SECONDS: float = 0.5
+    # Rozdzielczość wyszukiwania przecięć terminatora (w sekundach) - krótsze zanurzenia
+    # słońca pod horyzont (lub wyjścia ponad niego) mogą zostać pominięte
+    SUN_TERMINATOR_RESOLUTION_SECONDS: float = 60.0
+    # Liczba dni UTC przechowywanych w cache efemeryd słońca
+    EPHEMERIS_CACHE_DAYS: int = 32
+    
+    # Rekomendacje wsadowe - maksymalna liczba lotów i równoległych zapytań pogodowych
+    BATCH_MAX_SIZE: int = 1000
+    BATCH_WEATHER_CONCURRENCY: int = 10
+    
+    # Wyszukiwanie najlepszej godziny wylotu - maksymalna liczba sprawdzanych godzin
+    DEPARTURE_SEARCH_MAX_CANDIDATES: int = 5000
+    
+    # Pula obliczeń CPU (trasa, słońce) - tryb "thread", "process" lub "inline",
+    # liczba wątków/procesów (0 - liczba rdzeni) i limit zadań czekających w kolejce
+    COMPUTE_EXECUTOR_MODE: str = "thread"
+    COMPUTE_MAX_WORKERS: int = 0
+    COMPUTE_MAX_QUEUE: int = 64
+    
+    # Cache geometrii tras (liczba par lotnisk)
+    ROUTE_CACHE_SIZE: int = 1024
+    
+    # Cache odpowiedzi /calculate-seat - liczba wpisów i czas życia (s), nie dłuższy niż cache pogody
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: float = 600.0
+    
+    # Klient HTTP dla API pogodowego - pula połączeń i limity czasu (w sekundach)
+    WEATHER_HTTP_MAX_CONNECTIONS: int = 100
+    WEATHER_HTTP_MAX_KEEPALIVE: int = 20
+    WEATHER_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    WEATHER_HTTP_CONNECT_TIMEOUT: float = 3.0
+    WEATHER_HTTP_READ_TIMEOUT: float = 5.0
+    # Liczba dni prognozy pobieranych z forecast.json
+    WEATHER_FORECAST_DAYS: int = 7
+    
+    # Dostawca pogody: "weatherapi", "synthetic" (deterministyczny, bez sieci) lub "replay" (pliki JSON)
+    WEATHER_PROVIDER: str = "weatherapi"
+    # klucz tylko ze zmiennej środowiskowej lub pliku .env - bez klucza aplikacja nie wystartuje
+    # (dane syntetyczne tylko po jawnym wyborze WEATHER_PROVIDER=synthetic)
+    WEATHERAPI_KEY: str = ""
+    WEATHER_SYNTHETIC_SEED: int = 0
+    # Replay - katalog z odpowiedziami, sztuczne opóźnienie (ms) i nagrywanie brakujących z WeatherAPI
+    WEATHER_REPLAY_DIR: str = "data/weather_fixtures"
+    WEATHER_REPLAY_LATENCY_MS: float = 0.0
+    WEATHER_REPLAY_RECORD: bool = False
+    
+    # Odporność wywołań pogody - limit czasu próby (s), liczba prób, opóźnienia ponowień (s),
+    # budżet ponowień (ułamek ruchu) i wyłącznik obwodu (liczba błędów, czas do próby w s)
+    WEATHER_CALL_TIMEOUT: float = 4.0
+    WEATHER_RETRY_MAX_ATTEMPTS: int = 2
+    WEATHER_RETRY_BASE_DELAY: float = 0.1
+    WEATHER_RETRY_MAX_DELAY: float = 1.0
+    WEATHER_RETRY_BUDGET_RATIO: float = 0.1
+    WEATHER_RETRY_BUDGET_MAX_TOKENS: float = 10.0
+    WEATHER_BREAKER_FAILURE_THRESHOLD: int = 5
+    WEATHER_BREAKER_RECOVERY_SECONDS: float = 30.0
+    
+    # Cache pogody - rozmiar komórki siatki (stopnie), czas życia wpisu (s) i limit wpisów
+    WEATHER_CACHE_CELL_DEG: float = 0.25
+    WEATHER_CACHE_TTL_SECONDS: float = 1800.0
+    WEATHER_CACHE_MAX_ENTRIES: int = 10000
+    # Czas życia wyników zbudowanych z danych zastępczych (błąd lub brak danych dostawcy, otwarty obwód) -
+    # po odzyskaniu dostępu do dostawcy odpowiedzi szybko wracają do prawdziwej prognozy
+    WEATHER_FALLBACK_TTL_SECONDS: float = 30.0
+    
+    # Profil pogody wzdłuż trasy - liczba punktów próbkowania i równoległych zapytań
+    WEATHER_PROFILE_POINTS: int = 6
+    WEATHER_PROFILE_CONCURRENCY: int = 4
+    
+    # Rozgrzewanie przy starcie - indeks wyszukiwania lotnisk, cache tras dla par "WAW-LHR"
+    # (pusta lista: wszystkie pary, gdy lotnisk jest nie więcej niż limit) i efemerydy na kolejne dni
+    WARMUP_ENABLED: bool = True
+    WARMUP_SEARCH_INDEX: bool = True
+    WARMUP_ROUTE_PAIRS: List[str] = []
+    WARMUP_ALL_PAIRS_MAX_AIRPORTS: int = 50
+    WARMUP_EPHEMERIS_DAYS: int = 7
+    
+    # Logowanie - poziom, format ("json" lub "text"), ułamek żądań z wpisami DEBUG
+    # i rozmiar kolejki wpisów (przy pełnej kolejce wpisy są odrzucane)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+    LOG_QUEUE_SIZE: int = 10000
     
     DEBUG: bool = True
 
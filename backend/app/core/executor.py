@@ -0,0 +1,119 @@
+# app/core/executor.py
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+
+
+class ExecutorBusyError(Exception):
+    """Kolejka obliczeń jest pełna - żądanie należy odrzucić (503) zamiast czekać bez końca"""
+
+
+class ComputeExecutor:
+    """
+    Pula do obliczeń CPU (trasa, pozycje słońca) poza pętlą zdarzeń
+    
+    Tryby:
+    - "thread" - pula wątków (współdzielone cache, NumPy zwalnia GIL w obliczeniach wektorowych);
+      zadanie dostaje kopię kontekstu (identyfikator żądania w logach, czasy etapów)
+    - "process" - pula procesów (pełna równoległość; funkcje i argumenty muszą dać się zserializować);
+      każdy proces roboczy startuje z funkcją z set_initializer (własne dane i cache)
+    - "inline" - obliczenia bezpośrednio w pętli zdarzeń (jak wcześniej, np. do testów)
+    
+    Liczba zadań czekających i wykonywanych jest ograniczona (max_workers + max_queue),
+    kolejne zgłoszenia kończą się ExecutorBusyError.
+    """
+    
+    MODES = ("thread", "process", "inline")
+    
+    def __init__(self, mode: str = "thread", max_workers: int = 0, max_queue: int = 64):
+        if mode not in self.MODES:
+            raise ValueError(f"Nieznany tryb puli obliczeń: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.completed = 0
+        self.rejected = 0
+        self._pending = 0
+        self._pool: Optional[Executor] = None
+        self._initializer: Optional[Callable[..., Any]] = None
+        self._initargs: tuple = ()
+    
+    def set_initializer(self, initializer: Optional[Callable[..., Any]], *initargs: Any) -> None:
+        """Funkcja wywoływana w każdym procesie roboczym przy jego starcie (tylko tryb "process", przed pierwszym run)"""
+        self._initializer = initializer
+        self._initargs = initargs
+    
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=self._initializer,
+                    initargs=self._initargs
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="compute")
+        return self._pool
+    
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Wykonuje fn(*args) w puli i czeka na wynik bez blokowania pętli zdarzeń
+        
+        Args:
+            fn: Funkcja obliczeniowa (w trybie "process" - funkcja z poziomu modułu)
+            args: Argumenty funkcji
+        
+        Returns:
+            Wynik funkcji
+        
+        Raises:
+            ExecutorBusyError: Gdy kolejka obliczeń jest pełna
+        """
+        if self.mode == "inline":
+            self.completed += 1
+            return fn(*args)
+        
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusyError("Serwer jest przeciążony - spróbuj ponownie za chwilę")
+        
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                # run_in_executor nie przenosi zmiennych kontekstowych do wątku
+                call = functools.partial(contextvars.copy_context().run, fn, *args)
+            else:
+                call = functools.partial(fn, *args)
+            result = await loop.run_in_executor(self._get_pool(), call)
+            self.completed += 1
+            return result
+        finally:
+            self._pending -= 1
+    
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statystyki puli: tryb, rozmiar, zadania w toku, wykonane i odrzucone"""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+
+compute_executor = ComputeExecutor(
+    settings.COMPUTE_EXECUTOR_MODE,
+    settings.COMPUTE_MAX_WORKERS,
+    settings.COMPUTE_MAX_QUEUE
+)
\ No newline at end of file
@@ -0,0 +1,180 @@
+# app/core/log.py
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import registry
+
+# identyfikator bieżącego żądania (nagłówek X-Request-ID), "-" poza żądaniem
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "sunflight_log_records_dropped_total", "Wpisy logu odrzucone przy pełnej kolejce"
+)
+
+# atrybuty LogRecord - pozostałe (przekazane przez extra=) trafiają do pól wpisu JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id"}
+# wartości parametrów zapytań i pól wyglądających na sekrety (key=..., "token": "...")
+_SECRET_PATTERN = re.compile(
+    r"""(?i)(["']?\b(?:key|api_key|apikey|token|access_token|password|secret|authorization)\b["']?\s*[=:]\s*["']?)([^&\s"',;]+)"""
+)
+
+
+def redact(text: str) -> str:
+    """Ukrywa sekrety w tekście: klucz API z ustawień i wartości parametrów w rodzaju key=..."""
+    if settings.WEATHERAPI_KEY and settings.WEATHERAPI_KEY in text:
+        text = text.replace(settings.WEATHERAPI_KEY, "***")
+    return _SECRET_PATTERN.sub(r"\1***", text)
+
+
+class RequestContextFilter(logging.Filter):
+    """Dodaje do wpisu identyfikator żądania (z kontekstu wywołującego - przed kolejką)"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Próbkowanie wpisów DEBUG - przepuszcza ułamek rate żądań
+    
+    Decyzja zależy od identyfikatora żądania, więc wybrane żądanie ma komplet wpisów
+    DEBUG, a pozostałe nie mają żadnego. Wpisy INFO i wyższe przechodzą zawsze.
+    """
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(max(0.0, min(1.0, rate)) * 0xFFFFFFFF)
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        return zlib.crc32(getattr(record, "request_id", "-").encode()) <= self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """Wpis logu jako jedna linia JSON (czas, poziom, logger, żądanie, treść, pola extra)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """
+    QueueHandler, który w wątku wywołującym tylko składa treść (z ukryciem sekretów)
+    i wrzuca wpis do ograniczonej kolejki - formatowanie i zapis robi wątek QueueListener.
+    Przy pełnej kolejce wpis jest odrzucany (i liczony), a nie blokuje pętli zdarzeń.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = redact(logging.Formatter().formatException(record.exc_info))
+        record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Konfiguruje logowanie aplikacji: poziom, identyfikatory żądań, próbkowanie DEBUG,
+    ukrywanie sekretów i zapis przez kolejkę w osobnym wątku (wywoływane przy starcie)
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+    
+    queue_handler = _AsyncQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # httpx loguje każde zapytanie (z adresem) na poziomie INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Zapisuje wpisy pozostałe w kolejce i zatrzymuje wątek zapisu"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI: identyfikator żądania z nagłówka X-Request-ID (lub nowy),
+    dostępny w logach przez request_id_var i zwracany w odpowiedzi
+    """
+    
+    HEADER = b"x-request-id"
+    
+    def __init__(self, app: Callable):
+        self.app = app
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = next(
+            (value.decode("latin-1")[:128] for name, value in scope["headers"] if name == self.HEADER),
+            None
+        ) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        
+        async def send_with_request_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers: List = list(message.get("headers", []))
+                headers.append((self.HEADER, request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,226 @@
+# app/core/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# próbka metryki: (etykiety, wartość), rodzina: (nazwa, typ, opis, próbki)
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Licznik (tylko rośnie) z opcjonalnymi etykietami"""
+    
+    type_name = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """
+    Histogram (kubełki skumulowane, suma i liczba obserwacji) z opcjonalnymi etykietami
+    
+    Obserwacja to wyszukanie binarne kubełka i inkrementacja pod blokadą - koszt
+    pomijalny w porównaniu z mierzonymi etapami.
+    """
+    
+    type_name = "histogram"
+    # sekundy - od pojedynczych milisekund (etapy obliczeń) do sekund (wywołania upstreamu)
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # etykiety -> [liczniki kubełków (ostatni: +Inf), suma]
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+    
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Rejestr metryk eksportowanych w formacie tekstowym Prometheusa (/metrics)
+    
+    Oprócz liczników i histogramów przyjmuje kolektory - funkcje zwracające rodziny
+    metryk w chwili odczytu (np. statystyki istniejących cache), dzięki czemu
+    takie wartości nie wymagają żadnej pracy na ścieżce żądania.
+    """
+    
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs: Any) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, **kwargs)
+        self._metrics.append(metric)
+        return metric
+    
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """Wszystkie metryki w formacie tekstowym Prometheusa (wersja 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        
+        for collector in self._collectors:
+            for name, type_name, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "sunflight_http_requests_total", "Liczba żądań HTTP", ("method", "route", "status")
+)
+HTTP_DURATION = registry.histogram(
+    "sunflight_http_request_duration_seconds", "Czas obsługi żądań HTTP", ("method", "route")
+)
+STAGE_DURATION = registry.histogram(
+    "sunflight_stage_duration_seconds", "Czas etapów obliczania rekomendacji", ("stage",)
+)
+WEATHER_UPSTREAM_CALLS = registry.counter(
+    "sunflight_weather_upstream_calls_total", "Wywołania dostawcy pogody", ("kind", "outcome")
+)
+
+# czasy etapów bieżącego żądania (nazwa -> sekundy), ustawiane przez TimingMiddleware
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Mierzy czas etapu - do histogramu etapów i do nagłówka Server-Timing bieżącego żądania
+    
+    Etapy o tej samej nazwie w jednym żądaniu są sumowane (np. kilka zapytań pogodowych).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=name)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed
+
+
+def server_timing(stages: Dict[str, float], total: float) -> str:
+    """Wartość nagłówka Server-Timing (czasy w milisekundach)"""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """
+    Middleware ASGI: czas obsługi żądania, liczniki i histogramy HTTP oraz nagłówek
+    Server-Timing z etapami zmierzonymi przez stage() w trakcie żądania
+    """
+    
+    def __init__(self, app: Callable):
+        self.app = app
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stages: Dict[str, float] = {}
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                header = server_timing(stages, time.perf_counter() - start).encode("latin-1")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            # szablon ścieżki zamiast ścieżki - ograniczona liczba wartości etykiety
+            route_label = getattr(route, "path", "unmatched")
+            elapsed = time.perf_counter() - start
+            HTTP_DURATION.observe(elapsed, method=scope["method"], route=route_label)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route_label, status=str(status_code))
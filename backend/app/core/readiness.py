@@ -0,0 +1,74 @@
+# app/core/readiness.py
+import threading
+import time
+from typing import Any, Dict
+
+
+class Readiness:
+    """
+    Gotowość procesu do obsługi ruchu - etapy startu (ładowanie danych, rozgrzewanie cache)
+    
+    Proces jest gotowy, gdy wszystkie wymagane etapy zakończyły się sukcesem,
+    a etapy opcjonalne (rozgrzewanie w tle) zakończyły się - sukcesem lub błędem.
+    """
+    
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name: str, required: bool = True) -> None:
+        """Dodaje etap startu (przed jego uruchomieniem)"""
+        with self._lock:
+            self._stages[name] = {"status": self.PENDING, "required": required, "seconds": None, "error": None}
+    
+    def start(self, name: str) -> None:
+        with self._lock:
+            self._stages[name]["status"] = self.RUNNING
+            self._stages[name]["started_at"] = time.perf_counter()
+    
+    def complete(self, name: str) -> None:
+        self._finish(name, self.DONE, None)
+    
+    def fail(self, name: str, error: Exception) -> None:
+        self._finish(name, self.FAILED, str(error))
+    
+    def _finish(self, name: str, status: str, error: Any) -> None:
+        with self._lock:
+            stage = self._stages[name]
+            stage["status"] = status
+            stage["error"] = error
+            stage["seconds"] = round(time.perf_counter() - stage.pop("started_at", time.perf_counter()), 3)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+    
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            if not self._stages:
+                return False
+            for stage in self._stages.values():
+                if stage["required"] and stage["status"] != self.DONE:
+                    return False
+                if stage["status"] in (self.PENDING, self.RUNNING):
+                    return False
+            return True
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Stan gotowości i poszczególnych etapów (do endpointu /ready)"""
+        ready = self.ready
+        with self._lock:
+            stages = {
+                name: {key: value for key, value in stage.items() if key != "started_at"}
+                for name, stage in self._stages.items()
+            }
+        return {"ready": ready, "stages": stages}
+
+
+readiness = Readiness()
@@ -0,0 +1,201 @@
+# app/core/resilience.py
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+
+
+class CircuitOpenError(Exception):
+    """Wywołanie odrzucone, bo obwód jest otwarty (upstream uznany za niedostępny)"""
+
+
+class CircuitBreaker:
+    """
+    Wyłącznik obwodu dla wywołań zewnętrznej usługi
+    
+    Po failure_threshold kolejnych błędach obwód się otwiera i wywołania są od razu
+    odrzucane (ścieżka zapasowa). Po recovery_timeout sekundach przepuszczane jest jedno
+    wywołanie próbne (half-open) - sukces zamyka obwód, błąd otwiera go ponownie.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened_count = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Czy wywołanie może zostać wykonane (w stanie half-open tylko jedna próba naraz)"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            
+            self.rejected += 1
+            return False
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+    
+    def release_probe(self) -> None:
+        """Zwalnia próbę half-open bez rozstrzygania (np. anulowanie lub błąd spoza upstreamu)"""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened_count += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Stan obwodu i liczniki wywołań"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened_count": self.opened_count
+        }
+
+
+class RetryBudget:
+    """
+    Budżet ponowień (token bucket)
+    
+    Każde pierwsze wywołanie dokłada ratio tokenu, każde ponowienie zużywa jeden token.
+    Dzięki temu ponowienia stanowią najwyżej ~ratio ruchu i nie zwielokrotniają
+    obciążenia upstreamu podczas awarii.
+    """
+    
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+    
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+    
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": round(self.tokens, 3),
+            "retries": self.retries,
+            "exhausted": self.exhausted
+        }
+
+
+class ResilientCaller:
+    """
+    Wywołania upstreamu z limitem czasu, ponowieniami z jitterem i wyłącznikiem obwodu
+    
+    Args:
+        timeout: Limit czasu pojedynczej próby (s)
+        max_attempts: Maksymalna liczba prób (łącznie z pierwszą)
+        base_delay: Bazowe opóźnienie ponowienia (s), rośnie wykładniczo
+        max_delay: Górne ograniczenie opóźnienia ponowienia (s)
+        breaker: Wyłącznik obwodu
+        budget: Budżet ponowień
+        retry_on: Typy wyjątków uznawane za błąd upstreamu
+    """
+    
+    def __init__(self,
+                 timeout: float,
+                 max_attempts: int,
+                 base_delay: float,
+                 max_delay: float,
+                 breaker: CircuitBreaker,
+                 budget: RetryBudget,
+                 retry_on: Tuple[Type[BaseException], ...] = (Exception,)):
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.budget = budget
+        self.retry_on = retry_on
+        self.timeouts = 0
+    
+    def _backoff(self, attempt: int) -> float:
+        # "full jitter" - losowe opóźnienie z [0, min(max_delay, base * 2^attempt)]
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Wykonuje fn() z ochroną - rzuca CircuitOpenError, gdy obwód jest otwarty
+        
+        Returns:
+            Wynik fn()
+        """
+        self.budget.deposit()
+        
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("Obwód otwarty - pomijam wywołanie upstreamu")
+            
+            try:
+                result = await asyncio.wait_for(fn(), self.timeout)
+            except self.retry_on as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt >= self.max_attempts or not self.budget.try_withdraw():
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            
+            self.breaker.record_success()
+            return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Metryki: stan obwodu, budżet ponowień i liczba przekroczeń czasu"""
+        return {
+            "circuit": self.breaker.stats(),
+            "retry_budget": self.budget.stats(),
+            "timeouts": self.timeouts
+        }
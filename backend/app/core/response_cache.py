@@ -0,0 +1,88 @@
+# app/core/response_cache.py
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+from starlette.responses import Response
+from app.core.cache import SingleFlight, TTLCache
+
+
+class CachedResponse(NamedTuple):
+    """Zserializowana odpowiedź JSON z jej ETag i chwilą wygaśnięcia (zegar monotoniczny)"""
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Cache całych odpowiedzi JSON (gotowe bajty) z walidatorami HTTP
+    
+    Trafienie pomija zarówno obliczenia, jak i serializację pydantic. Współbieżne
+    chybienia dla tego samego klucza liczone są raz (SingleFlight), a żądania
+    z pasującym nagłówkiem If-None-Match dostają 304 bez treści. Wpis żyje nie dłużej
+    niż ttl i nie dłużej niż dane, z których powstał (czas zwrócony przez compute).
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self.not_modified = 0
+        self._cache = TTLCache(maxsize, ttl)
+        self._inflight = SingleFlight()
+    
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    
+    async def get_or_compute(self,
+                             key: Hashable,
+                             compute: Callable[[], Awaitable[Tuple[bytes, Optional[float]]]]) -> CachedResponse:
+        """
+        Zwraca odpowiedź z cache lub oblicza ją i zapisuje (błędy nie są zapisywane)
+        
+        Args:
+            key: Znormalizowany klucz żądania
+            compute: Funkcja zwracająca korutynę z zserializowaną odpowiedzią JSON i czasem
+                (w sekundach), przez który dane użyte do jej zbudowania są aktualne (None - bez limitu)
+        
+        Returns:
+            Odpowiedź z cache lub świeżo obliczona
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry
+        
+        async def compute_and_store() -> CachedResponse:
+            body, fresh_for = await compute()
+            ttl = self.ttl if fresh_for is None else min(self.ttl, fresh_for)
+            entry = CachedResponse(body, self.etag_for(body), time.monotonic() + ttl)
+            if ttl > 0:
+                self._cache.set(key, entry, ttl)
+            return entry
+        
+        return await self._inflight.do(key, compute_and_store)
+    
+    @staticmethod
+    def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+        """Porównanie słabe ETag z listą z nagłówka If-None-Match (RFC 9110)"""
+        if not if_none_match:
+            return False
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+    
+    def respond(self, entry: CachedResponse, if_none_match: Optional[str] = None) -> Response:
+        """Odpowiedź HTTP dla wpisu - 304, gdy klient ma aktualną wersję, w przeciwnym razie 200 z treścią"""
+        max_age = max(0, int(entry.expires_at - time.monotonic()))
+        headers = {"ETag": entry.etag, "Cache-Control": f"private, max-age={max_age}"}
+        if self._etag_matches(entry.etag, if_none_match):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+    
+    def clear(self) -> None:
+        self._cache.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["not_modified"] = self.not_modified
+        stats["single_flight"] = self._inflight.stats()
+        return stats
\ No newline at end of file
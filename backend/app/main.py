@@ -1,14 +1,52 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.routes import router
+from app.core.executor import compute_executor
+from app.core.metrics import TimingMiddleware
+from app.core.log import RequestIdMiddleware, setup_logging, shutdown_logging
+from app.api.routes import router, flight_service
+from app.services.flight import init_compute_worker
+from app.services.weather import WeatherService
+from app.services import warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # logowanie przez kolejkę (zapis w osobnym wątku, nie w pętli zdarzeń)
+    setup_logging()
+    
+    # współdzielony klient HTTP dla API pogodowego
+    await WeatherService.startup()
+    
+    # procesy robocze puli obliczeń (tryb "process") ładują lotniska i rozgrzewają własne cache
+    compute_executor.set_initializer(init_compute_worker)
+    
+    # dane lotnisk ładowane przy starcie (nie przy imporcie), cache rozgrzewane w tle -
+    # /ready zgłasza gotowość dopiero po zakończeniu wszystkich etapów
+    warmup.register_stages()
+    await warmup.run_stage(warmup.STAGE_AIRPORTS, warmup.load_airports)
+    background = asyncio.create_task(warmup.warm_caches(flight_service)) if settings.WARMUP_ENABLED else None
+    
+    yield
+    
+    if background is not None:
+        background.cancel()
+        with suppress(asyncio.CancelledError):
+            await background
+    compute_executor.shutdown()
+    await WeatherService.shutdown()
+    shutdown_logging()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API do wyszukiwania najlepszych miejsc w samolocie do obserwacji wschodu/zachodu słońca",
     version="0.1.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Konfiguracja CORS
@@ -20,6 +58,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Czasy etapów (Server-Timing) i metryki HTTP - jako zewnętrzny middleware mierzy całe żądanie
+app.add_middleware(TimingMiddleware)
+# Identyfikator żądania (X-Request-ID) w logach - zewnętrzny, więc obejmuje też pomiar czasu
+app.add_middleware(RequestIdMiddleware)
+
 # Dodanie routerów API
 app.include_router(router, prefix=settings.API_V1_STR)
 
@@ -11,6 +11,10 @@ class AirportBase(BaseModel):
     latitude: float = Field(..., description="Szerokość geograficzna")
     longitude: float = Field(..., description="Długość geograficzna")
     timezone: str = Field(..., description="Strefa czasowa")
+    icao_code: Optional[str] = Field(None, description="Kod ICAO lotniska, np. EPWA (opcjonalnie)")
+
+class AirportDistance(AirportBase):
+    distance_km: float = Field(..., description="Odległość od punktu zapytania w km")
 
 class AirlineBase(BaseModel):
     code: str = Field(..., description="Kod IATA linii lotniczej")
@@ -24,6 +28,7 @@ class FlightRequest(BaseModel):
     departure_time: time = Field(..., description="Czas wylotu (lokalny)")
     airline: Optional[str] = Field(None, description="Kod IATA linii lotniczej (opcjonalnie)")
     sun_preference: str = Field(..., description="Preferencja: 'sunrise' (wschód) lub 'sunset' (zachód)")
+    weather_profile: bool = Field(False, description="Uwzględnij pogodę wzdłuż całej trasy przy wyborze punktu obserwacji (opcjonalnie)")
     
     @validator('sun_preference')
     def validate_sun_preference(cls, v):
@@ -55,6 +60,7 @@ class SunEventTime(BaseModel):
     event_time: datetime = Field(..., description="Dokładny czas wydarzenia")
     is_visible_during_flight: bool = Field(..., description="Czy wydarzenie będzie widoczne podczas lotu")
     event_location: Optional[Dict[str, float]] = Field(None, description="Współrzędne geograficzne wydarzenia")
+    nearest_airport: Optional[AirportBase] = Field(None, description="Lotnisko najbliższe miejscu wydarzenia (opcjonalnie)")
 
 class SunPositionData(BaseModel):
     datetime: datetime
@@ -89,4 +95,55 @@ class FlightResponse(BaseModel):
     aircraft_model: Optional[str] = None
     recommendation: SeatRecommendation
     route_preview: List[FlightRoutePoint] = Field([], description="Uproszczona trasa lotu")
-    sun_events_visible: bool = Field(True, description="Czy wschód/zachód jest widoczny podczas lotu")
\ No newline at end of file
+    sun_events_visible: bool = Field(True, description="Czy wschód/zachód jest widoczny podczas lotu")
+
+class BatchFlightRequest(BaseModel):
+    requests: List[FlightRequest] = Field(..., description="Lista żądań rekomendacji dla wielu lotów")
+
+class BatchFlightResult(BaseModel):
+    index: int = Field(..., description="Pozycja żądania na liście wejściowej")
+    result: Optional[FlightResponse] = Field(None, description="Rekomendacja (gdy obliczenia się powiodły)")
+    error: Optional[str] = Field(None, description="Opis błędu dla tego lotu")
+
+class BatchFlightResponse(BaseModel):
+    results: List[BatchFlightResult] = Field([], description="Wyniki w kolejności żądań")
+
+class DepartureSearchRequest(BaseModel):
+    departure_airport: str = Field(..., description="Kod IATA lotniska wylotu")
+    arrival_airport: str = Field(..., description="Kod IATA lotniska przylotu")
+    start_date: date = Field(..., description="Pierwszy dzień wyszukiwania")
+    end_date: date = Field(..., description="Ostatni dzień wyszukiwania (włącznie)")
+    step_minutes: int = Field(30, ge=5, le=1440, description="Odstęp między sprawdzanymi godzinami wylotu w minutach")
+    sun_preference: str = Field(..., description="Preferencja: 'sunrise' (wschód) lub 'sunset' (zachód)")
+    limit: int = Field(10, ge=1, le=100, description="Liczba zwracanych najlepszych godzin wylotu")
+    
+    @validator('sun_preference')
+    def validate_sun_preference(cls, v):
+        if v not in ["sunrise", "sunset"]:
+            raise ValueError('sun_preference musi być "sunrise" lub "sunset"')
+        return v
+    
+    @validator('end_date')
+    def validate_end_date(cls, v, values):
+        if "start_date" in values and v < values["start_date"]:
+            raise ValueError('end_date nie może być wcześniejsza niż start_date')
+        return v
+
+class DepartureCandidate(BaseModel):
+    departure_time: datetime = Field(..., description="Czas wylotu")
+    arrival_time: datetime = Field(..., description="Czas przylotu")
+    quality_score: float = Field(..., description="Ocena jakości widoku (0-100) w najlepszym punkcie lotu")
+    best_time: datetime = Field(..., description="Najlepszy czas na obserwację")
+    sun_altitude: float = Field(..., description="Wysokość słońca w najlepszym punkcie w stopniach")
+    sun_event_visible: bool = Field(..., description="Czy preferowane wydarzenie nastąpi podczas lotu")
+    event_time: Optional[datetime] = Field(None, description="Przybliżony czas wydarzenia (gdy nastąpi podczas lotu)")
+    seat_side: str = Field(..., description="Strona samolotu (lewa/prawa)")
+    seat_code: str = Field(..., description="Kod miejsca (np. A23)")
+
+class DepartureSearchResponse(BaseModel):
+    departure_airport: AirportBase
+    arrival_airport: AirportBase
+    flight_duration: float = Field(..., description="Czas lotu w godzinach")
+    sun_preference: str = Field(..., description="Preferencja: 'sunrise' lub 'sunset'")
+    candidates_evaluated: int = Field(..., description="Liczba sprawdzonych godzin wylotu")
+    results: List[DepartureCandidate] = Field([], description="Godziny wylotu od najlepszej")
\ No newline at end of file
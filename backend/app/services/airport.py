@@ -1,56 +1,282 @@
 # app/services/airport.py
+import logging
+import os
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Optional
 from app.core.config import settings
-from app.models.schemas import AirportBase
+from app.models.schemas import AirportBase, AirportDistance
+from app.services.airport_index import AirportSearchIndex
+from app.services.airport_spatial import AirportSpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+class AirportDataNotLoadedError(RuntimeError):
+    """Dane lotnisk nie zostały jeszcze załadowane (ładuje je start aplikacji, nie żądanie)"""
+
+
+class AirportTable:
+    """
+    Dane lotnisk w postaci kolumnowej (tablice NumPy)
+    
+    Obiekty AirportBase są tworzone dopiero dla zwracanych lotnisk (airport()),
+    a kolumny są zapisywane w binarnym cache .npz przebudowywanym po zmianie pliku CSV.
+    """
+    
+    STRING_COLUMNS = ("code", "icao_code", "name", "city", "country", "timezone")
+    FLOAT_COLUMNS = ("latitude", "longitude")
+    # wersja formatu cache - zmiana wymusza przebudowę pliku .npz
+    CACHE_VERSION = 2
+    
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.code = columns["code"]
+        self.icao_code = columns["icao_code"]
+        self.name = columns["name"]
+        self.city = columns["city"]
+        self.country = columns["country"]
+        self.timezone = columns["timezone"]
+        self.latitude = columns["latitude"]
+        self.longitude = columns["longitude"]
+        
+        self._rows_by_code: Dict[str, int] = {code: row for row, code in enumerate(self.code.tolist())}
+        self._rows_by_icao: Dict[str, int] = {code: row for row, code in enumerate(self.icao_code.tolist()) if code}
+    
+    def __len__(self) -> int:
+        return len(self.code)
+    
+    @classmethod
+    def empty(cls) -> "AirportTable":
+        columns = {name: np.array([], dtype=str) for name in cls.STRING_COLUMNS}
+        columns.update({name: np.array([], dtype=np.float64) for name in cls.FLOAT_COLUMNS})
+        return cls(columns)
+    
+    def row_for_code(self, code: str) -> Optional[int]:
+        """Numer wiersza lotniska o kodzie IATA lub ICAO"""
+        code = code.upper()
+        row = self._rows_by_code.get(code)
+        if row is None:
+            row = self._rows_by_icao.get(code)
+        return row
+    
+    def airport(self, row: int) -> AirportBase:
+        """Tworzy AirportBase dla wiersza (bez ponownej walidacji - wiersze sprawdzone w from_csv)"""
+        return AirportBase.model_construct(
+            code=str(self.code[row]),
+            name=str(self.name[row]),
+            city=str(self.city[row]),
+            country=str(self.country[row]),
+            latitude=float(self.latitude[row]),
+            longitude=float(self.longitude[row]),
+            timezone=str(self.timezone[row]),
+            icao_code=str(self.icao_code[row]) or None
+        )
+    
+    @classmethod
+    def from_csv(cls, path: str) -> "AirportTable":
+        """
+        Wczytuje lotniska z CSV całymi kolumnami (bez iteracji po wierszach)
+        
+        Wiersze bez kodu IATA lub ze współrzędnymi spoza zakresu (albo nieliczbowymi)
+        są pomijane, a dla powtórzonego kodu zostaje pierwszy poprawny wiersz - dzięki temu
+        airport() może tworzyć AirportBase bez walidacji.
+        """
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        
+        code = df["iata_code"].str.strip().str.upper()
+        latitude = pd.to_numeric(df["latitude"], errors="coerce")
+        longitude = pd.to_numeric(df["longitude"], errors="coerce")
+        valid = (code != "") & latitude.between(-90.0, 90.0) & longitude.between(-180.0, 180.0)
+        # powtórzenia liczone tylko wśród poprawnych wierszy - niepoprawny pierwszy wiersz
+        # nie usuwa poprawnego wiersza z tym samym kodem
+        valid = (valid & ~code.where(valid).duplicated()).to_numpy()
+        if not valid.all():
+            logger.warning("Pominięto %d niepoprawnych wierszy w %s", int((~valid).sum()), path)
+        
+        icao_code = df["icao_code"].str.strip().str.upper() if "icao_code" in df.columns else pd.Series([""] * len(df))
+        columns = {
+            "code": code.to_numpy(dtype=str)[valid],
+            "icao_code": icao_code.to_numpy(dtype=str)[valid],
+            "name": df["name"].to_numpy(dtype=str)[valid],
+            "city": df["city"].to_numpy(dtype=str)[valid],
+            "country": df["country"].to_numpy(dtype=str)[valid],
+            "timezone": df["timezone"].to_numpy(dtype=str)[valid],
+            "latitude": latitude.to_numpy(dtype=np.float64)[valid],
+            "longitude": longitude.to_numpy(dtype=np.float64)[valid]
+        }
+        return cls(columns)
+    
+    @classmethod
+    def _signature(cls, csv_path: str) -> np.ndarray:
+        stat = os.stat(csv_path)
+        return np.array([cls.CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    
+    @classmethod
+    def load(cls, csv_path: str, cache_path: Optional[str] = None) -> "AirportTable":
+        """
+        Ładuje lotniska z cache .npz, a gdy go brak lub CSV się zmienił - z CSV (i zapisuje cache)
+        
+        Args:
+            csv_path: Ścieżka do pliku CSV z lotniskami
+            cache_path: Ścieżka do pliku cache (None wyłącza cache)
+        
+        Returns:
+            Tabela lotnisk
+        """
+        if not cache_path:
+            return cls.from_csv(csv_path)
+        
+        signature = cls._signature(csv_path)
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                if np.array_equal(data["signature"], signature):
+                    return cls({name: data[name] for name in cls.STRING_COLUMNS + cls.FLOAT_COLUMNS})
+        except (OSError, KeyError, ValueError):
+            pass
+        
+        table = cls.from_csv(csv_path)
+        table.save(cache_path, signature)
+        return table
+    
+    def save(self, cache_path: str, signature: np.ndarray) -> None:
+        """Zapisuje kolumny do cache (atomowo - przez plik tymczasowy)"""
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez(f, signature=signature, **self.columns)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning("Nie udało się zapisać cache lotnisk %s: %s", cache_path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
 class AirportService:
-    _airports: Dict[str, AirportBase] = {}
+    _table: Optional[AirportTable] = None
+    _index: Optional[AirportSearchIndex] = None
+    _index_lock = threading.Lock()
+    _spatial: Optional[AirportSpatialIndex] = None
     
     @classmethod
     def load_airports(cls) -> None:
-        """Ładuje dane lotnisk z pliku CSV"""
+        """Ładuje dane lotnisk (z binarnego cache lub pliku CSV)"""
         try:
-            df = pd.read_csv(settings.AIRPORTS_DATA_PATH)
-            for _, row in df.iterrows():
-                airport = AirportBase(
-                    code=row['iata_code'],
-                    name=row['name'],
-                    city=row['city'],
-                    country=row['country'],
-                    latitude=row['latitude'],
-                    longitude=row['longitude'],
-                    timezone=row['timezone']
-                )
-                cls._airports[airport.code] = airport
+            cls._table = AirportTable.load(settings.AIRPORTS_DATA_PATH, settings.AIRPORTS_CACHE_PATH)
         except Exception as e:
-            print(f"Błąd podczas ładowania lotnisk: {e}")
+            logger.error("Błąd podczas ładowania lotnisk: %s", e, exc_info=True)
+            cls._table = AirportTable.empty()
+    
+        cls.set_table(cls._table)
+    
+    @classmethod
+    def set_table(cls, table: AirportTable) -> None:
+        """Ustawia tabelę lotnisk i przebudowuje indeksy (np. własne dane w benchmarkach)"""
+        cls._table = table
+        # indeks wyszukiwania budowany w rozgrzewaniu przy starcie (lub przy pierwszym wyszukiwaniu),
+        # przestrzenny od razu (szybki)
+        cls._index = None
+        cls._spatial = AirportSpatialIndex(table.latitude, table.longitude)
+    
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._table is not None
+    
+    @classmethod
+    def get_table(cls) -> AirportTable:
+        """
+        Zwraca tabelę lotnisk załadowaną przy starcie (load_airports w lifespan lub set_table)
+        
+        Raises:
+            AirportDataNotLoadedError: Gdy dane nie są jeszcze załadowane - blokujące ładowanie
+                pliku na ścieżce żądania zastępuje 503 (zależność require_airports)
+        """
+        if cls._table is None:
+            raise AirportDataNotLoadedError("Dane lotnisk nie są jeszcze załadowane - usługa nie jest gotowa")
+        return cls._table
+    
+    @classmethod
+    def get_index(cls) -> AirportSearchIndex:
+        """Zwraca indeks wyszukiwania (budowany raz - w rozgrzewaniu przy starcie lub przy pierwszym użyciu)"""
+        table = cls.get_table()
+        with cls._index_lock:
+            if cls._index is None:
+                cls._index = AirportSearchIndex(
+                    table.code.tolist(),
+                    table.icao_code.tolist(),
+                    table.name.tolist(),
+                    table.city.tolist()
+                )
+            return cls._index
     
     @classmethod
     def get_airport(cls, code: str) -> Optional[AirportBase]:
-        """Pobiera informacje o lotnisku na podstawie kodu IATA"""
-        if not cls._airports:
-            cls.load_airports()
-        return cls._airports.get(code.upper())
+        """Pobiera informacje o lotnisku na podstawie kodu IATA (lub ICAO)"""
+        table = cls.get_table()
+        row = table.row_for_code(code)
+        return table.airport(row) if row is not None else None
     
     @classmethod
     def search_airports(cls, query: str, limit: int = 10) -> List[AirportBase]:
-        """Wyszukuje lotniska na podstawie kodu, nazwy lub miasta"""
-        if not cls._airports:
-            cls.load_airports()
-        
-        query = query.lower()
-        results = []
-        
-        for airport in cls._airports.values():
-            if (query in airport.code.lower() or 
-                query in airport.name.lower() or 
-                query in airport.city.lower()):
-                results.append(airport)
-                if len(results) >= limit:
-                    break
-        
-        return results
+        """
+        Wyszukuje lotniska na podstawie kodu (IATA/ICAO), nazwy lub miasta
+        
+        Korzysta z indeksu - wyniki są posortowane według trafności (najpierw dokładny kod),
+        a wielkość liter i znaki diakrytyczne nie mają znaczenia.
+        """
+        table = cls.get_table()
+        return [table.airport(row) for row in cls.get_index().search(query, limit)]
 
-AirportService.load_airports()
\ No newline at end of file
+    @classmethod
+    def _with_distances(cls, rows, distances) -> List[AirportDistance]:
+        table = cls.get_table()
+        return [
+            AirportDistance.model_construct(**dict(table.airport(int(row))), distance_km=float(distance))
+            for row, distance in zip(rows, distances)
+        ]
+    
+    @classmethod
+    def nearest_airports(cls, lat: float, lon: float, limit: int = 5) -> List[AirportDistance]:
+        """
+        Zwraca najbliższe lotniska dla punktu (drzewo k-d, bez przeglądania wszystkich lotnisk)
+        
+        Args:
+            lat: Szerokość geograficzna
+            lon: Długość geograficzna
+            limit: Liczba lotnisk
+        
+        Returns:
+            Lista lotnisk z odległością w km, od najbliższego
+        """
+        cls.get_table()
+        rows, distances = cls._spatial.nearest(lat, lon, limit)
+        return cls._with_distances(rows, distances)
+    
+    @classmethod
+    def airports_within(cls, lat: float, lon: float, radius_km: float, limit: int = 50) -> List[AirportDistance]:
+        """
+        Zwraca lotniska w promieniu radius_km od punktu, od najbliższego
+        
+        Args:
+            lat: Szerokość geograficzna
+            lon: Długość geograficzna
+            radius_km: Promień wyszukiwania w km
+            limit: Maksymalna liczba lotnisk
+        
+        Returns:
+            Lista lotnisk z odległością w km
+        """
+        cls.get_table()
+        rows, distances = cls._spatial.within(lat, lon, radius_km)
+        return cls._with_distances(rows[:limit], distances[:limit])
+    
+    @classmethod
+    def nearest_airport_rows(cls, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Numery wierszy najbliższych lotnisk dla tablic punktów (-1 gdy brak lotnisk)"""
+        cls.get_table()
+        if not len(cls._spatial):
+            return np.full(len(lats), -1)
+        rows, _ = cls._spatial.nearest(np.asarray(lats), np.asarray(lons), 1)
+        return rows[:, 0]
\ No newline at end of file
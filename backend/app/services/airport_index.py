@@ -0,0 +1,173 @@
+# app/services/airport_index.py
+import re
+from collections import defaultdict
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+
+# litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny
+_SPECIAL_LETTERS = str.maketrans({
+    "ł": "l", "Ł": "l", "ø": "o", "Ø": "o", "đ": "d", "Đ": "d",
+    "ß": "ss", "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe", "ı": "i",
+    "þ": "th", "Þ": "th", "ð": "d", "Ð": "d"
+})
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """
+    Normalizuje tekst do wyszukiwania: małe litery, bez znaków diakrytycznych,
+    znaki inne niż litery i cyfry zamienione na pojedyncze spacje ("Kraków-Balice" -> "krakow balice")
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.translate(_SPECIAL_LETTERS))
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+class AirportSearchIndex:
+    """
+    Indeks wyszukiwania lotnisk budowany raz dla tabeli lotnisk - przy starcie, w etapie
+    rozgrzewania airport_search_index (WARMUP_SEARCH_INDEX), a bez niego przy pierwszym wyszukiwaniu
+    
+    - dokładne kody IATA/ICAO -> lotnisko
+    - prefiksy kodów, słów miasta i wszystkich słów (kod, nazwa, miasto) -> lotniska
+    - trigramy całego opisu -> lotniska (dopasowania w środku słowa)
+    
+    Indeks operuje na kolumnach danych lotnisk i zwraca numery wierszy - obiekty
+    AirportBase tworzy dopiero AirportService dla zwracanych wyników.
+    
+    Lotniska są ponumerowane w stałej kolejności (krótsze nazwy najpierw), a listy
+    w indeksie są posortowane według tych numerów. Wyszukiwanie przechodzi poziomy
+    trafności od najlepszego (dokładny kod, prefiks kodu, miasto, nazwa, środek tekstu)
+    i kończy się, gdy zbierze limit wyników - bez oceniania wszystkich kandydatów.
+    """
+    
+    # długość najdłuższego indeksowanego prefiksu - dłuższe słowa zapytania filtrują kandydatów
+    MAX_PREFIX = 6
+    
+    def __init__(self,
+                 iata_codes: Sequence[str],
+                 icao_codes: Sequence[str],
+                 names: Sequence[str],
+                 cities: Sequence[str]):
+        # numer w indeksie -> numer wiersza w danych
+        self._rows: List[int] = sorted(range(len(iata_codes)), key=lambda row: (len(names[row]), names[row]))
+        self._codes: Dict[str, int] = {}
+        self._city_words: List[List[str]] = []
+        self._words: List[List[str]] = []
+        self._haystacks: List[str] = []
+        self._code_prefixes: Dict[str, List[int]] = defaultdict(list)
+        self._city_prefixes: Dict[str, List[int]] = defaultdict(list)
+        self._word_prefixes: Dict[str, List[int]] = defaultdict(list)
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        
+        for idx, row in enumerate(self._rows):
+            codes = sorted({fold_text(code) for code in (iata_codes[row], icao_codes[row]) if code})
+            for code in codes:
+                self._codes.setdefault(code, idx)
+            
+            name = fold_text(names[row])
+            city = fold_text(cities[row])
+            city_words = city.split()
+            words = sorted(set(codes) | set(city_words) | set(name.split()))
+            haystack = " ".join([*codes, name, city])
+            
+            self._city_words.append(city_words)
+            self._words.append(words)
+            self._haystacks.append(haystack)
+            
+            self._add_prefixes(self._code_prefixes, codes, idx)
+            self._add_prefixes(self._city_prefixes, city_words, idx)
+            self._add_prefixes(self._word_prefixes, words, idx)
+            for trigram in self._trigrams_of(haystack):
+                self._trigrams[trigram].append(idx)
+        
+        # zwykłe słowniki - odczyt brakującego klucza nie może dodawać pustych list
+        self._code_prefixes = dict(self._code_prefixes)
+        self._city_prefixes = dict(self._city_prefixes)
+        self._word_prefixes = dict(self._word_prefixes)
+        self._trigrams = dict(self._trigrams)
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    @classmethod
+    def _add_prefixes(cls, postings: Dict[str, List[int]], words: Iterable[str], idx: int) -> None:
+        prefixes = {word[:length] for word in words for length in range(1, min(len(word), cls.MAX_PREFIX) + 1)}
+        for prefix in prefixes:
+            postings[prefix].append(idx)
+    
+    @staticmethod
+    def _trigrams_of(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    @staticmethod
+    def _all_prefix(tokens: List[str], words: List[str]) -> bool:
+        """Czy każde słowo zapytania jest prefiksem któregoś ze słów"""
+        return all(any(word.startswith(token) for word in words) for token in tokens)
+    
+    def lookup_code(self, code: str) -> Optional[int]:
+        """Zwraca numer wiersza lotniska o dokładnym kodzie IATA lub ICAO"""
+        idx = self._codes.get(fold_text(code))
+        return self._rows[idx] if idx is not None else None
+    
+    def _prefix_matches(self, postings: Dict[str, List[int]], tokens: List[str], words: List[List[str]]) -> Iterator[int]:
+        """Lotniska, w których każde słowo zapytania jest prefiksem słowa (w kolejności indeksu)"""
+        # lista najrzadszego słowa zapytania, pozostałe sprawdzane na kandydatach
+        rarest = min(tokens, key=lambda token: len(postings.get(token[:self.MAX_PREFIX], ())))
+        for idx in postings.get(rarest[:self.MAX_PREFIX], ()):
+            if len(tokens) == 1 and len(rarest) <= self.MAX_PREFIX:
+                yield idx
+            elif self._all_prefix(tokens, words[idx]):
+                yield idx
+    
+    def _substring_matches(self, query: str) -> Iterator[int]:
+        """Lotniska, których opis zawiera zapytanie (przecięcie list trigramów, liczone dopiero gdy potrzebne)"""
+        trigrams = sorted(self._trigrams_of(query), key=lambda trigram: len(self._trigrams.get(trigram, ())))
+        candidates = set(self._trigrams.get(trigrams[0], ()))
+        for trigram in trigrams[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(self._trigrams.get(trigram, ()))
+        yield from (idx for idx in sorted(candidates) if query in self._haystacks[idx])
+    
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """
+        Wyszukuje lotniska po kodzie, nazwie lub mieście
+        
+        Args:
+            query: Tekst zapytania (wielkość liter i znaki diakrytyczne są ignorowane)
+            limit: Maksymalna liczba wyników
+        
+        Returns:
+            Numery wierszy lotnisk posortowane według trafności
+        """
+        folded = fold_text(query)
+        if not folded or limit <= 0:
+            return []
+        
+        tokens = folded.split()
+        tiers: List[Iterable[int]] = []
+        
+        exact = self._codes.get(folded)
+        if exact is not None:
+            tiers.append([exact])
+        if len(tokens) == 1:
+            tiers.append(self._prefix_matches(self._code_prefixes, tokens, self._words))
+        tiers.append(self._prefix_matches(self._city_prefixes, tokens, self._city_words))
+        tiers.append(self._prefix_matches(self._word_prefixes, tokens, self._words))
+        if len(folded) >= 3:
+            tiers.append(self._substring_matches(folded))
+        
+        results: List[int] = []
+        seen: Set[int] = set()
+        for tier in tiers:
+            for idx in tier:
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                results.append(self._rows[idx])
+                if len(results) >= limit:
+                    return results
+        return results
\ No newline at end of file
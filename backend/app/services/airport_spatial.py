@@ -0,0 +1,83 @@
+# app/services/airport_spatial.py
+import numpy as np
+from scipy.spatial import cKDTree
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class AirportSpatialIndex:
+    """
+    Indeks przestrzenny lotnisk - drzewo k-d na wektorach jednostkowych sfery
+    
+    Odległość euklidesowa (cięciwa) między punktami na sferze jednostkowej rośnie
+    monotonicznie z odległością po okręgu wielkim, więc najbliżsi sąsiedzi w drzewie
+    są najbliższymi lotniskami, a promień w km przelicza się na promień cięciwy.
+    """
+    
+    def __init__(self, latitude: np.ndarray, longitude: np.ndarray):
+        self.size = len(latitude)
+        self._tree = cKDTree(self._unit_vectors(latitude, longitude)) if self.size else None
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    @staticmethod
+    def _unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        lat = np.radians(np.asarray(latitude, dtype=np.float64))
+        lon = np.radians(np.asarray(longitude, dtype=np.float64))
+        cos_lat = np.cos(lat)
+        return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+    
+    @staticmethod
+    def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+        return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+    
+    @staticmethod
+    def _km_to_chord(distance_km: float) -> float:
+        angle = min(distance_km / EARTH_RADIUS_KM, np.pi)
+        return 2.0 * np.sin(angle / 2.0)
+    
+    def nearest(self, latitude, longitude, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Najbliższe lotniska dla jednego punktu lub tablicy punktów
+        
+        Args:
+            latitude: Szerokość geograficzna (liczba lub tablica)
+            longitude: Długość geograficzna (liczba lub tablica)
+            k: Liczba lotnisk na punkt
+        
+        Returns:
+            Numery wierszy lotnisk i odległości w km, kształt (..., k), od najbliższego
+        """
+        points = self._unit_vectors(np.atleast_1d(latitude), np.atleast_1d(longitude))
+        k = min(k, self.size)
+        if k <= 0:
+            empty = np.empty((len(points), 0))
+            return empty.astype(np.intp), empty
+        
+        chord, rows = self._tree.query(points, k=k)
+        chord = chord.reshape(len(points), k)
+        rows = rows.reshape(len(points), k)
+        if np.ndim(latitude) == 0:
+            return rows[0], self._chord_to_km(chord[0])
+        return rows, self._chord_to_km(chord)
+    
+    def within(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lotniska w promieniu radius_km od punktu
+        
+        Returns:
+            Numery wierszy lotnisk i odległości w km, posortowane od najbliższego
+        """
+        if not self.size:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        
+        point = self._unit_vectors(np.atleast_1d(latitude), np.atleast_1d(longitude))[0]
+        rows = np.asarray(self._tree.query_ball_point(point, self._km_to_chord(radius_km)), dtype=np.intp)
+        if not len(rows):
+            return rows, np.empty(0)
+        
+        distances = self._chord_to_km(np.linalg.norm(self._tree.data[rows] - point, axis=1))
+        order = np.argsort(distances, kind="stable")
+        return rows[order], distances[order]
@@ -1,18 +1,22 @@
 # app/services/flight.py
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 import numpy as np
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Union
 import asyncio
+from app.core.config import settings
+from app.core.executor import compute_executor
+from app.core.metrics import stage
 from app.models.schemas import (
     FlightRequest, FlightResponse, FlightRoutePoint,
     SeatRecommendation, AirportBase, AirlineBase, WeatherData,
-    SunEventTime
+    SunEventTime, DepartureSearchRequest, DepartureSearchResponse, DepartureCandidate
 )
 from app.services.airport import AirportService
-from app.services.sun import SunCalculationService
+from app.services.sun import SunCalculationService, SunTable
 from app.services.weather import WeatherService
-from app.services.flight_route import FlightRouteCalculator
+from app.services.flight_route import FlightRouteCalculator, RouteArrays
 from app.services.aircraft import AircraftService
+from app.services import warmup
 
 class FlightRouteService:
     """Serwis do obliczania trasy lotu i rekomendacji miejsc"""
@@ -32,23 +36,25 @@ class FlightRouteService:
         Używa dokładniejszego kalkulatora trasy uwzględniającego zakrzywienie Ziemi
         i fazy lotu.
         """
-        route_points_data = self.route_calculator.calculate_route(
+        route = self.calculate_flight_route_arrays(departure, arrival, steps)
+        
+        return route.to_route_points()
+    
+    def calculate_flight_route_arrays(self,
+                                      departure: AirportBase,
+                                      arrival: AirportBase,
+                                      steps: int = 20) -> RouteArrays:
+        """
+        Oblicza trasę lotu jako tablice NumPy (niezależne od czasu wylotu)
+        
+        Geometria jest pobierana z cache tras dla pary lotnisk.
+        """
+        return self.route_calculator.get_route_arrays(
+            (departure.code, arrival.code),
             departure.latitude, departure.longitude,
             arrival.latitude, arrival.longitude,
-            departure_time,
             steps
         )
-        
-        route_points = []
-        for point_data in route_points_data:
-            route_points.append(FlightRoutePoint(
-                latitude=point_data["lat"],
-                longitude=point_data["lon"],
-                altitude=point_data["alt"],
-                time_from_departure=point_data["time_fraction"] * point_data["total_duration_hours"]
-            ))
-        
-        return route_points
     
 
     async def get_seat_recommendation_async(self, request: FlightRequest) -> FlightResponse:
@@ -59,6 +65,272 @@ class FlightRouteService:
         Returns:
             FlightResponse z rekomendacją najlepszego miejsca
         """
+        # obliczenia CPU w puli obliczeń, zapytania pogodowe w pętli zdarzeń
+        context = await self._compute("_prepare_flight", request)
+        
+        # opcjonalnie pogoda wzdłuż trasy - wpływa na wybór najlepszego punktu
+        weather_scores = None
+        if request.weather_profile:
+            with stage("weather_profile"):
+                weather_scores = await self._route_weather_scores(context)
+        
+        context.update(await self._compute("_analyze_sun", request, context, None, weather_scores))
+        
+        # dane pogodowe dla najlepszego punktu
+        with stage("weather"):
+            weather_conditions = await WeatherService.evaluate_conditions_for_sun_viewing(
+                context["best_point"].latitude,
+                context["best_point"].longitude,
+                context["point_time"]
+            )
+        
+        with stage("build_response"):
+            return self._build_response(request, context, weather_conditions)
+    
+    async def get_seat_recommendations_batch(self,
+                                             requests: List[FlightRequest]) -> List[Union[FlightResponse, Exception]]:
+        """
+        Generuje rekomendacje miejsc dla wielu lotów w jednym wywołaniu
+        
+        Trasy są współdzielone dla powtarzających się par lotnisk, pozycje słońca
+        liczone jednym wywołaniem wektorowym dla wszystkich lotów, a zapytania
+        pogodowe dla tego samego miejsca i godziny wykonywane tylko raz.
+        
+        Returns:
+            Lista wyników w kolejności żądań - FlightResponse albo wyjątek dla danego lotu
+        """
+        results: List[Union[FlightResponse, Exception, None]] = [None] * len(requests)
+        
+        # trasy i pozycje słońca dla wszystkich lotów (w puli obliczeń)
+        contexts, errors = await self._compute("_prepare_batch", requests)
+        for i, error in errors.items():
+            results[i] = error
+        semaphore = asyncio.Semaphore(settings.BATCH_WEATHER_CONCURRENCY)
+        
+        # profile pogody wzdłuż trasy dla lotów, które o nie proszą (wspólny limit zapytań)
+        profile_indices = [i for i in contexts if requests[i].weather_profile]
+        profiles = dict(zip(
+            profile_indices,
+            await asyncio.gather(
+                *[self._route_weather_scores(contexts[i], semaphore) for i in profile_indices],
+                return_exceptions=True
+            )
+        ))
+        
+        contexts, errors = await self._compute("_analyze_batch", requests, contexts, profiles)
+        for i, error in errors.items():
+            results[i] = error
+        
+        # pogoda - jedno zapytanie na unikalne miejsce i godzinę
+        weather_tasks: Dict[Tuple[float, float, datetime], asyncio.Task] = {}
+        
+        async def fetch_conditions(lat: float, lon: float, point_time: datetime) -> Dict[str, Any]:
+            async with semaphore:
+                return await WeatherService.evaluate_conditions_for_sun_viewing(lat, lon, point_time)
+        
+        item_keys = {}
+        for i, context in contexts.items():
+            key = self._weather_key(context["best_point"], context["point_time"])
+            item_keys[i] = key
+            if key not in weather_tasks:
+                weather_tasks[key] = asyncio.ensure_future(fetch_conditions(
+                    context["best_point"].latitude,
+                    context["best_point"].longitude,
+                    context["point_time"]
+                ))
+        
+        weather_results = dict(zip(
+            weather_tasks,
+            await asyncio.gather(*weather_tasks.values(), return_exceptions=True)
+        ))
+        
+        for i, context in contexts.items():
+            weather_conditions = weather_results[item_keys[i]]
+            if isinstance(weather_conditions, Exception):
+                results[i] = weather_conditions
+                continue
+            try:
+                results[i] = self._build_response(requests[i], context, weather_conditions)
+            except Exception as e:
+                results[i] = e
+        
+        return results
+    
+    async def search_departure_times(self, request: DepartureSearchRequest) -> DepartureSearchResponse:
+        """
+        Ranking godzin wylotu w zakresie dat według jakości widoku wschodu/zachodu słońca
+        
+        Returns:
+            DepartureSearchResponse z najlepszymi godzinami wylotu
+        """
+        return await self._compute("_rank_departures", request)
+    
+    @staticmethod
+    def departure_offsets(request: DepartureSearchRequest) -> np.ndarray:
+        """Sprawdzane godziny wylotu - minuty od północy start_date, co step_minutes do końca end_date"""
+        days = (request.end_date - request.start_date).days + 1
+        return np.arange(0, days * 24 * 60, request.step_minutes)
+    
+    def _rank_departures(self, request: DepartureSearchRequest) -> DepartureSearchResponse:
+        """
+        Ocenia wszystkie godziny wylotu jedną siatką wyloty × punkty trasy
+        
+        Trasa (z cache geometrii) jest wspólna dla wszystkich kandydatur, więc pozycje
+        słońca i oceny punktów liczone są wektorowo dla całej siatki naraz - bez
+        osobnej rekomendacji dla każdej godziny. Ranking nie uwzględnia pogody
+        (prognozy nie sięgają dalszych dat); pozostałe oceny jak w get_seat_recommendation.
+        
+        Returns:
+            DepartureSearchResponse z request.limit najlepszymi godzinami wylotu
+        """
+        departure_airport = AirportService.get_airport(request.departure_airport)
+        arrival_airport = AirportService.get_airport(request.arrival_airport)
+        
+        if not departure_airport or not arrival_airport:
+            raise ValueError("Invalid departure or arrival airport")
+        
+        route = self.calculate_flight_route_arrays(departure_airport, arrival_airport)
+        route_points = route.to_route_points()
+        start = datetime.combine(request.start_date, time())
+        offsets = self.departure_offsets(request)
+        departure_epochs = self.sun_service._to_epoch(start) + offsets * 60.0
+        
+        # siatka wyloty × punkty trasy i ocena punktów (jak przy wyborze najlepszego punktu)
+        altitude, azimuth, epochs = self.sun_service.sun_grid(route, departure_epochs)
+        scores = self.sun_service.viewing_scores(
+            altitude, route.latitude, route.longitude, epochs, request.sun_preference
+        )
+        
+        rows = np.arange(len(offsets))
+        best_idx = np.argmax(scores, axis=1)
+        best_score = scores[rows, best_idx]
+        best_altitude = altitude[rows, best_idx]
+        # słońce pod horyzontem w najlepszym punkcie - nie ma czego oglądać
+        quality = self._departure_view_quality(best_altitude)
+        
+        # preferowane wydarzenie podczas lotu - zmiana znaku wysokości między punktami trasy
+        before, after = altitude[:, :-1], altitude[:, 1:]
+        if request.sun_preference == "sunrise":
+            crossing = (before <= 0) & (after > 0)
+        else:
+            crossing = (before > 0) & (after <= 0)
+        event_visible = crossing.any(axis=1)
+        first = np.argmax(crossing, axis=1)
+        a0, a1 = before[rows, first], after[rows, first]
+        fraction = np.divide(a0, a0 - a1, out=np.zeros_like(a0), where=a0 != a1)
+        event_offset = route.time_offset[first] + (route.time_offset[first + 1] - route.time_offset[first]) * fraction
+        
+        # kolejność: wydarzenie podczas lotu, jakość widoku, ocena najlepszego punktu, wcześniejszy wylot
+        order = np.lexsort((offsets, -best_score, -quality, ~event_visible))
+        
+        flight_duration = float(route.time_offset[-1])
+        results = []
+        for i in order[:request.limit]:
+            departure_time = start + timedelta(minutes=int(offsets[i]))
+            idx = int(best_idx[i])
+            # strona samolotu tylko dla zwracanych wyników - tablica słońca z wiersza siatki
+            sun_table = SunTable(altitude[i], azimuth[i], epochs[i], route.latitude, route.longitude)
+            seat_side, seat_code = self._determine_best_seat_side(
+                route_points, idx, sun_table, request.sun_preference
+            )
+            results.append(DepartureCandidate(
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=flight_duration),
+                quality_score=float(quality[i]),
+                best_time=departure_time + timedelta(hours=float(route.time_offset[idx])),
+                sun_altitude=float(best_altitude[i]),
+                sun_event_visible=bool(event_visible[i]),
+                event_time=departure_time + timedelta(hours=float(event_offset[i])) if event_visible[i] else None,
+                seat_side=seat_side,
+                seat_code=seat_code
+            ))
+        
+        return DepartureSearchResponse(
+            departure_airport=departure_airport,
+            arrival_airport=arrival_airport,
+            flight_duration=flight_duration,
+            sun_preference=request.sun_preference,
+            candidates_evaluated=len(offsets),
+            results=results
+        )
+    
+    async def _compute(self, name: str, *args: Any) -> Any:
+        """
+        Wykonuje etap obliczeń (metodę serwisu) w puli obliczeń, poza pętlą zdarzeń
+        
+        W trybie procesów etap wykonuje instancja serwisu procesu roboczego
+        (z własnymi cache), w pozostałych trybach - ta instancja.
+        """
+        # czas etapu mierzony w pętli zdarzeń - razem z oczekiwaniem w kolejce puli
+        with stage(name.lstrip("_")):
+            if compute_executor.mode == "process":
+                return await compute_executor.run(_run_stage_in_worker, name, *args)
+            return await compute_executor.run(getattr(self, name), *args)
+    
+    def _prepare_batch(self, requests: List[FlightRequest]) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Exception]]:
+        """
+        Przygotowuje loty z żądania wsadowego: trasy (współdzielone dla tych samych par
+        lotnisk) i pozycje słońca dla wszystkich lotów jednym wywołaniem wektorowym
+        
+        Returns:
+            Konteksty lotów (z tablicą słońca) i błędy - według indeksu żądania
+        """
+        contexts: Dict[int, Dict[str, Any]] = {}
+        errors: Dict[int, Exception] = {}
+        route_memo: Dict[Tuple[str, str], Tuple[RouteArrays, List[FlightRoutePoint]]] = {}
+        
+        for i, request in enumerate(requests):
+            try:
+                contexts[i] = self._prepare_flight(request, route_memo)
+            except Exception as e:
+                errors[i] = e
+        
+        indices = list(contexts)
+        sun_tables = self.sun_service.build_sun_tables(
+            [contexts[i]["route"] for i in indices],
+            [contexts[i]["departure_time"] for i in indices]
+        )
+        for i, sun_table in zip(indices, sun_tables):
+            contexts[i]["sun_table"] = sun_table
+        
+        return contexts, errors
+    
+    def _analyze_batch(self,
+                       requests: List[FlightRequest],
+                       contexts: Dict[int, Dict[str, Any]],
+                       profiles: Dict[int, Union[np.ndarray, Exception]]) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Exception]]:
+        """
+        Wyznacza wydarzenia słoneczne i najlepsze punkty dla lotów z _prepare_batch
+        
+        Returns:
+            Konteksty lotów uzupełnione o wynik _analyze_sun i błędy - według indeksu żądania
+        """
+        analyzed: Dict[int, Dict[str, Any]] = {}
+        errors: Dict[int, Exception] = {}
+        for i, context in contexts.items():
+            weather_scores = profiles.get(i)
+            try:
+                if isinstance(weather_scores, Exception):
+                    raise weather_scores
+                context.update(self._analyze_sun(requests[i], context, context["sun_table"], weather_scores))
+                analyzed[i] = context
+            except Exception as e:
+                errors[i] = e
+        return analyzed, errors
+    
+    def _prepare_flight(self,
+                        request: FlightRequest,
+                        route_memo: Optional[Dict[Tuple[str, str], Tuple[RouteArrays, List[FlightRoutePoint]]]] = None) -> Dict[str, Any]:
+        """
+        Przygotowuje dane lotu: lotniska, czas wylotu i trasę
+        
+        Args:
+            request: Żądanie rekomendacji
+            route_memo: Słownik tras współdzielonych między żądaniami (opcjonalnie)
+        
+        Returns:
+            Słownik z kontekstem lotu
+        """
         departure_airport = AirportService.get_airport(request.departure_airport)
         arrival_airport = AirportService.get_airport(request.arrival_airport)
         
@@ -71,33 +343,141 @@ class FlightRouteService:
         )
         
         # trasa lotu
-        route_points = self.calculate_flight_route(departure_airport, arrival_airport, departure_time)
+        pair = (departure_airport.code, arrival_airport.code)
+        if route_memo is not None and pair in route_memo:
+            route, route_points = route_memo[pair]
+        else:
+            route = self.calculate_flight_route_arrays(departure_airport, arrival_airport)
+            route_points = route.to_route_points()
+            if route_memo is not None:
+                route_memo[pair] = (route, route_points)
+        
+        return {
+            "departure_airport": departure_airport,
+            "arrival_airport": arrival_airport,
+            "departure_time": departure_time,
+            "route": route,
+            "route_points": route_points
+        }
+    
+    def _analyze_sun(self,
+                     request: FlightRequest,
+                     context: Dict[str, Any],
+                     sun_table: Optional[SunTable] = None,
+                     weather_scores: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Wyznacza wydarzenia słoneczne i najlepszy punkt obserwacji dla lotu
         
-        # wydarzenia słoneczne (wschód/zachód) podczas lotu
-        sun_events = self.sun_service.get_sun_events_for_flight(route_points, departure_time)
+        Args:
+            request: Żądanie rekomendacji
+            context: Kontekst lotu z _prepare_flight
+            sun_table: Pozycje słońca dla punktów trasy (opcjonalnie)
+            weather_scores: Ocena pogody dla punktów trasy z _route_weather_scores (opcjonalnie)
         
-        # czy widoczne
-        preferred_events = [e for e in sun_events 
-                        if e.event_type == request.sun_preference and e.is_visible_during_flight]
+        Returns:
+            Słownik z tablicą słońca, wydarzeniami i najlepszym punktem
+        """
+        route = context["route"]
+        route_points = context["route_points"]
+        departure_time = context["departure_time"]
         
-        sun_events_visible = len(preferred_events) > 0
+        # pozycje słońca dla punktów trasy - liczone raz dla całego żądania
+        if sun_table is None:
+            sun_table = self.sun_service.build_sun_table(route_points, departure_time, route)
+        
+        # wydarzenia słoneczne (wschód/zachód) podczas lotu
+        sun_events = self.sun_service.get_sun_events_for_flight(
+            route_points, departure_time, route=route, sun_table=sun_table
+        )
         
         # najlepszy moment dla obserwacji słońca
         best_idx, best_sun = self.sun_service.find_sun_events(
             route_points, 
             departure_time, 
-            request.sun_preference
+            request.sun_preference,
+            sun_table=sun_table,
+            weather_scores=weather_scores
         )
         
-        # dane pogodowe dla najlepszego punktu
         best_point = route_points[best_idx]
-        point_time = departure_time + timedelta(hours=best_point.time_from_departure)
         
-        weather_conditions = await WeatherService.evaluate_conditions_for_sun_viewing(
-            best_point.latitude,
-            best_point.longitude,
-            point_time
+        return {
+            "sun_table": sun_table,
+            "sun_events": sun_events,
+            "best_idx": best_idx,
+            "best_sun": best_sun,
+            "best_point": best_point,
+            "point_time": departure_time + timedelta(hours=best_point.time_from_departure)
+        }
+    
+    async def _route_weather_scores(self,
+                                    context: Dict[str, Any],
+                                    semaphore: Optional[asyncio.Semaphore] = None) -> np.ndarray:
+        """
+        Ocena warunków pogodowych (0-100) dla wszystkich punktów trasy
+        
+        Pogoda jest pobierana w WEATHER_PROFILE_POINTS równomiernie rozłożonych punktach,
+        a oceny pomiędzy nimi interpolowane po czasie lotu.
+        
+        Returns:
+            Tablica ocen pogody dla kolejnych punktów trasy
+        """
+        route_points = context["route_points"]
+        departure_time = context["departure_time"]
+        
+        count = max(1, min(settings.WEATHER_PROFILE_POINTS, len(route_points)))
+        sample_idx = np.unique(np.linspace(0, len(route_points) - 1, count).round().astype(int))
+        
+        profile = await WeatherService.get_weather_profile(
+            [
+                (
+                    route_points[i].latitude,
+                    route_points[i].longitude,
+                    departure_time + timedelta(hours=route_points[i].time_from_departure)
+                )
+                for i in sample_idx
+            ],
+            semaphore
+        )
+        
+        time_offsets = np.array([point.time_from_departure for point in route_points])
+        return np.interp(
+            time_offsets,
+            time_offsets[sample_idx],
+            [evaluation["viewing_score"] for evaluation in profile]
         )
+    
+    def _weather_key(self, point: FlightRoutePoint, point_time: datetime) -> Tuple[float, float, datetime]:
+        """Klucz deduplikacji zapytań pogodowych - zaokrąglona pozycja i pełna godzina"""
+        return (
+            round(point.latitude, 1),
+            round(point.longitude, 1),
+            point_time.replace(minute=0, second=0, microsecond=0)
+        )
+    
+    def _build_response(self,
+                        request: FlightRequest,
+                        context: Dict[str, Any],
+                        weather_conditions: Dict[str, Any]) -> FlightResponse:
+        """
+        Składa odpowiedź z rekomendacją na podstawie trasy, słońca i pogody
+        
+        Returns:
+            FlightResponse z rekomendacją najlepszego miejsca
+        """
+        departure_airport = context["departure_airport"]
+        arrival_airport = context["arrival_airport"]
+        departure_time = context["departure_time"]
+        route_points = context["route_points"]
+        sun_table = context["sun_table"]
+        sun_events = list(context["sun_events"])
+        best_idx = context["best_idx"]
+        best_sun = context["best_sun"]
+        best_point = context["best_point"]
+        
+        # czy widoczne
+        preferred_events = [e for e in sun_events 
+                        if e.event_type == request.sun_preference and e.is_visible_during_flight]
 
         # czasy wschodu/zachodu słońca z API pogodowego
         api_sun_times = weather_conditions.get("sun_times", {})
@@ -199,7 +579,7 @@ class FlightRouteService:
         
         # strona samolotu na podstawie pozycji słońca i kierunku lotu
         seat_side, seat_code = self._determine_best_seat_side(
-            route_points, best_idx, best_sun, request.sun_preference
+            route_points, best_idx, sun_table, request.sun_preference
         )
         
         weather_data = WeatherData(
@@ -244,6 +624,9 @@ class FlightRouteService:
                 
             recommendation_notes += f"The best view will be from the {seat_side}, seat {seat_code}."
         
+        # najbliższe lotnisko (miasto) dla miejsca każdego wydarzenia
+        sun_events = self._with_nearest_airports(sun_events)
+        
         recommendation = SeatRecommendation(
             seat_code=seat_code,
             seat_side=seat_side,
@@ -279,6 +662,24 @@ class FlightRouteService:
         
         return response
         
+    
+    def _with_nearest_airports(self, sun_events: List[SunEventTime]) -> List[SunEventTime]:
+        """Uzupełnia wydarzenia słoneczne o najbliższe lotnisko (jedno zapytanie do indeksu przestrzennego)"""
+        located = [event for event in sun_events if event.event_location]
+        if not located:
+            return sun_events
+        
+        rows = AirportService.nearest_airport_rows(
+            np.array([event.event_location["latitude"] for event in located]),
+            np.array([event.event_location["longitude"] for event in located])
+        )
+        table = AirportService.get_table()
+        nearest = {id(event): table.airport(int(row)) for event, row in zip(located, rows) if row >= 0}
+        
+        return [
+            event.model_copy(update={"nearest_airport": nearest[id(event)]}) if id(event) in nearest else event
+            for event in sun_events
+        ]
 
     async def get_seat_recommendation(self, request: FlightRequest) -> FlightResponse:
         """
@@ -314,7 +715,7 @@ class FlightRouteService:
     def _determine_best_seat_side(self, 
                                  route_points: List[FlightRoutePoint],
                                  best_idx: int,
-                                 sun_position: Any,
+                                 sun_table: SunTable,
                                  preference: str) -> Tuple[str, str]:
         """
         Określa najlepszą stronę samolotu do obserwacji wschodu/zachodu słońca
@@ -329,7 +730,7 @@ class FlightRouteService:
         )
         
         # Azymut słońca
-        sun_azimuth = sun_position.azimuth
+        sun_azimuth = float(sun_table.azimuth[best_idx])
         
         # kąt między kierunkiem lotu a pozycją słońca
         angle_diff = (sun_azimuth - flight_bearing) % 360
@@ -380,24 +781,23 @@ class FlightRouteService:
         """
         Oblicza jakość widoku (0-100) na podstawie pozycji słońca
         """
-        altitude = sun_pos.altitude
-        
-        if preference == "sunrise":
-            # Najlepszy wschód: 2-10 stopni nad horyzontem
-            if 2 <= altitude <= 10:
-                return 90 + (1 - abs(altitude - 5) / 5) * 10
-            elif 0 <= altitude < 2:
-                return 80 + altitude * 5
-            else:
-                return max(0, 80 - (altitude - 10) * 4)
-        else:  # zachód
-            # Najlepszy zachód: 2-10 stopni nad horyzontem
-            if 2 <= altitude <= 10:
-                return 90 + (1 - abs(altitude - 5) / 5) * 10
-            elif 0 <= altitude < 2:
-                return 80 + altitude * 5
-            else:
-                return max(0, 80 - (altitude - 10) * 4)
+        # ta sama skala dla wschodu i zachodu
+        return float(self._view_quality(np.asarray(sun_pos.altitude, dtype=float)))
+        
+    @staticmethod
+    def _view_quality(altitude: np.ndarray) -> np.ndarray:
+        """Jakość widoku (0-100) dla tablicy wysokości słońca"""
+        # Najlepszy wschód/zachód: 2-10 stopni nad horyzontem
+        return np.select(
+            [(altitude >= 2) & (altitude <= 10), (altitude >= 0) & (altitude < 2)],
+            [90 + (1 - np.abs(altitude - 5) / 5) * 10, 80 + altitude * 5],
+            np.maximum(0, 80 - (altitude - 10) * 4)
+        )
+    
+    @classmethod
+    def _departure_view_quality(cls, altitude: np.ndarray) -> np.ndarray:
+        """Jakość widoku w rankingu godzin wylotu - w zakresie 0-100, słońce na horyzoncie lub pod nim - 0"""
+        return np.where(altitude > 0, np.clip(cls._view_quality(altitude), 0.0, 100.0), 0.0)
     
     def _get_flight_direction(self, 
                              route_points: List[FlightRoutePoint], 
@@ -417,4 +817,30 @@ class FlightRouteService:
         ]
         
         idx = round(bearing / 45)
-        return directions[idx % 8]
\ No newline at end of file
+        return directions[idx % 8]
+
+
+# instancja serwisu w procesie roboczym puli obliczeń (tryb "process")
+_worker_service: Optional[FlightRouteService] = None
+
+
+def init_compute_worker() -> None:
+    """
+    Przygotowuje proces roboczy puli obliczeń (tryb "process"): ładuje lotniska i rozgrzewa
+    cache tras i efemeryd procesu - rozgrzewanie w lifespan dotyczy tylko procesu głównego
+    """
+    global _worker_service
+    warmup.load_airports()
+    _worker_service = FlightRouteService()
+    if settings.WARMUP_ENABLED:
+        warmup.warm_route_cache(_worker_service)
+        if settings.WARMUP_EPHEMERIS_DAYS > 0:
+            warmup.warm_ephemeris(settings.WARMUP_EPHEMERIS_DAYS)
+
+
+def _run_stage_in_worker(stage: str, *args: Any) -> Any:
+    """Wykonuje etap obliczeń na instancji serwisu procesu roboczego (z init_compute_worker lub tworzonej przy pierwszym użyciu)"""
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = FlightRouteService()
+    return getattr(_worker_service, stage)(*args)
\ No newline at end of file
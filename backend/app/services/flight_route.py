@@ -1,7 +1,125 @@
 # app/services/flight_route.py
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.schemas import FlightRoutePoint
+
+
+class RouteArrays:
+    """
+    Trasa lotu w postaci tablic NumPy (struct-of-arrays)
+    
+    Przechowuje szerokość, długość, wysokość, czas od wylotu (w godzinach)
+    i kurs dla wszystkich punktów trasy. Nie zależy od czasu wylotu - oś czasu
+    jest względna, więc tę samą geometrię można użyć dla dowolnego wylotu.
+    """
+    
+    def __init__(self,
+                 latitude: np.ndarray,
+                 longitude: np.ndarray,
+                 altitude: np.ndarray,
+                 time_offset: np.ndarray,
+                 bearing: np.ndarray,
+                 distance_km: float,
+                 duration_hours: float,
+                 endpoints: Optional[Tuple[float, float, float, float]] = None,
+                 calculator: Optional["FlightRouteCalculator"] = None):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+        self.time_offset = time_offset  # godziny od wylotu
+        self.bearing = bearing  # stopnie od północy
+        self.distance_km = distance_km
+        self.duration_hours = duration_hours
+        self.endpoints = endpoints  # (dep_lat, dep_lon, arr_lat, arr_lon)
+        self._calculator = calculator
+        self._phase_segments: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    
+    def __len__(self) -> int:
+        return len(self.time_offset)
+    
+    def position_at(self, time_offset) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pozycja samolotu w dowolnej chwili lotu (trasa ciągła, nie tylko punkty próbkowania)
+        
+        Args:
+            time_offset: Czas od wylotu w godzinach - liczba lub tablica
+        
+        Returns:
+            (szerokość, długość, wysokość w metrach)
+        """
+        time_offset = np.clip(np.asarray(time_offset, dtype=float), 0.0, self.duration_hours)
+        if self._calculator is not None and self.endpoints is not None:
+            return self._calculator.positions_at(
+                *self.endpoints, self.distance_km, self.duration_hours, time_offset
+            )
+        
+        # brak geometrii - interpolacja liniowa między punktami trasy
+        longitude = np.interp(time_offset, self.time_offset, np.degrees(np.unwrap(np.radians(self.longitude))))
+        return (
+            np.interp(time_offset, self.time_offset, self.latitude),
+            (longitude + 180) % 360 - 180,
+            np.interp(time_offset, self.time_offset, self.altitude)
+        )
+    
+    def phase_segments(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Fazy lotu jako odcinki, w których ułamek przebytej odległości jest liniowy w czasie
+        
+        Returns:
+            (czasy granic w godzinach, ułamek odległości na początku odcinka, jego zmiana
+            na godzinę) lub None, gdy trasa nie ma ciągłej geometrii (tylko punkty)
+        """
+        if self._calculator is None or self.endpoints is None:
+            return None
+        # zależą tylko od geometrii - liczone raz dla trasy (trasy są w cache LRU)
+        if self._phase_segments is None:
+            self._phase_segments = self._calculator.phase_segments(self.distance_km, self.duration_hours)
+        return self._phase_segments
+    
+    def to_route_points(self) -> List[FlightRoutePoint]:
+        """
+        Zamienia tablice na listę FlightRoutePoint (na granicy API)
+        
+        Dane są już poprawne, więc pomijamy walidację pydantic (model_construct).
+        """
+        return [
+            FlightRoutePoint.model_construct(
+                latitude=lat,
+                longitude=lon,
+                altitude=alt,
+                time_from_departure=offset
+            )
+            for lat, lon, alt, offset in zip(
+                self.latitude.tolist(),
+                self.longitude.tolist(),
+                self.altitude.tolist(),
+                self.time_offset.tolist()
+            )
+        ]
+    
+    def to_dicts(self, departure_time: datetime) -> List[Dict[str, Any]]:
+        """Zamienia tablice na listę słowników w formacie calculate_route"""
+        steps = max(len(self) - 1, 1)
+        return [
+            {
+                "lat": lat,
+                "lon": lon,
+                "alt": alt,
+                "time": departure_time + timedelta(hours=offset),
+                "time_fraction": i / steps,
+                "total_duration_hours": self.duration_hours
+            }
+            for i, (lat, lon, alt, offset) in enumerate(zip(
+                self.latitude.tolist(),
+                self.longitude.tolist(),
+                self.altitude.tolist(),
+                self.time_offset.tolist()
+            ))
+        ]
+
 
 class FlightRouteCalculator:
     """Kalkulator trasy lotu z uwzględnieniem zakrzywienia Ziemi i parametrów lotu"""
@@ -14,6 +132,9 @@ class FlightRouteCalculator:
         self.climb_rate = 5.0  # m/s (typowa prędkość wznoszenia)
         self.descent_rate = 3.0  # m/s (typowa prędkość opadania)
     
+        # geometria tras (niezależna od czasu wylotu) dla par lotnisk
+        self.route_cache = LRUCache(settings.ROUTE_CACHE_SIZE)
+    
     def calculate_route(self, 
                        dep_lat: float, dep_lon: float,
                        arr_lat: float, arr_lon: float,
@@ -31,12 +152,144 @@ class FlightRouteCalculator:
         Returns:
             Lista punktów trasy z pozycją, czasem i wysokością
         """
+        route = self.calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, steps)
+        return route.to_dicts(departure_time)
+    
+    def calculate_route_arrays(self,
+                               dep_lat: float, dep_lon: float,
+                               arr_lat: float, arr_lon: float,
+                               steps: int = 20) -> RouteArrays:
+        """
+        Wektorowa wersja calculate_route - cała trasa w jednym przebiegu NumPy
+        
+        Args:
+            dep_lat, dep_lon: Współrzędne lotniska wylotu
+            arr_lat, arr_lon: Współrzędne lotniska przylotu
+            steps: Liczba odcinków trasy (punktów jest steps + 1)
+        
+        Returns:
+            RouteArrays z pozycją, wysokością, czasem od wylotu i kursem
+        """
         # odległość lotu po wielkim kole
-        distance_km = self._haversine_distance(dep_lat, dep_lon, arr_lat, arr_lon)
+        distance_km = float(self._haversine_distance(dep_lat, dep_lon, arr_lat, arr_lon))
         
         # całkowity czas lotu
         flight_time_hours = self._estimate_flight_time(distance_km)
         
+        time_elapsed = flight_time_hours * (np.arange(steps + 1) / steps)
+        latitude, longitude, altitude = self.positions_at(
+            dep_lat, dep_lon, arr_lat, arr_lon,
+            distance_km, flight_time_hours, time_elapsed
+        )
+        
+        # kurs w punkcie - między sąsiednimi punktami trasy
+        prev_idx = np.maximum(np.arange(steps + 1) - 1, 0)
+        next_idx = np.minimum(np.arange(steps + 1) + 1, steps)
+        bearing = self._bearing(
+            latitude[prev_idx], longitude[prev_idx],
+            latitude[next_idx], longitude[next_idx]
+        )
+        
+        return RouteArrays(
+            latitude=latitude,
+            longitude=longitude,
+            altitude=altitude,
+            time_offset=time_elapsed,
+            bearing=bearing,
+            distance_km=distance_km,
+            duration_hours=flight_time_hours,
+            endpoints=(dep_lat, dep_lon, arr_lat, arr_lon),
+            calculator=self
+        )
+    
+    def positions_at(self,
+                     dep_lat: float, dep_lon: float,
+                     arr_lat: float, arr_lon: float,
+                     distance_km: float,
+                     flight_time_hours: float,
+                     time_elapsed: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Oblicza pozycję i wysokość samolotu dla tablicy czasów od wylotu
+        
+        Returns:
+            (szerokość, długość, wysokość w metrach)
+        """
+        distance_fraction, altitude = self._phase_profile(distance_km, flight_time_hours, time_elapsed)
+        
+        # pozycje na trasie
+        position = self._intermediate_point(
+            dep_lat, dep_lon,
+            arr_lat, arr_lon,
+            distance_fraction
+        )
+        latitude = np.asarray(position["lat"], dtype=float)
+        longitude = np.asarray(position["lon"], dtype=float)
+        
+        return latitude, longitude, np.asarray(altitude, dtype=float)
+    
+    def phase_segments(self, distance_km: float, flight_time_hours: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Granice faz lotu oraz liniowy przebieg ułamka odległości w każdej z nich
+        
+        W każdej fazie (wznoszenie, przelot, opadanie) ułamek przebytej odległości
+        zmienia się liniowo w czasie - wystarczą dwie próbki wewnątrz odcinka.
+        
+        Returns:
+            (czasy granic w godzinach, ułamek odległości na początku odcinka, zmiana na godzinę)
+        """
+        climb_time_hours = self.typical_cruise_altitude / (self.climb_rate * 3600)
+        descent_time_hours = self.typical_cruise_altitude / (self.descent_rate * 3600)
+        knots = np.unique(np.clip(
+            [0.0, climb_time_hours, flight_time_hours - descent_time_hours, flight_time_hours],
+            0.0, flight_time_hours
+        ))
+        
+        start, width = knots[:-1], np.diff(knots)
+        early, _ = self._phase_profile(distance_km, flight_time_hours, start + width / 4)
+        late, _ = self._phase_profile(distance_km, flight_time_hours, start + 3 * width / 4)
+        rate = (late - early) / (width / 2)
+        
+        return knots, early - rate * width / 4, rate
+    
+    def get_route_arrays(self,
+                         route_key: Tuple,
+                         dep_lat: float, dep_lon: float,
+                         arr_lat: float, arr_lon: float,
+                         steps: int = 20) -> RouteArrays:
+        """
+        Zwraca geometrię trasy z cache LRU lub oblicza ją i zapisuje
+        
+        Geometria nie zależy od czasu wylotu, więc klucz to para lotnisk
+        (i liczba kroków) - czas jest przesuwany dopiero przy użyciu trasy.
+        
+        Args:
+            route_key: Klucz trasy, np. (kod wylotu, kod przylotu)
+            dep_lat, dep_lon: Współrzędne lotniska wylotu
+            arr_lat, arr_lon: Współrzędne lotniska przylotu
+            steps: Liczba odcinków trasy
+        
+        Returns:
+            RouteArrays (współdzielone - tablice tylko do odczytu)
+        """
+        key = (route_key, steps)
+        route = self.route_cache.get(key)
+        if route is None:
+            route = self.calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, steps)
+            for array in (route.latitude, route.longitude, route.altitude, route.time_offset, route.bearing):
+                array.flags.writeable = False
+            self.route_cache.set(key, route)
+        return route
+    
+    def _phase_profile(self,
+                       distance_km: float,
+                       flight_time_hours: float,
+                       time_elapsed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Wyznacza ułamek przebytej odległości i wysokość dla tablicy czasów lotu
+        
+        Returns:
+            (ułamek odległości, wysokość w metrach)
+        """
         # czas wznoszenia i opadania
         climb_time_hours = self.typical_cruise_altitude / (self.climb_rate * 3600)
         descent_time_hours = self.typical_cruise_altitude / (self.descent_rate * 3600)
@@ -47,52 +300,33 @@ class FlightRouteCalculator:
         descent_distance = (descent_time_hours * self.typical_cruise_speed) / 2  # średnia prędkość podczas opadania
         cruise_distance = distance_km - climb_distance - descent_distance
         
-        # punkty trasy
-        route_points = []
+        # ułamki odległości dla faz
+        with np.errstate(divide="ignore", invalid="ignore"):
+            climb_fraction = climb_distance / distance_km
+            cruise_fraction = cruise_distance / distance_km
+            descent_fraction = descent_distance / distance_km
         
-        for i in range(steps + 1):
-            fraction = i / steps
-            time_elapsed = flight_time_hours * fraction
-            current_time = departure_time + timedelta(hours=time_elapsed)
+            climb_phase = time_elapsed / climb_time_hours
+            descent_phase = (time_elapsed - (flight_time_hours - descent_time_hours)) / descent_time_hours
+            cruise_phase = (time_elapsed - climb_time_hours) / cruise_time_hours
             
-            # Określ fazę lotu
-            if time_elapsed <= climb_time_hours:
-                # Faza wznoszenia
-                phase_fraction = time_elapsed / climb_time_hours
-                altitude = self.typical_cruise_altitude * phase_fraction
-                distance_fraction = (climb_distance / distance_km) * phase_fraction
-            elif time_elapsed >= flight_time_hours - descent_time_hours:
-                # Faza opadania
-                phase_fraction = (time_elapsed - (flight_time_hours - descent_time_hours)) / descent_time_hours
-                altitude = self.typical_cruise_altitude * (1 - phase_fraction)
-                cruise_distance_fraction = cruise_distance / distance_km
-                climb_distance_fraction = climb_distance / distance_km
-                distance_fraction = climb_distance_fraction + cruise_distance_fraction + \
-                                   (descent_distance / distance_km) * phase_fraction
-            else:
-                # Faza przelotowa
-                altitude = self.typical_cruise_altitude
-                cruise_phase_fraction = (time_elapsed - climb_time_hours) / cruise_time_hours
-                climb_distance_fraction = climb_distance / distance_km
-                distance_fraction = climb_distance_fraction + (cruise_distance / distance_km) * cruise_phase_fraction
+        is_climb = time_elapsed <= climb_time_hours
+        is_descent = ~is_climb & (time_elapsed >= flight_time_hours - descent_time_hours)
             
-            # Oblicz pozycję na trasie
-            position = self._intermediate_point(
-                dep_lat, dep_lon, 
-                arr_lat, arr_lon,
-                distance_fraction
-            )
+        altitude = np.select(
+            [is_climb, is_descent],
+            [self.typical_cruise_altitude * climb_phase,
+             self.typical_cruise_altitude * (1 - descent_phase)],
+            default=self.typical_cruise_altitude
+        )
+        distance_fraction = np.select(
+            [is_climb, is_descent],
+            [climb_fraction * climb_phase,
+             climb_fraction + cruise_fraction + descent_fraction * descent_phase],
+            default=climb_fraction + cruise_fraction * cruise_phase
+        )
             
-            route_points.append({
-                "lat": position["lat"],
-                "lon": position["lon"],
-                "alt": altitude,
-                "time": current_time,
-                "time_fraction": fraction,
-                "total_duration_hours": flight_time_hours
-            })
-        
-        return route_points
+        return distance_fraction, altitude
     
     def _haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
@@ -114,6 +348,24 @@ class FlightRouteCalculator:
         
         return self.earth_radius * c
     
+    def _bearing(self, lat1, lon1, lat2, lon2):
+        """
+        Oblicza kurs (bearing) między punktami - działa również na tablicach
+        
+        Returns:
+            Kurs w stopniach (0-360 od północy, zgodnie z ruchem wskazówek zegara)
+        """
+        lat1_rad, lon1_rad = np.radians(lat1), np.radians(lon1)
+        lat2_rad, lon2_rad = np.radians(lat2), np.radians(lon2)
+        
+        dlon = lon2_rad - lon1_rad
+        
+        y = np.sin(dlon) * np.cos(lat2_rad)
+        x = np.cos(lat1_rad) * np.sin(lat2_rad) - np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(dlon)
+        
+        bearing = np.degrees(np.arctan2(y, x))
+        return (bearing + 360) % 360
+    
     def _estimate_flight_time(self, distance_km: float) -> float:
         """
         Szacuje czas lotu na podstawie odległości
@@ -135,17 +387,18 @@ class FlightRouteCalculator:
     
     def _intermediate_point(self, lat1: float, lon1: float, 
                            lat2: float, lon2: float, 
-                           fraction: float) -> Dict[str, float]:
+                           fraction) -> Dict[str, Any]:
         """
         Oblicza punkt pośredni na trasie po wielkim kole
         
         Args:
             lat1, lon1: Współrzędne punktu początkowego
             lat2, lon2: Współrzędne punktu końcowego
-            fraction: Ułamek odległości (0.0 do 1.0)
+            fraction: Ułamek odległości (0.0 do 1.0) - liczba lub tablica NumPy
             
         Returns:
             Słownik z szerokością i długością geograficzną punktu pośredniego
+            (tablice, jeśli fraction jest tablicą)
         """
         # Konwersja do radianów
         lat1_rad = np.radians(lat1)
@@ -154,10 +407,16 @@ class FlightRouteCalculator:
         lon2_rad = np.radians(lon2)
         
         # Obliczenie odległości kątowej
-        d = np.arccos(
+        d = np.arccos(np.clip(
             np.sin(lat1_rad) * np.sin(lat2_rad) + 
-            np.cos(lat1_rad) * np.cos(lat2_rad) * np.cos(lon1_rad - lon2_rad)
-        )
+            np.cos(lat1_rad) * np.cos(lat2_rad) * np.cos(lon1_rad - lon2_rad),
+            -1.0, 1.0
+        ))
+        
+        # Ten sam punkt - trasa zerowej długości
+        if d == 0:
+            shape = np.shape(fraction)
+            return {"lat": np.full(shape, float(lat1)), "lon": np.full(shape, float(lon1))}
         
         # Współczynniki
         a = np.sin((1 - fraction) * d) / np.sin(d)
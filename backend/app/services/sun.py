@@ -1,14 +1,251 @@
 # app/services/sun.py - zupełnie nowa implementacja
 from datetime import datetime, timedelta
+import math
 import pytz
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Callable
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.models.schemas import SunPositionData, FlightRoutePoint, SunEventTime
+from app.services.flight_route import RouteArrays
 
-import math
+import numpy as np
+
+class SunTable:
+    """
+    Pozycje słońca dla wszystkich punktów trasy jednego lotu
+    
+    Liczona raz na żądanie (jedno wywołanie wektorowe) i współdzielona przez
+    wyszukiwanie wschodów/zachodów, wybór najlepszego punktu i wybór strony samolotu.
+    """
+    
+    def __init__(self,
+                 altitude: np.ndarray,
+                 azimuth: np.ndarray,
+                 epochs: np.ndarray,
+                 latitude: np.ndarray,
+                 longitude: np.ndarray):
+        self.altitude = altitude
+        self.azimuth = azimuth
+        self.epochs = epochs  # sekundy od Unix epoch (UTC)
+        self.latitude = latitude
+        self.longitude = longitude
+    
+    def __len__(self) -> int:
+        return len(self.altitude)
+    
+    @property
+    def is_visible(self) -> np.ndarray:
+        return self.altitude > 0
+    
+    def position(self, idx: int) -> SunPositionData:
+        """Zwraca pozycję słońca dla punktu trasy jako SunPositionData"""
+        altitude = float(self.altitude[idx])
+        return SunPositionData(
+            datetime=datetime.fromtimestamp(float(self.epochs[idx]), tz=pytz.UTC),
+            altitude=altitude,
+            azimuth=float(self.azimuth[idx]),
+            is_visible=altitude > 0
+        )
+
+class SolarEphemeris:
+    """
+    Efemerydy słońca (deklinacja i równanie czasu) dla dni UTC
+    
+    Obie wielkości zależą tylko od czasu, nie od obserwatora, i zmieniają się
+    powoli w ciągu doby. Dla każdego dnia UTC budowana jest leniwie tablica
+    wartości co minutę, a kolejne zapytania korzystają z interpolacji liniowej.
+    Liczba przechowywanych dni jest ograniczona (LRU).
+    """
+    
+    MINUTES_PER_DAY = 1440
+    
+    def __init__(self, max_days: int):
+        self._days = LRUCache(max_days)
+    
+    def lookup(self, epochs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpoluje deklinację i równanie czasu dla tablicy czasów
+        
+        Args:
+            epochs: Tablica czasów jako sekundy od Unix epoch (UTC)
+        
+        Returns:
+            (deklinacja w radianach, równanie czasu w minutach)
+        """
+        epochs = np.asarray(epochs, dtype=float)
+        days = np.floor(epochs / 86400.0)
+        minutes = (epochs - days * 86400.0) / 60.0
+        index = np.clip(np.floor(minutes).astype(np.int64), 0, self.MINUTES_PER_DAY - 1)
+        fraction = minutes - index
+        
+        dec = np.empty_like(epochs)
+        eq_time = np.empty_like(epochs)
+        for day in np.unique(days):
+            mask = days == day
+            day_dec, day_eq_time = self._day_table(int(day))
+            i, f = index[mask], fraction[mask]
+            dec[mask] = day_dec[i] + (day_dec[i + 1] - day_dec[i]) * f
+            eq_time[mask] = day_eq_time[i] + (day_eq_time[i + 1] - day_eq_time[i]) * f
+        
+        return dec, eq_time
+    
+    def _day_table(self, day: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Tablica wartości co minutę dla dnia UTC (liczona przy pierwszym użyciu)"""
+        table = self._days.get(day)
+        if table is None:
+            epochs = day * 86400.0 + np.arange(self.MINUTES_PER_DAY + 1) * 60.0
+            table = self.compute(epochs)
+            self._days.set(day, table)
+        return table
+    
+    def stats(self) -> Dict[str, Any]:
+        return self._days.stats()
+    
+    @staticmethod
+    def compute(epochs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dokładne obliczenie deklinacji i równania czasu
+        https://en.wikipedia.org/wiki/Position_of_the_Sun
+        
+        Returns:
+            (deklinacja w radianach, równanie czasu w minutach)
+        """
+        # dzień juliański (Unix epoch to JD 2440587.5 - północ UTC)
+        jd = epochs / 86400.0 + 2440587.5
+        t = (jd - 2451545.0) / 36525.0
+        
+        # srednia długość słońca
+        L0 = (280.46646 + 36000.76983 * t + 0.0003032 * t**2) % 360
+        
+        # srednia anomalia słońca
+        M = (357.52911 + 35999.05029 * t - 0.0001537 * t**2) % 360
+        M_rad = np.radians(M)
+        
+        # równanie środka dla słońca
+        C = (1.914602 - 0.004817 * t - 0.000014 * t**2) * np.sin(M_rad)
+        C += (0.019993 - 0.000101 * t) * np.sin(2 * M_rad)
+        C += 0.000289 * np.sin(3 * M_rad)
+        
+        # rzeczywista długość słońca
+        L = L0 + C
+        
+        # deklinacja słońca
+        obliquity_rad = np.radians(23.439 - 0.0000004 * t)
+        dec = np.arcsin(np.sin(obliquity_rad) * np.sin(np.radians(L)))
+        
+        # mimośród orbity Ziemi
+        e = 0.016708634 - 0.000042037 * t - 0.0000001267 * t**2
+        
+        # równanie czasu (Meeus, rozdz. 28)
+        L0_rad = np.radians(L0)
+        y = np.tan(obliquity_rad / 2) ** 2
+        eq_time = y * np.sin(2 * L0_rad) - 2 * e * np.sin(M_rad)
+        eq_time += 4 * e * y * np.sin(M_rad) * np.cos(2 * L0_rad)
+        eq_time -= 0.5 * y * y * np.sin(4 * L0_rad)
+        eq_time -= 1.25 * e * e * np.sin(2 * M_rad)
+        eq_time = 4 * np.degrees(eq_time)  # w minutach
+        
+        return dec, eq_time
+
+class RouteSunGeometry:
+    """
+    Sinus wysokości słońca wzdłuż ciągłej trasy jako funkcja czasu lotu w postaci zamkniętej
+    
+    Samolot leci po wielkim kole P(t) = A cos θ(t) + B sin θ(t), gdzie A to wektor
+    lotniska wylotu, B - prostopadły do niego wektor w płaszczyźnie trasy, a kąt θ(t)
+    jest liniowy w każdej fazie lotu. Punkt podsłoneczny S(t) przesuwa się o 15° na
+    godzinę, a jego deklinację i równanie czasu (zmieniające się o ułamki stopnia na dobę)
+    interpolujemy liniowo między wylotem a przylotem. Wtedy sin(wysokości) = P(t)·S(t),
+    czyli kilka funkcji trygonometrycznych (math, na liczbach) na jedną wartość. NumPy
+    jest używany tylko w konstruktorze - do odczytu efemeryd na początek i koniec lotu.
+    """
+    
+    def __init__(self,
+                 route: RouteArrays,
+                 phase_segments: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 departure_epoch: float,
+                 ephemeris: SolarEphemeris):
+        self.knots, fraction_start, fraction_rate = phase_segments
+        self.knots = self.knots.tolist()
+        dep_lat, dep_lon, arr_lat, arr_lon = route.endpoints
+        
+        a = self._unit_vector(dep_lat, dep_lon)
+        c = self._unit_vector(arr_lat, arr_lon)
+        cos_d = min(1.0, max(-1.0, sum(x * y for x, y in zip(a, c))))
+        angle = math.acos(cos_d)
+        sin_d = math.sin(angle)
+        self.a = a
+        # ten sam punkt - trasa zerowej długości (samolot stoi w miejscu)
+        self.b = tuple((y - x * cos_d) / sin_d for x, y in zip(a, c)) if sin_d > 1e-12 else (0.0, 0.0, 0.0)
+        
+        # kąt θ w każdej fazie: theta_start + theta_rate * (t - początek fazy)
+        self.theta_start = [float(f) * angle for f in fraction_start]
+        self.theta_rate = [float(r) * angle for r in fraction_rate]
+        
+        duration = float(self.knots[-1])
+        (dec_start, dec_end), (eq_start, eq_end) = ephemeris.lookup(
+            np.array([departure_epoch, departure_epoch + duration * 3600.0])
+        )
+        self.dec_start = float(dec_start)
+        self.dec_rate = float(dec_end - dec_start) / duration if duration > 0 else 0.0
+        eq_time_rate = float(eq_end - eq_start) / duration if duration > 0 else 0.0
+        # długość geograficzna punktu podsłonecznego w radianach (kąt godzinny = długość - ta wartość)
+        utc_hours = (departure_epoch % 86400.0) / 3600.0
+        self.subsolar_start = -math.radians(15.0 * (utc_hours - 12.0 + float(eq_start) / 60.0))
+        self.subsolar_rate = -math.radians(15.0 * (1.0 + eq_time_rate / 60.0))
+    
+    @staticmethod
+    def _unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+        lat_rad, lon_rad = math.radians(lat), math.radians(lon)
+        return (math.cos(lat_rad) * math.cos(lon_rad), math.cos(lat_rad) * math.sin(lon_rad), math.sin(lat_rad))
+    
+    @property
+    def segments(self) -> int:
+        return len(self.theta_start)
+    
+    
+    def angular_speed(self, segment: int) -> float:
+        """Prędkość kątowa samolotu w fazie (radiany łuku na godzinę)"""
+        return abs(self.theta_rate[segment])
+    
+    def subsolar_speed(self) -> float:
+        """Prędkość kątowa punktu podsłonecznego (radiany łuku na godzinę)"""
+        return math.hypot(self.subsolar_rate, self.dec_rate)
+    
+    def position(self, time_offset: float, segment: int) -> Tuple[float, float]:
+        """Szerokość i długość geograficzna samolotu (jak RouteArrays.position_at)"""
+        theta = self.theta_start[segment] + self.theta_rate[segment] * (time_offset - self.knots[segment])
+        cos_t, sin_t = math.cos(theta), math.sin(theta)
+        x, y, z = (a * cos_t + b * sin_t for a, b in zip(self.a, self.b))
+        return math.degrees(math.atan2(z, math.hypot(x, y))), math.degrees(math.atan2(y, x))
+    
+    def sin_altitude(self, time_offset: float, segment: int) -> float:
+        """
+        Sinus wysokości słońca nad samolotem
+        
+        Args:
+            time_offset: Czas od wylotu w godzinach
+            segment: Indeks fazy lotu, której ruch jest używany (na granicy faz - lewa lub prawa)
+        """
+        theta = self.theta_start[segment] + self.theta_rate[segment] * (time_offset - self.knots[segment])
+        cos_t, sin_t = math.cos(theta), math.sin(theta)
+        a, b = self.a, self.b
+        dec = self.dec_start + self.dec_rate * time_offset
+        subsolar = self.subsolar_start + self.subsolar_rate * time_offset
+        cos_dec = math.cos(dec)
+        return ((a[0] * cos_t + b[0] * sin_t) * cos_dec * math.cos(subsolar) +
+                (a[1] * cos_t + b[1] * sin_t) * cos_dec * math.sin(subsolar) +
+                (a[2] * cos_t + b[2] * sin_t) * math.sin(dec))
 
 class SunCalculationService:
     """Serwis do obliczania pozycji słońca bez zależności od skyfield"""
     
+    # efemerydy dzienne współdzielone przez wszystkie instancje serwisu
+    _ephemeris = SolarEphemeris(settings.EPHEMERIS_CACHE_DAYS)
+    
+    # zapas ograniczenia tempa zmian wysokości słońca (błędy zaokrągleń)
+    TERMINATOR_RATE_MARGIN = 1.05
+    
     def __init__(self):
         pass
     
@@ -41,113 +278,459 @@ class SunCalculationService:
             is_visible=is_visible
         )
     
-    def _calculate_sun_position(self, lat: float, lon: float, dt: datetime) -> Tuple[float, float]:
+    def calculate_sun_positions(self,
+                                lats: np.ndarray,
+                                lons: np.ndarray,
+                                epochs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Oblicza wysokość i azymut słońca używając algorytmu astronomicznego
-        https://en.wikipedia.org/wiki/Position_of_the_Sun
+        Wektorowo oblicza pozycję słońca dla wielu punktów naraz
+        
+        Args:
+            lats: Tablica szerokości geograficznych w stopniach
+            lons: Tablica długości geograficznych w stopniach
+            epochs: Tablica czasów jako sekundy od 1970-01-01 UTC (Unix epoch)
         
         Returns:
-            (wysokość w stopniach, azymut w stopniach)
+            (tablica wysokości w stopniach, tablica azymutów w stopniach)
         """
-        lat_rad = math.radians(lat)
-        
-        # Oblicz dzień juliański
-        # Formuła ze strony: https://en.wikipedia.org/wiki/Julian_day
-        year = dt.year
-        month = dt.month
-        day = dt.day
-        
-        if month <= 2:
-            year = year - 1
-            month = month + 12
-            
-        A = math.floor(year / 100)
-        B = 2 - A + math.floor(A / 4)
-        jd = math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + B - 1524.5
+        lats, lons, epochs = np.broadcast_arrays(
+            np.asarray(lats, dtype=float),
+            np.asarray(lons, dtype=float),
+            np.asarray(epochs, dtype=float)
+        )
+        lat_rad = np.radians(lats)
         
-        # czas
-        jd += (dt.hour - 12) / 24.0 + dt.minute / 1440.0 + dt.second / 86400.0
+        # deklinacja i równanie czasu z efemeryd dziennych (zależą tylko od czasu)
+        dec, eq_time = self._ephemeris.lookup(epochs)
         
-        # czas od epoki J2000.0
-        t = (jd - 2451545.0) / 36525.0
+        # kąt godzinny
+        solar_noon = 12 - eq_time / 60  # w godzinach
+        curr_time = (epochs % 86400.0) / 3600.0
+        hour_angle = 15 * (curr_time - solar_noon) + lons  # 15 stopni na godzinę
+        hour_angle_rad = np.radians(hour_angle)
         
-        # srednia długość słońca
-        L0 = 280.46646 + 36000.76983 * t + 0.0003032 * t**2
-        L0 = L0 % 360
+        # wysokość słońca
+        sin_elevation = (np.sin(lat_rad) * np.sin(dec) +
+                         np.cos(lat_rad) * np.cos(dec) * np.cos(hour_angle_rad))
+        elevation = np.arcsin(np.clip(sin_elevation, -1.0, 1.0))
+        
+        # azymut słońca (na biegunach mianownik jest zerowy - azymut 0)
+        denominator = np.cos(elevation) * np.cos(lat_rad)
+        cos_azimuth = np.divide(
+            np.sin(dec) - np.sin(elevation) * np.sin(lat_rad),
+            denominator,
+            out=np.ones_like(denominator),
+            where=denominator != 0
+        )
+        azimuth = np.arccos(np.clip(cos_azimuth, -1.0, 1.0))
+        azimuth = np.where(hour_angle > 0, 2 * np.pi - azimuth, azimuth)
         
-        # srednia anomalia słońca
-        M = 357.52911 + 35999.05029 * t - 0.0001537 * t**2
-        M = M % 360
-        M_rad = math.radians(M)
+        # konwersja na stopnie
+        return np.degrees(elevation), np.degrees(azimuth)
+    
+    def _calculate_sun_position(self, lat: float, lon: float, dt: datetime) -> Tuple[float, float]:
+        """
+        Oblicza wysokość i azymut słońca używając algorytmu astronomicznego
+        https://en.wikipedia.org/wiki/Position_of_the_Sun
         
-        # równanie środka dla słońca
-        C = (1.914602 - 0.004817 * t - 0.000014 * t**2) * math.sin(M_rad)
-        C += (0.019993 - 0.000101 * t) * math.sin(2 * M_rad)
-        C += 0.000289 * math.sin(3 * M_rad)
+        Cienka nakładka na calculate_sun_positions dla pojedynczego punktu.
         
-        # rzeczywistą długość słońca
-        L = L0 + C
+        Returns:
+            (wysokość w stopniach, azymut w stopniach)
+        """
+        altitude, azimuth = self.calculate_sun_positions(
+            np.array([lat]), np.array([lon]), np.array([self._to_epoch(dt)])
+        )
+        return float(altitude[0]), float(azimuth[0])
         
-        # deklinację słońca
-        obliquity = 23.439 - 0.0000004 * t
-        obliquity_rad = math.radians(obliquity)
-        L_rad = math.radians(L)
+    @staticmethod
+    def _to_epoch(dt: datetime) -> float:
+        """Zamienia datetime na sekundy od Unix epoch (czas bez strefy traktowany jako UTC)"""
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=pytz.UTC)
+        return dt.timestamp()
+    
+    def build_sun_table(self,
+                        route_points: List[FlightRoutePoint],
+                        departure_time: datetime,
+                        route: Optional[RouteArrays] = None) -> SunTable:
+        """
+        Oblicza pozycje słońca dla wszystkich punktów trasy w jednym wywołaniu
         
-        dec = math.asin(math.sin(obliquity_rad) * math.sin(L_rad))
+        Args:
+            route_points: Lista punktów trasy
+            departure_time: Czas wylotu
+            route: Trasa w postaci tablic (opcjonalnie, pomija konwersję z listy punktów)
         
-        # równanie czasu
-        y = math.tan(obliquity_rad / 2) ** 2
-        eq_time = y * math.sin(2 * math.radians(L0)) - 2 * math.sin(M_rad)
-        eq_time += 4 * y * math.sin(M_rad) * math.cos(2 * math.radians(L0))
-        eq_time -= 0.5 * y * y * math.sin(4 * math.radians(L0))
-        eq_time = 4 * math.degrees(eq_time)  # w minutach
+        Returns:
+            SunTable z wysokością i azymutem słońca dla każdego punktu trasy
+        """
+        if route is not None:
+            latitude, longitude, time_offset = route.latitude, route.longitude, route.time_offset
+        else:
+            latitude = np.array([p.latitude for p in route_points], dtype=float)
+            longitude = np.array([p.longitude for p in route_points], dtype=float)
+            time_offset = np.array([p.time_from_departure for p in route_points], dtype=float)
         
-        # kąt godzinny
-        solar_noon = 12 - eq_time / 60  # w godzinach
+        epochs = self._to_epoch(departure_time) + time_offset * 3600.0
+        altitude, azimuth = self.calculate_sun_positions(latitude, longitude, epochs)
         
-        curr_time = dt.hour + dt.minute / 60.0 + dt.second / 3600.0
-        hour_angle = 15 * (curr_time - solar_noon)  # 15 stopni na godzinę
+        return SunTable(altitude, azimuth, epochs, latitude, longitude)
+    
+    def build_sun_tables(self,
+                         routes: List[RouteArrays],
+                         departure_times: List[datetime]) -> List[SunTable]:
+        """
+        Oblicza tablice pozycji słońca dla wielu lotów jednym wywołaniem wektorowym
         
-        # długość geograficzna
-        hour_angle = hour_angle + lon
-        hour_angle_rad = math.radians(hour_angle)
+        Args:
+            routes: Trasy lotów w postaci tablic
+            departure_times: Czasy wylotu (w tej samej kolejności co trasy)
         
-        # wysokość słońca
-        elevation = math.asin(math.sin(lat_rad) * math.sin(dec) + 
-                             math.cos(lat_rad) * math.cos(dec) * math.cos(hour_angle_rad))
+        Returns:
+            Lista SunTable w kolejności tras
+        """
+        if not routes:
+            return []
+        
+        latitude = np.concatenate([route.latitude for route in routes])
+        longitude = np.concatenate([route.longitude for route in routes])
+        epochs = np.concatenate([
+            self._to_epoch(departure_time) + route.time_offset * 3600.0
+            for route, departure_time in zip(routes, departure_times)
+        ])
+        altitude, azimuth = self.calculate_sun_positions(latitude, longitude, epochs)
+        
+        tables = []
+        start = 0
+        for route in routes:
+            end = start + len(route)
+            tables.append(SunTable(
+                altitude[start:end], azimuth[start:end], epochs[start:end],
+                latitude[start:end], longitude[start:end]
+            ))
+            start = end
+        
+        return tables
+    
+    def sun_grid(self,
+                 route: RouteArrays,
+                 departure_epochs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pozycje słońca dla siatki: wiele godzin wylotu × punkty tej samej trasy
         
-        # azymut słońca
-        azimuth = math.acos((math.sin(dec) - math.sin(elevation) * math.sin(lat_rad)) / 
-                          (math.cos(elevation) * math.cos(lat_rad)))
+        Geometria trasy nie zależy od czasu wylotu, więc wszystkie kandydatury liczone
+        są jednym wywołaniem wektorowym (wiersz - godzina wylotu, kolumna - punkt trasy).
         
-        if hour_angle > 0:
-            azimuth = 2 * math.pi - azimuth
-            
-        # konwersaja na stopnie
-        elevation_deg = math.degrees(elevation)
-        azimuth_deg = math.degrees(azimuth)
+        Args:
+            route: Trasa lotu w postaci tablic
+            departure_epochs: Czasy wylotu jako sekundy od Unix epoch
         
-        return elevation_deg, azimuth_deg
+        Returns:
+            (wysokości, azymuty, czasy punktów) - tablice o kształcie (wyloty, punkty trasy)
+        """
+        epochs = np.asarray(departure_epochs, dtype=float)[:, None] + route.time_offset[None, :] * 3600.0
+        altitude, azimuth = self.calculate_sun_positions(route.latitude[None, :], route.longitude[None, :], epochs)
+        return altitude, azimuth, epochs
     
     def get_sun_events_for_flight(self, 
                                  route_points: List[FlightRoutePoint], 
-                                 departure_time: datetime) -> List[SunEventTime]:
+                                 departure_time: datetime,
+                                 route: Optional[RouteArrays] = None,
+                                 sun_table: Optional[SunTable] = None,
+                                 default_events: bool = True) -> List[SunEventTime]:
         """
         Identyfikuje czasy wschodu i zachodu słońca podczas lotu
         
+        Z ciągłą geometrią trasy wydarzenia wyznacza find_terminator_crossings - podział
+        przedziałów z ograniczeniem Lipschitza do rozdzielczości SUN_TERMINATOR_RESOLUTION_SECONDS
+        i metoda Brenta (koszt rośnie z liczbą przecięć), bez niej - próbkowanie punktów trasy.
+        
         Args:
             route_points: Lista punktów trasy
             departure_time: Czas wylotu
+            route: Trasa w postaci tablic (opcjonalnie) - pozwala wyznaczyć
+                dokładne czasy przecięcia horyzontu na ciągłej trasie
+            sun_table: Pozycje słońca dla punktów trasy (opcjonalnie, z build_sun_table) -
+                używane tylko bez ciągłej geometrii trasy
+            default_events: Czy bez znalezionych wydarzeń dodać domyślny wschód (6:00)
+                i zachód (20:00), jeśli wypadają w czasie lotu (jak dotychczas)
             
         Returns:
             Lista obiektów SunEventTime z informacjami o wschodach/zachodach
         """
-        result = []
-        
         # czas końca lotu
         flight_duration_hours = route_points[-1].time_from_departure
         arrival_time = departure_time + timedelta(hours=flight_duration_hours)
         
+        if route is not None:
+            # ciągła trasa - przecięcia terminatora (tablica słońca tylko dla trasy bez geometrii faz)
+            result = self.find_terminator_crossings(route, departure_time, sun_table=sun_table)
+        else:
+            if sun_table is None:
+                sun_table = self.build_sun_table(route_points, departure_time)
+            result = self._find_sampled_sun_events(route_points, departure_time, sun_table)
+        
+        # Domyślny wschód/zachód
+        if not result and default_events:
+            # domyslnie schód słońca około 6:00 rano
+            sunrise_time = departure_time.replace(hour=6, minute=0, second=0)
+            if departure_time <= sunrise_time <= arrival_time:
+                result.append(SunEventTime(
+                    event_type="sunrise",
+                    event_time=sunrise_time,
+                    is_visible_during_flight=True,
+                    event_location={
+                        "latitude": route_points[0].latitude,
+                        "longitude": route_points[0].longitude
+                    }
+                ))
+            
+            # domyslnie zachod słońca około 20:00 wieczorem
+            sunset_time = departure_time.replace(hour=20, minute=0, second=0)
+            if departure_time <= sunset_time <= arrival_time:
+                result.append(SunEventTime(
+                    event_type="sunset",
+                    event_time=sunset_time,
+                    is_visible_during_flight=True,
+                    event_location={
+                        "latitude": route_points[-1].latitude,
+                        "longitude": route_points[-1].longitude
+                    }
+                ))
+        
+        return result
+    
+    def find_sun_crossings(self,
+                           route: RouteArrays,
+                           departure_time: datetime,
+                           tolerance_seconds: Optional[float] = None,
+                           sun_table: Optional[SunTable] = None) -> List[SunEventTime]:
+        """
+        Znajduje wschody i zachody słońca wzdłuż ciągłej trasy lotu
+        
+        Zmiany znaku wysokości słońca są wyszukiwane na punktach trasy (jedno
+        wywołanie wektorowe), a każde przecięcie horyzontu jest doprecyzowane
+        metodą Brenta na ciągłej trasie do zadanej tolerancji.
+        
+        Args:
+            route: Trasa lotu w postaci tablic
+            departure_time: Czas wylotu
+            tolerance_seconds: Tolerancja czasu wydarzenia w sekundach
+                (domyślnie settings.SUN_EVENT_TOLERANCE_SECONDS)
+            sun_table: Pozycje słońca dla punktów trasy (opcjonalnie)
+        
+        Returns:
+            Lista obiektów SunEventTime w kolejności chronologicznej
+        """
+        if tolerance_seconds is None:
+            tolerance_seconds = settings.SUN_EVENT_TOLERANCE_SECONDS
+        
+        departure_epoch = self._to_epoch(departure_time)
+        
+        def altitude_at(time_offset: float) -> float:
+            lat, lon, _ = route.position_at(time_offset)
+            altitude, _ = self.calculate_sun_positions(lat, lon, departure_epoch + time_offset * 3600.0)
+            return float(altitude)
+        
+        if sun_table is None:
+            sun_table = self.build_sun_table([], departure_time, route)
+        altitudes = sun_table.altitude
+        visible = sun_table.is_visible
+        
+        result = []
+        for i in np.flatnonzero(visible[:-1] != visible[1:]):
+            time_offset = self._brent_root(
+                altitude_at,
+                float(route.time_offset[i]), float(route.time_offset[i + 1]),
+                float(altitudes[i]), float(altitudes[i + 1]),
+                tolerance_seconds / 3600.0
+            )
+            lat, lon, _ = route.position_at(time_offset)
+            result.append(self._crossing_event(departure_time, time_offset, bool(visible[i + 1]), (lat, lon)))
+        
+        return result
+    
+    def find_terminator_crossings(self,
+                                  route: RouteArrays,
+                                  departure_time: datetime,
+                                  tolerance_seconds: Optional[float] = None,
+                                  sun_table: Optional[SunTable] = None) -> List[SunEventTime]:
+        """
+        Znajduje wszystkie przecięcia terminatora (dzień/noc) przez ciągłą trasę lotu
+        
+        Sinus wysokości słońca to iloczyn skalarny wektora samolotu i punktu podsłonecznego
+        (RouteSunGeometry), więc zmienia się nie szybciej niż suma ich prędkości kątowych -
+        stałej w każdej fazie lotu. Z tego ograniczenia (stałej Lipschitza L) przedział bez
+        zmiany znaku jest wykluczany, gdy |f(a)| + |f(b)| > L * (b - a). Pozostałe przedziały
+        są dzielone na pół aż do rozdzielczości SUN_TERMINATOR_RESOLUTION_SECONDS, a przedziały
+        ze zmianą znaku doprecyzowane metodą Brenta. Znajduje więc także wielokrotne
+        przecięcia (loty polarne, słońce tuż przy horyzoncie), których nie widać na punktach trasy.
+        
+        Na krótkich trasach (wznoszenie i opadanie dłuższe niż lot) pozycja skacze na granicy
+        faz - zmiana znaku między końcem jednego odcinka a początkiem następnego daje
+        wydarzenie w chwili granicy, tak jak w find_sun_crossings.
+        
+        Koszt nie jest stały: liczba wartości f rośnie z liczbą przecięć i odcinków, na
+        których słońce jest blisko horyzontu (każdy wymaga podziału do rozdzielczości,
+        około log2(czas lotu / rozdzielczość) wartości, i kilku kroków Brenta), a maleje
+        ze wzrostem SUN_TERMINATOR_RESOLUTION_SECONDS. Przy 60 s: kilka wartości dla lotu
+        bez przecięć, około stu dla lotu polarnego z dwoma przecięciami.
+        
+        Args:
+            route: Trasa lotu w postaci tablic
+            departure_time: Czas wylotu
+            tolerance_seconds: Tolerancja czasu wydarzenia w sekundach
+                (domyślnie settings.SUN_EVENT_TOLERANCE_SECONDS)
+            sun_table: Pozycje słońca dla punktów trasy (używane tylko przez próbkowanie)
+        
+        Returns:
+            Lista obiektów SunEventTime w kolejności chronologicznej
+        """
+        phase_segments = route.phase_segments()
+        if phase_segments is None:
+            # trasa bez ciągłej geometrii - zmiany znaku na punktach trasy
+            return self.find_sun_crossings(route, departure_time, tolerance_seconds, sun_table)
+        
+        if tolerance_seconds is None:
+            tolerance_seconds = settings.SUN_EVENT_TOLERANCE_SECONDS
+        resolution = settings.SUN_TERMINATOR_RESOLUTION_SECONDS / 3600.0
+        geometry = RouteSunGeometry(route, phase_segments, self._to_epoch(departure_time), self._ephemeris)
+        
+        result = []
+        previous_end = None
+        for segment in range(geometry.segments):
+            rate = (geometry.angular_speed(segment) + geometry.subsolar_speed()) * self.TERMINATOR_RATE_MARGIN
+            
+            def sin_altitude(time_offset: float, segment: int = segment) -> float:
+                return geometry.sin_altitude(time_offset, segment)
+            
+            start, end = float(geometry.knots[segment]), float(geometry.knots[segment + 1])
+            f_start, f_end = sin_altitude(start), sin_altitude(end)
+            if previous_end is not None and (previous_end > 0) != (f_start > 0):
+                # skok pozycji na granicy faz (krótkie loty) - wydarzenie w chwili granicy
+                result.append(self._crossing_event(
+                    departure_time, start, f_start > 0, geometry.position(start, segment)
+                ))
+            previous_end = f_end
+            
+            # przedziały do sprawdzenia - od najwcześniejszego (stos: lewa połowa na wierzchu)
+            pending = [(start, end, f_start, f_end)]
+            while pending:
+                a, b, fa, fb = pending.pop()
+                if (fa > 0) != (fb > 0):
+                    if b - a <= resolution:
+                        time_offset = self._brent_root(sin_altitude, a, b, fa, fb, tolerance_seconds / 3600.0)
+                        result.append(self._crossing_event(
+                            departure_time, time_offset, fb > 0, geometry.position(time_offset, segment)
+                        ))
+                        continue
+                elif abs(fa) + abs(fb) > rate * (b - a) or b - a <= resolution:
+                    # bez zmiany znaku: przecięcie wykluczone (lub para przecięć krótsza od rozdzielczości)
+                    continue
+                mid = (a + b) / 2
+                f_mid = sin_altitude(mid)
+                pending.append((mid, b, f_mid, fb))
+                pending.append((a, mid, fa, f_mid))
+        
+        return result
+    
+    def _crossing_event(self,
+                        departure_time: datetime,
+                        time_offset: float,
+                        rising: bool,
+                        location: Tuple[float, float]) -> SunEventTime:
+        """Wschód lub zachód słońca w chwili time_offset (godziny od wylotu) w punkcie trasy location"""
+        lat, lon = location
+        return SunEventTime(
+            event_type="sunrise" if rising else "sunset",
+            event_time=departure_time + timedelta(hours=time_offset),
+            is_visible_during_flight=True,
+            event_location={
+                "latitude": float(lat),
+                "longitude": float(lon)
+            }
+        )
+    
+    @staticmethod
+    def _brent_root(f: Callable[[float], float],
+                    a: float, b: float,
+                    fa: float, fb: float,
+                    xtol: float,
+                    max_iter: int = 100) -> float:
+        """
+        Znajduje miejsce zerowe funkcji w przedziale [a, b] metodą Brenta
+        
+        Args:
+            f: Funkcja jednej zmiennej
+            a, b: Końce przedziału, w którym f zmienia znak
+            fa, fb: Wartości f(a) i f(b) (już policzone)
+            xtol: Tolerancja położenia miejsca zerowego
+            max_iter: Maksymalna liczba iteracji
+        
+        Returns:
+            Przybliżenie miejsca zerowego
+        """
+        if fa == 0:
+            return a
+        if fb == 0:
+            return b
+        
+        x_pre, x_cur = a, b
+        f_pre, f_cur = fa, fb
+        x_blk, f_blk = 0.0, 0.0
+        s_pre = s_cur = 0.0
+        
+        for _ in range(max_iter):
+            if f_pre * f_cur < 0:
+                # przedział z gwarantowaną zmianą znaku
+                x_blk, f_blk = x_pre, f_pre
+                s_pre = s_cur = x_cur - x_pre
+            if abs(f_blk) < abs(f_cur):
+                x_pre, x_cur, x_blk = x_cur, x_blk, x_cur
+                f_pre, f_cur, f_blk = f_cur, f_blk, f_cur
+            
+            delta = xtol / 2
+            s_bis = (x_blk - x_cur) / 2
+            if f_cur == 0 or abs(s_bis) < delta:
+                return x_cur
+            
+            if abs(s_pre) > delta and abs(f_cur) < abs(f_pre):
+                if x_pre == x_blk:
+                    # interpolacja liniowa (metoda siecznych)
+                    s_try = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+                else:
+                    # odwrotna interpolacja kwadratowa
+                    d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+                    d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+                    s_try = -f_cur * (f_blk * d_blk - f_pre * d_pre) / (d_blk * d_pre * (f_blk - f_pre))
+                
+                if 2 * abs(s_try) < min(abs(s_pre), 3 * abs(s_bis) - delta):
+                    s_pre, s_cur = s_cur, s_try
+                else:
+                    s_pre = s_cur = s_bis
+            else:
+                s_pre = s_cur = s_bis
+            
+            x_pre, f_pre = x_cur, f_cur
+            if abs(s_cur) > delta:
+                x_cur += s_cur
+            else:
+                x_cur += delta if s_bis > 0 else -delta
+            f_cur = f(x_cur)
+        
+        return x_cur
+    
+    def _find_sampled_sun_events(self,
+                                 route_points: List[FlightRoutePoint],
+                                 departure_time: datetime,
+                                 sun_table: SunTable) -> List[SunEventTime]:
+        """
+        Wyszukuje wschody/zachody na punktach trasy z interpolacją liniową
+        (gdy nie ma ciągłej geometrii trasy)
+        """
+        result = []
+        
         # każdy punkt trasy pod kątem potencjalnych wschodów/zachodów
         for i in range(len(route_points) - 1):
             point = route_points[i]
@@ -157,27 +740,17 @@ class SunCalculationService:
             current_time = departure_time + timedelta(hours=point.time_from_departure)
             next_time = departure_time + timedelta(hours=next_point.time_from_departure)
             
-            # pozycja słońca dla bieżącego punktu
-            current_sun = self.calculate_sun_position(
-                point.latitude, 
-                point.longitude, 
-                point.altitude,
-                current_time
-            )
-            
-            # pozycja słońca dla następnego punktu
-            next_sun = self.calculate_sun_position(
-                next_point.latitude, 
-                next_point.longitude, 
-                next_point.altitude,
-                next_time
-            )
+            # wysokość słońca dla bieżącego i następnego punktu (z tablicy)
+            current_altitude = float(sun_table.altitude[i])
+            next_altitude = float(sun_table.altitude[i + 1])
+            current_visible = current_altitude > 0
+            next_visible = next_altitude > 0
             
             # czy nastapil wschod (zmiana z niewidocznego na widoczne)
-            if not current_sun.is_visible and next_sun.is_visible:
+            if not current_visible and next_visible:
                 event_time = self._interpolate_sun_event_time(
                     current_time, next_time, 
-                    current_sun.altitude, next_sun.altitude,
+                    current_altitude, next_altitude,
                     0.0  
                 )
                 
@@ -198,10 +771,10 @@ class SunCalculationService:
                 ))
                 
             # czy nastapil zachod (zmiana z widocznego na niewidoczne)
-            elif current_sun.is_visible and not next_sun.is_visible:
+            elif current_visible and not next_visible:
                 event_time = self._interpolate_sun_event_time(
                     current_time, next_time, 
-                    current_sun.altitude, next_sun.altitude,
+                    current_altitude, next_altitude,
                     0.0  
                 )
                 
@@ -221,34 +794,6 @@ class SunCalculationService:
                     }
                 ))
         
-        # Domyślny wschód/zachód
-        if not result:
-            # domyslnie schód słońca około 6:00 rano
-            sunrise_time = departure_time.replace(hour=6, minute=0, second=0)
-            if departure_time <= sunrise_time <= arrival_time:
-                result.append(SunEventTime(
-                    event_type="sunrise",
-                    event_time=sunrise_time,
-                    is_visible_during_flight=True,
-                    event_location={
-                        "latitude": route_points[0].latitude,
-                        "longitude": route_points[0].longitude
-                    }
-                ))
-            
-            # domyslnie zachod słońca około 20:00 wieczorem
-            sunset_time = departure_time.replace(hour=20, minute=0, second=0)
-            if departure_time <= sunset_time <= arrival_time:
-                result.append(SunEventTime(
-                    event_type="sunset",
-                    event_time=sunset_time,
-                    is_visible_during_flight=True,
-                    event_location={
-                        "latitude": route_points[-1].latitude,
-                        "longitude": route_points[-1].longitude
-                    }
-                ))
-        
         return result
     
     def _interpolate_sun_event_time(self, 
@@ -304,9 +849,67 @@ class SunCalculationService:
         # Interpolacja liniowa
         return val1 + fraction * (val2 - val1)
     
+    def viewing_scores(self,
+                       altitude: np.ndarray,
+                       latitude: np.ndarray,
+                       longitude: np.ndarray,
+                       epochs: np.ndarray,
+                       preference: str) -> np.ndarray:
+        """
+        Ocena punktów trasy do obserwacji wschodu/zachodu słońca (bez pogody)
+        
+        Punkty trasy leżą wzdłuż ostatniej osi, więc ta sama ocena działa dla jednego
+        lotu (tablice 1D) i dla siatki wielu godzin wylotu (tablice 2D z sun_grid).
+        
+        Args:
+            altitude: Wysokości słońca w punktach trasy
+            latitude, longitude: Współrzędne punktów (rozgłaszane do kształtu altitude)
+            epochs: Czasy punktów jako sekundy od Unix epoch
+            preference: "sunrise" lub "sunset"
+        
+        Returns:
+            Tablica ocen o kształcie altitude
+        """
+        optimal_altitude = 5.0  # optymalna wysokość słońca (5 stopni nad horyzontem)
+        altitude_range = 10.0   # zakres oceny (do +/- 10 stopni od optymalnej)
+        
+        # słońce widoczne - ocena według odległości od optymalnej wysokości
+        distance_from_optimal = np.abs(altitude - optimal_altitude)
+        scores = np.where(
+            distance_from_optimal <= altitude_range,
+            100.0 * (1.0 - distance_from_optimal / altitude_range),
+            np.maximum(0.0, 50.0 - distance_from_optimal)
+        )
+        
+        # Preferencje dla fazy (wschód/zachód) - bonus za rosnącą/malejącą wysokość
+        inner = np.zeros(altitude.shape[-1], dtype=bool)
+        inner[1:-1] = True
+        previous_altitude = np.roll(altitude, 1, axis=-1)
+        if preference == "sunrise":
+            trend_bonus = inner & (altitude > previous_altitude)
+        else:
+            trend_bonus = inner & (altitude < previous_altitude)
+        scores = scores + np.where(trend_bonus, 20.0, 0.0)
+        
+        # słońce niewidoczne - sprawdź, czy będzie widoczne za 30 minut (wschód)
+        # lub czy było widoczne 30 minut wcześniej (zachód); jedno wywołanie dla wszystkich punktów
+        hidden = altitude <= 0
+        if hidden.any():
+            shift = 1800.0 if preference == "sunrise" else -1800.0
+            shifted_altitude, _ = self.calculate_sun_positions(
+                np.broadcast_to(latitude, altitude.shape)[hidden],
+                np.broadcast_to(longitude, altitude.shape)[hidden],
+                np.broadcast_to(epochs, altitude.shape)[hidden] + shift
+            )
+            scores[hidden] = np.where(shifted_altitude > 0, 80.0, -10.0)
+        
+        return scores
+    
     def find_sun_events(self, route_points: List[FlightRoutePoint], 
                         departure_time: datetime,
-                        preference: str) -> Tuple[int, SunPositionData]:
+                        preference: str,
+                        sun_table: Optional[SunTable] = None,
+                        weather_scores: Optional[np.ndarray] = None) -> Tuple[int, SunPositionData]:
         """
         Znajduje najlepszy moment dla obserwacji wschodu/zachodu słońca
         podczas lotu
@@ -315,106 +918,28 @@ class SunCalculationService:
             route_points: Lista punktów trasy lotu
             departure_time: Czas wylotu
             preference: "sunrise" lub "sunset"
+            sun_table: Pozycje słońca dla punktów trasy (opcjonalnie, z build_sun_table)
+            weather_scores: Ocena warunków pogodowych 0-100 dla każdego punktu trasy (opcjonalnie).
+                Skalowane są tylko dodatnie oceny punktów - gdy żaden punkt nie ma dodatniej
+                oceny (np. słońce niewidoczne na całej trasie), pogoda nie zmienia wyboru.
         
         Returns:
             Indeks najlepszego punktu i dane pozycji słońca
         """
-        best_point_idx = -1
-        best_score = -float('inf')
-        best_sun_position = None
-        
-        optimal_altitude = 5.0  # optymalna wysokość słońca (5 stopni nad horyzontem)
-        altitude_range = 10.0   # zakres oceny (do +/- 10 stopni od optymalnej)
+        if sun_table is None:
+            sun_table = self.build_sun_table(route_points, departure_time)
         
-        for i, point in enumerate(route_points):
-            point_time = departure_time + timedelta(hours=point.time_from_departure)
-            
-            # Oblicz pozycję słońca
-            sun_pos = self.calculate_sun_position(
-                point.latitude, 
-                point.longitude, 
-                point.altitude,
-                point_time
-            )
-            
-            # czy słońce jest widoczne
-            if not sun_pos.is_visible and preference == "sunrise":
-               
-                future_time = point_time + timedelta(minutes=30)
-                future_sun_pos = self.calculate_sun_position(
-                    point.latitude, point.longitude, point.altitude, future_time
-                )
-                
-                if future_sun_pos.is_visible:
-                    score = 80.0
-                else:
-                    # Słońce nie będzie widoczne wkrótce
-                    score = -10.0
-            elif not sun_pos.is_visible and preference == "sunset":
-                past_time = point_time - timedelta(minutes=30)
-                past_sun_pos = self.calculate_sun_position(
-                    point.latitude, point.longitude, point.altitude, past_time
-                )
-                
-                if past_sun_pos.is_visible:
-                    # Jeśli słońce było widoczne w ciągu ostatnich 30 minut, daj temu punktowi wysoką ocenę
-                    score = 80.0
-                else:
-                    # Słońce nie było widoczne wcześniej
-                    score = -10.0
-            else:
-                altitude = sun_pos.altitude
-                
-                distance_from_optimal = abs(altitude - optimal_altitude)
-                
-                if distance_from_optimal <= altitude_range:
-                    score = 100.0 * (1.0 - distance_from_optimal / altitude_range)
-                else:
-                    score = max(0.0, 50.0 - distance_from_optimal)
-                
-                # Preferencje dla fazy (wschód/zachód)
-                if preference == "sunrise" and i > 0 and i < len(route_points) - 1:
-                    prev_time = departure_time + timedelta(hours=route_points[i-1].time_from_departure)
-                    prev_sun_pos = self.calculate_sun_position(
-                        route_points[i-1].latitude, 
-                        route_points[i-1].longitude, 
-                        route_points[i-1].altitude,
-                        prev_time
-                    )
-                    
-                    # Bonus za rosnącą wysokość
-                    if sun_pos.altitude > prev_sun_pos.altitude:
-                        score += 20.0
-                    
-                elif preference == "sunset" and i > 0 and i < len(route_points) - 1:
-                    prev_time = departure_time + timedelta(hours=route_points[i-1].time_from_departure)
-                    prev_sun_pos = self.calculate_sun_position(
-                        route_points[i-1].latitude, 
-                        route_points[i-1].longitude, 
-                        route_points[i-1].altitude,
-                        prev_time
-                    )
-                    
-                    # Bonus za malejącą wysokość
-                    if sun_pos.altitude < prev_sun_pos.altitude:
-                        score += 20.0
+        count = len(sun_table)
+        scores = self.viewing_scores(
+            sun_table.altitude, sun_table.latitude, sun_table.longitude, sun_table.epochs, preference
+        )
             
-            # Aktualizuj najlepszy punkt
-            if score > best_score:
-                best_score = score
-                best_point_idx = i
-                best_sun_position = sun_pos
-        
-        if best_point_idx == -1:
-            best_point_idx = 0
-            point_time = departure_time + timedelta(hours=route_points[0].time_from_departure)
-            best_sun_position = self.calculate_sun_position(
-                route_points[0].latitude, 
-                route_points[0].longitude, 
-                route_points[0].altitude,
-                point_time
-            )
+        # pogoda wzdłuż trasy - dodatnie oceny skalowane warunkami w danym punkcie
+        if weather_scores is not None:
+            weather_factor = np.asarray(weather_scores, dtype=float) / 100.0
+            scores = np.where(scores > 0, scores * weather_factor, scores)
         
-        return best_point_idx, best_sun_position
-    
-
+        # najlepszy punkt (pierwszy z najwyższą oceną)
+        best_point_idx = int(np.argmax(scores)) if count else 0
+               
+        return best_point_idx, sun_table.position(best_point_idx)
\ No newline at end of file
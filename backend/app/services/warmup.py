@@ -0,0 +1,91 @@
+# app/services/warmup.py
+import asyncio
+import logging
+import time
+import numpy as np
+from typing import Any, Callable, List, Tuple
+from app.core.config import settings
+from app.core.readiness import readiness
+from app.services.airport import AirportService
+from app.services.sun import SunCalculationService
+
+logger = logging.getLogger(__name__)
+
+# etapy startu: wymagane (blokują start) i opcjonalne (rozgrzewanie w tle)
+STAGE_AIRPORTS = "airports"
+STAGE_SEARCH_INDEX = "airport_search_index"
+STAGE_ROUTES = "route_cache"
+STAGE_EPHEMERIS = "ephemeris_cache"
+
+
+async def run_stage(name: str, fn: Callable[..., Any], *args: Any) -> None:
+    """Wykonuje etap startu w wątku (nie blokuje pętli zdarzeń) i zapisuje jego wynik w readiness"""
+    readiness.start(name)
+    try:
+        await asyncio.to_thread(fn, *args)
+    except Exception as e:
+        logger.error("Błąd etapu startu %s: %s", name, e, exc_info=True)
+        readiness.fail(name, e)
+    else:
+        readiness.complete(name)
+
+
+def load_airports() -> None:
+    """Ładuje dane lotnisk - brak lotnisk oznacza nieudany start"""
+    AirportService.load_airports()
+    if not len(AirportService.get_table()):
+        raise RuntimeError("Brak danych lotnisk")
+
+
+def warmup_route_pairs() -> List[Tuple[str, str]]:
+    """
+    Pary lotnisk do rozgrzania cache tras - z WARMUP_ROUTE_PAIRS ("WAW-LHR"),
+    a gdy lista jest pusta i lotnisk jest niewiele - wszystkie pary
+    """
+    if settings.WARMUP_ROUTE_PAIRS:
+        return [tuple(pair.upper().split("-", 1)) for pair in settings.WARMUP_ROUTE_PAIRS]
+    
+    codes = AirportService.get_table().code.tolist()
+    if len(codes) > settings.WARMUP_ALL_PAIRS_MAX_AIRPORTS:
+        return []
+    return [(departure, arrival) for departure in codes for arrival in codes if departure != arrival]
+
+
+def warm_route_cache(flight_service: Any) -> int:
+    """Wylicza geometrię tras dla par z warmup_route_pairs (trafia do cache tras)"""
+    count = 0
+    for departure_code, arrival_code in warmup_route_pairs():
+        departure = AirportService.get_airport(departure_code)
+        arrival = AirportService.get_airport(arrival_code)
+        if departure and arrival:
+            flight_service.calculate_flight_route_arrays(departure, arrival)
+            count += 1
+    return count
+
+
+def warm_ephemeris(days: int) -> None:
+    """Buduje tablice efemeryd słońca dla bieżącego i kolejnych dni UTC"""
+    today = int(time.time() // 86400)
+    epochs = (today + np.arange(days)) * 86400.0
+    SunCalculationService._ephemeris.lookup(epochs)
+
+
+def register_stages() -> None:
+    """Rejestruje etapy startu - przed ich uruchomieniem, aby /ready nie zgłosił gotowości za wcześnie"""
+    readiness.reset()
+    readiness.register(STAGE_AIRPORTS)
+    if settings.WARMUP_ENABLED:
+        if settings.WARMUP_SEARCH_INDEX:
+            readiness.register(STAGE_SEARCH_INDEX, required=False)
+        readiness.register(STAGE_ROUTES, required=False)
+        if settings.WARMUP_EPHEMERIS_DAYS > 0:
+            readiness.register(STAGE_EPHEMERIS, required=False)
+
+
+async def warm_caches(flight_service: Any) -> None:
+    """Rozgrzewa w tle indeks wyszukiwania lotnisk, cache tras i efemeryd"""
+    if settings.WARMUP_SEARCH_INDEX:
+        await run_stage(STAGE_SEARCH_INDEX, AirportService.get_index)
+    await run_stage(STAGE_ROUTES, warm_route_cache, flight_service)
+    if settings.WARMUP_EPHEMERIS_DAYS > 0:
+        await run_stage(STAGE_EPHEMERIS, warm_ephemeris, settings.WARMUP_EPHEMERIS_DAYS)
\ No newline at end of file
@@ -1,17 +1,132 @@
 # app/services/weather.py
 import httpx
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
 import json
+import logging
+import math
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from app.core.cache import ExpiryTracker, SingleFlight, TTLCache
+from app.core.config import settings
+from app.core.resilience import CircuitBreaker, ResilientCaller, RetryBudget
+from app.core.metrics import WEATHER_UPSTREAM_CALLS, stage
+from app.services.weather_providers import WeatherProvider, create_weather_provider
+
+logger = logging.getLogger(__name__)
+
+# śledzenie wygaśnięcia wpisów cache pogody użytych w bieżącym obliczeniu (track_expiry)
+_expiry_tracker: ContextVar[Optional[ExpiryTracker]] = ContextVar("weather_expiry_tracker", default=None)
 
 class WeatherService:
     """Serwis do pobierania danych pogodowych wzdłuż trasy lotu"""
     
-    WEATHERAPI_KEY = "9d1035aa7ee7449790c115750250105"
-
-    print(WEATHERAPI_KEY)
+    # współdzielony klient HTTP (pula połączeń keep-alive), tworzony w lifespan aplikacji
+    _client: Optional[httpx.AsyncClient] = None
+    
+    # źródło danych pogodowych wybrane w ustawieniach (WEATHER_PROVIDER), tworzone leniwie
+    _provider: Optional[WeatherProvider] = None
+    
+    # cache prognoz i danych astronomicznych: (rodzaj, komórka siatki, dzień) -> dane
+    _cache = TTLCache(settings.WEATHER_CACHE_MAX_ENTRIES, settings.WEATHER_CACHE_TTL_SECONDS)
+    
+    # trwające zapytania do API - współbieżne chybienia cache czekają na jedno pobranie
+    _inflight = SingleFlight()
+    
+    # limit czasu, ponowienia i wyłącznik obwodu dla wywołań dostawcy
+    _upstream = ResilientCaller(
+        timeout=settings.WEATHER_CALL_TIMEOUT,
+        max_attempts=settings.WEATHER_RETRY_MAX_ATTEMPTS,
+        base_delay=settings.WEATHER_RETRY_BASE_DELAY,
+        max_delay=settings.WEATHER_RETRY_MAX_DELAY,
+        breaker=CircuitBreaker(settings.WEATHER_BREAKER_FAILURE_THRESHOLD, settings.WEATHER_BREAKER_RECOVERY_SECONDS),
+        budget=RetryBudget(settings.WEATHER_RETRY_BUDGET_RATIO, settings.WEATHER_RETRY_BUDGET_MAX_TOKENS),
+        retry_on=(httpx.TransportError, httpx.HTTPStatusError, asyncio.TimeoutError)
+    )
+    
+    @classmethod
+    def _create_client(cls) -> httpx.AsyncClient:
+        """Tworzy klienta HTTP z pulą połączeń i jawnymi limitami czasu"""
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.WEATHER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEATHER_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.WEATHER_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(
+                settings.WEATHER_HTTP_READ_TIMEOUT,
+                connect=settings.WEATHER_HTTP_CONNECT_TIMEOUT
+            )
+        )
+    
+    @classmethod
+    async def startup(cls) -> None:
+        """
+        Tworzy dostawcę pogody i współdzielonego klienta HTTP (wywoływane przy starcie aplikacji) -
+        błędna konfiguracja dostawcy (np. brak klucza API) przerywa start
+        """
+        cls.get_provider()
+        if cls._client is None:
+            cls._client = cls._create_client()
+    
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Zamyka współdzielonego klienta HTTP (wywoływane przy zamykaniu aplikacji)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+    
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Zwraca współdzielonego klienta HTTP (poza lifespan, np. w skryptach, tworzy go leniwie)"""
+        if cls._client is None:
+            cls._client = cls._create_client()
+        return cls._client
+    
+    @classmethod
+    def get_provider(cls) -> WeatherProvider:
+        """Zwraca dostawcę danych pogodowych (weatherapi, synthetic lub replay)"""
+        if cls._provider is None:
+            cls._provider = create_weather_provider(cls.get_client)
+        return cls._provider
+    
+    @classmethod
+    def set_provider(cls, provider: Optional[WeatherProvider]) -> None:
+        """Podmienia dostawcę pogody (np. w benchmarkach) i czyści cache; None przywraca ustawienia"""
+        cls._provider = provider
+        cls._cache.clear()
+    
+    @classmethod
+    @contextmanager
+    def track_expiry(cls):
+        """
+        Zbiera najwcześniejsze wygaśnięcie wpisów cache pogody odczytanych w bloku
+        (także w zadaniach utworzonych wewnątrz - dziedziczą kontekst)
+        
+        Returns:
+            ExpiryTracker - remaining() to czas, przez który wynik oparty na tej pogodzie jest aktualny
+        """
+        tracker = ExpiryTracker()
+        token = _expiry_tracker.set(tracker)
+        try:
+            yield tracker
+        finally:
+            _expiry_tracker.reset(token)
+    
+    @classmethod
+    def _note_expiry(cls, key: Tuple) -> None:
+        tracker = _expiry_tracker.get()
+        if tracker is not None:
+            tracker.note(cls._cache.expires_at(key))
+    
+    @classmethod
+    def _note_fallback(cls) -> None:
+        """Wynik korzysta z danych zastępczych - aktualny tylko przez WEATHER_FALLBACK_TTL_SECONDS"""
+        tracker = _expiry_tracker.get()
+        if tracker is not None:
+            tracker.note_for(settings.WEATHER_FALLBACK_TTL_SECONDS)
     
     @classmethod
     async def get_weather(cls, lat: float, lon: float, time_utc: datetime) -> Optional[Dict[str, Any]]:
@@ -26,19 +141,17 @@ class WeatherService:
         Returns:
             Słownik z danymi pogodowymi lub None w przypadku błędu
         """
-        print(f"WEATHERAPI_KEY: {cls.WEATHERAPI_KEY}")
-
         try:
-            if cls.WEATHERAPI_KEY:
-                print(cls.WEATHERAPI_KEY)
-                weather_data = await cls._fetch_weatherapi(lat, lon, time_utc)
-                if weather_data:
-                    return weather_data
+            weather_data = await cls._fetch_forecast(lat, lon, time_utc)
+            if weather_data:
+                return weather_data
             
+            cls._note_fallback()
             return cls._generate_default_weather(lat, lon, time_utc)
             
         except Exception as e:
-            print(f"Błąd podczas pobierania danych pogodowych: {str(e)}")
+            logger.warning("Błąd podczas pobierania danych pogodowych: %s", e)
+            cls._note_fallback()
             return cls._generate_default_weather(lat, lon, time_utc)
     
     @classmethod
@@ -55,33 +168,30 @@ class WeatherService:
             Słownik zawierający czasy wschodu i zachodu słońca
         """
         try:
-            if cls.WEATHERAPI_KEY:
-                date_str = date_utc.strftime('%Y-%m-%d')
+            date_str = date_utc.strftime('%Y-%m-%d')
                 
-                async with httpx.AsyncClient() as client:
-                    url = f"https://api.weatherapi.com/v1/astronomy.json?key={cls.WEATHERAPI_KEY}&q={lat},{lon}&dt={date_str}"
-                    response = await client.get(url)
+            astronomy = await cls._get_astronomy(lat, lon, date_str)
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        astronomy = data.get('astronomy', {}).get('astro', {})
+            if astronomy:
                         
-                        sunrise_str = astronomy.get('sunrise')
-                        sunset_str = astronomy.get('sunset')
+                sunrise_str = astronomy.get('sunrise')
+                sunset_str = astronomy.get('sunset')
                         
-                        if sunrise_str and sunset_str:
-                            sunrise_time = cls._parse_time_12h(sunrise_str, date_utc)
-                            sunset_time = cls._parse_time_12h(sunset_str, date_utc)
+                if sunrise_str and sunset_str:
+                    sunrise_time = cls._parse_time_12h(sunrise_str, date_utc)
+                    sunset_time = cls._parse_time_12h(sunset_str, date_utc)
                             
-                            return {
-                                "sunrise": sunrise_time,
-                                "sunset": sunset_time
-                            }
+                    return {
+                        "sunrise": sunrise_time,
+                        "sunset": sunset_time
+                    }
             
+            cls._note_fallback()
             return cls._generate_default_sun_times(lat, lon, date_utc)
             
         except Exception as e:
-            print(f"Błąd podczas pobierania danych o wschodzie/zachodzie słońca: {str(e)}")
+            logger.warning("Błąd podczas pobierania danych o wschodzie/zachodzie słońca: %s", e)
+            cls._note_fallback()
             return cls._generate_default_sun_times(lat, lon, date_utc)
     
     @classmethod
@@ -109,79 +219,162 @@ class WeatherService:
                 hour, minute, 0, tzinfo=date.tzinfo
             )
         except Exception as e:
-            print(f"Błąd parsowania czasu '{time_str}': {str(e)}")
+            logger.warning("Błąd parsowania czasu '%s': %s", time_str, e)
             if 'AM' in time_str:
                 return datetime(date.year, date.month, date.day, 6, 0, 0, tzinfo=date.tzinfo)
             else:
                 return datetime(date.year, date.month, date.day, 18, 0, 0, tzinfo=date.tzinfo)
     
     @classmethod
-    async def _fetch_weatherapi(cls, lat: float, lon: float, time_utc: datetime) -> Optional[Dict[str, Any]]:
-        """Pobiera dane z WeatherAPI.com"""
-        if not cls.WEATHERAPI_KEY:
-            return None
-            
+    async def _fetch_forecast(cls, lat: float, lon: float, time_utc: datetime) -> Optional[Dict[str, Any]]:
+        """Pobiera dane pogodowe dla godziny z prognozy dostawcy"""
         date_str = time_utc.strftime('%Y-%m-%d')
         
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"https://api.weatherapi.com/v1/forecast.json?key={cls.WEATHERAPI_KEY}&q={lat},{lon}&days=7&dt={date_str}"
-                response = await client.get(url)
-                data = response.json()
+            forecast_day = await cls._get_forecast_day(lat, lon, date_str)
+            
+            if forecast_day:
+                target_hour = time_utc.hour
+                hour_data = None
                 
-                forecast_day = None
-                for day in data.get('forecast', {}).get('forecastday', []):
-                    if day['date'] == date_str:
-                        forecast_day = day
+                for hour in forecast_day.get('hour', []):
+                    hour_time = datetime.strptime(hour['time'], '%Y-%m-%d %H:%M')
+                    if hour_time.hour == target_hour:
+                        hour_data = hour
                         break
                 
-                if forecast_day:
-                    target_hour = time_utc.hour
-                    hour_data = None
+                if hour_data:
+                    astro_data = forecast_day.get('astro', {})
+                    sunrise_str = astro_data.get('sunrise')
+                    sunset_str = astro_data.get('sunset')
                     
-                    for hour in forecast_day.get('hour', []):
-                        hour_time = datetime.strptime(hour['time'], '%Y-%m-%d %H:%M')
-                        if hour_time.hour == target_hour:
-                            hour_data = hour
-                            break
+                    sunrise_time = None
+                    sunset_time = None
                     
-                    if hour_data:
-                        astro_data = forecast_day.get('astro', {})
-                        sunrise_str = astro_data.get('sunrise')
-                        sunset_str = astro_data.get('sunset')
+                    if sunrise_str:
+                        try:
+                            sunrise_time = cls._parse_time_12h(sunrise_str, time_utc)
+                        except Exception as e:
+                            logger.warning("Błąd parsowania wschodu słońca: %s", e)
                         
-                        sunrise_time = None
-                        sunset_time = None
+                    if sunset_str:
+                        try:
+                            sunset_time = cls._parse_time_12h(sunset_str, time_utc)
+                        except Exception as e:
+                            logger.warning("Błąd parsowania zachodu słońca: %s", e)
                         
-                        if sunrise_str:
-                            try:
-                                sunrise_time = cls._parse_time_12h(sunrise_str, time_utc)
-                            except Exception as e:
-                                print(f"Błąd parsowania wschodu słońca: {e}")
+                    return {
+                        "provider": cls.get_provider().name,
+                        "clouds": hour_data.get('cloud', 0),  
+                        "precipitation": hour_data.get('chance_of_rain', 0),  
+                        "visibility": hour_data.get('vis_km', 10),  
+                        "temp": hour_data.get('temp_c', 20),  
+                        "description": hour_data.get('condition', {}).get('text', 'brak danych'),
+                        "is_forecast": True,
+                        "sunrise_time": sunrise_time.isoformat() if sunrise_time else None,
+                        "sunset_time": sunset_time.isoformat() if sunset_time else None
+                    }
                                 
-                        if sunset_str:
-                            try:
-                                sunset_time = cls._parse_time_12h(sunset_str, time_utc)
-                            except Exception as e:
-                                print(f"Błąd parsowania zachodu słońca: {e}")
-                        
-                        return {
-                            "provider": "WeatherAPI",
-                            "clouds": hour_data.get('cloud', 0),  
-                            "precipitation": hour_data.get('chance_of_rain', 0),  
-                            "visibility": hour_data.get('vis_km', 10),  
-                            "temp": hour_data.get('temp_c', 20),  
-                            "description": hour_data.get('condition', {}).get('text', 'brak danych'),
-                            "is_forecast": True,
-                            "sunrise_time": sunrise_time.isoformat() if sunrise_time else None,
-                            "sunset_time": sunset_time.isoformat() if sunset_time else None
-                        }
-                
-                return None
+            return None
                 
         except Exception as e:
-            print(f"Błąd podczas pobierania danych z WeatherAPI: {str(e)}")
+            logger.warning("Błąd podczas pobierania danych od dostawcy %s: %s", cls.get_provider().name, e)
+            return None
+    
+    @classmethod
+    def _weather_cell(cls, lat: float, lon: float) -> Tuple[int, int]:
+        """Indeks komórki siatki (WEATHER_CACHE_CELL_DEG stopni) dla punktu"""
+        cell = settings.WEATHER_CACHE_CELL_DEG
+        lon = (lon + 180) % 360 - 180
+        return math.floor(lat / cell), math.floor(lon / cell)
+    
+    @classmethod
+    def _cell_center(cls, cell_index: Tuple[int, int]) -> Tuple[float, float]:
+        """Współrzędne środka komórki siatki - wysyłane do API zamiast dokładnego punktu"""
+        cell = settings.WEATHER_CACHE_CELL_DEG
+        return round((cell_index[0] + 0.5) * cell, 4), round((cell_index[1] + 0.5) * cell, 4)
+    
+    @classmethod
+    async def _get_forecast_day(cls, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        """
+        Zwraca prognozę dla komórki siatki i dnia - z cache lub z forecast.json
+        
+        Do cache trafiają wszystkie dni z odpowiedzi (razem ze wszystkimi godzinami),
+        więc pobliskie punkty i inne godziny tego samego dnia nie wymagają nowego zapytania.
+        """
+        cell_index = cls._weather_cell(lat, lon)
+        key = ("forecast", cell_index, date_str)
+        forecast_day = cls._cache.get(key)
+        if forecast_day is None:
+            forecast_day = await cls._inflight.do(key, lambda: cls._download_forecast(cell_index, date_str))
+        cls._note_expiry(key)
+        return forecast_day
+    
+    @classmethod
+    async def _download_forecast(cls, cell_index: Tuple[int, int], date_str: str) -> Optional[Dict[str, Any]]:
+        """Pobiera prognozę dla środka komórki i zapisuje wszystkie zwrócone dni w cache"""
+        forecast_day = None
+        cell_lat, cell_lon = cls._cell_center(cell_index)
+        data = await cls._call_upstream("forecast", lambda: cls.get_provider().fetch_forecast(cell_lat, cell_lon, date_str))
+        if not data:
+            return None
+        
+        for day in data.get('forecast', {}).get('forecastday', []):
+            cls._cache.set(("forecast", cell_index, day['date']), day)
+            if day['date'] == date_str:
+                forecast_day = day
+        
+        return forecast_day
+    
+    @classmethod
+    async def _get_astronomy(cls, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        """Zwraca blok astro (wschód/zachód) dla komórki siatki i dnia - z cache lub z astronomy.json"""
+        cell_index = cls._weather_cell(lat, lon)
+        key = ("astronomy", cell_index, date_str)
+        astronomy = cls._cache.get(key)
+        if astronomy is None:
+            astronomy = await cls._inflight.do(key, lambda: cls._download_astronomy(cell_index, date_str))
+        cls._note_expiry(key)
+        return astronomy
+    
+    @classmethod
+    async def _download_astronomy(cls, cell_index: Tuple[int, int], date_str: str) -> Optional[Dict[str, Any]]:
+        """Pobiera dane astronomiczne dla środka komórki i zapisuje blok astro w cache"""
+        cell_lat, cell_lon = cls._cell_center(cell_index)
+        data = await cls._call_upstream("astronomy", lambda: cls.get_provider().fetch_astronomy(cell_lat, cell_lon, date_str))
+        if not data:
             return None
+        
+        astronomy = data.get('astronomy', {}).get('astro', {})
+        if astronomy:
+            cls._cache.set(("astronomy", cell_index, date_str), astronomy)
+        return astronomy
+    
+    @classmethod
+    async def _call_upstream(cls, kind: str, fn: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Wywołanie dostawcy przez _upstream (ponowienia, wyłącznik obwodu) z pomiarem czasu i licznikiem wyników"""
+        with stage(f"weather_upstream_{kind}"):
+            try:
+                data = await cls._upstream.call(fn)
+            except Exception:
+                WEATHER_UPSTREAM_CALLS.inc(kind=kind, outcome="error")
+                raise
+        WEATHER_UPSTREAM_CALLS.inc(kind=kind, outcome="ok" if data else "empty")
+        return data
+    
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Statystyki cache pogody (trafienia, liczba wpisów) do strojenia rozmiaru komórki i TTL"""
+        stats = cls._cache.stats()
+        stats["single_flight"] = cls._inflight.stats()
+        return stats
+    
+    @classmethod
+    def upstream_stats(cls) -> Dict[str, Any]:
+        """Metryki wywołań dostawcy pogody: stan wyłącznika obwodu, ponowienia, przekroczenia czasu"""
+        stats = cls._upstream.stats()
+        stats["provider"] = cls.get_provider().name
+        return stats
     
     @classmethod
     def _generate_default_weather(cls, lat: float, lon: float, time_utc: datetime) -> Dict[str, Any]:
@@ -316,6 +509,20 @@ class WeatherService:
             "sunset": sunset_time
         }
     
+    @classmethod
+    def _forecast_covers(cls, time_utc: datetime) -> bool:
+        """Czy data mieści się w horyzoncie prognozy dostawcy (prognoza zawiera blok astro)"""
+        return cls.get_provider().covers(time_utc)
+    
+    @classmethod
+    def _has_forecast_sun_times(cls, weather: Dict[str, Any]) -> bool:
+        """Czy dane pogodowe zawierają czasy wschodu/zachodu z bloku astro prognozy"""
+        return (
+            weather.get("provider") != "Default"
+            and bool(weather.get("sunrise_time"))
+            and bool(weather.get("sunset_time"))
+        )
+    
     @classmethod
     async def evaluate_conditions_for_sun_viewing(cls, lat: float, lon: float, time_utc: datetime) -> Dict[str, Any]:
         """
@@ -324,16 +531,26 @@ class WeatherService:
         Returns:
             Słownik z oceną i danymi pogodowymi
         """
-        weather = await cls.get_weather(lat, lon, time_utc)
+        if cls._forecast_covers(time_utc):
+            # prognoza (forecast.json) zawiera blok astro - osobne zapytanie tylko gdy go brakuje
+            weather = await cls.get_weather(lat, lon, time_utc)
+            sun_times = None
+            if not cls._has_forecast_sun_times(weather):
+                sun_times = await cls.get_sun_events(lat, lon, time_utc)
+        else:
+            # data poza horyzontem prognozy - oba zapytania równolegle
+            weather, sun_times = await asyncio.gather(
+                cls.get_weather(lat, lon, time_utc),
+                cls.get_sun_events(lat, lon, time_utc)
+            )
         
-        sun_times = await cls.get_sun_events(lat, lon, time_utc)
-        print("*******suntimes")
-        print(sun_times)
+        if sun_times is not None:
+            logger.debug("Czasy wschodu/zachodu z API astronomicznego: %s", sun_times)
         
-        if "sunrise_time" not in weather and "sunrise" in sun_times:
-            weather["sunrise_time"] = sun_times["sunrise"].isoformat()
-        if "sunset_time" not in weather and "sunset" in sun_times:
-            weather["sunset_time"] = sun_times["sunset"].isoformat()
+            if sun_times.get("sunrise"):
+                weather["sunrise_time"] = sun_times["sunrise"].isoformat()
+            if sun_times.get("sunset"):
+                weather["sunset_time"] = sun_times["sunset"].isoformat()
         
         viewing_score = 100 
         
@@ -385,6 +602,41 @@ class WeatherService:
             }
         }
     
+    @classmethod
+    async def get_weather_profile(cls,
+                                  points: List[Tuple[float, float, datetime]],
+                                  semaphore: Optional[asyncio.Semaphore] = None) -> List[Dict[str, Any]]:
+        """
+        Ocenia warunki obserwacji w wielu punktach trasy równolegle
+        
+        Punkty z tej samej komórki siatki cache i tej samej godziny są oceniane raz,
+        a liczba jednoczesnych zapytań jest ograniczona semaforem.
+        
+        Args:
+            points: Lista punktów (szerokość, długość, czas UTC)
+            semaphore: Semafor ograniczający współbieżność (domyślnie WEATHER_PROFILE_CONCURRENCY)
+        
+        Returns:
+            Lista ocen (jak z evaluate_conditions_for_sun_viewing) w kolejności punktów
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.WEATHER_PROFILE_CONCURRENCY)
+        
+        async def evaluate(lat: float, lon: float, time_utc: datetime) -> Dict[str, Any]:
+            async with semaphore:
+                return await cls.evaluate_conditions_for_sun_viewing(lat, lon, time_utc)
+        
+        tasks: Dict[Tuple[Tuple[int, int], datetime], asyncio.Task] = {}
+        keys = []
+        for lat, lon, time_utc in points:
+            key = (cls._weather_cell(lat, lon), time_utc.replace(minute=0, second=0, microsecond=0))
+            keys.append(key)
+            if key not in tasks:
+                tasks[key] = asyncio.ensure_future(evaluate(lat, lon, time_utc))
+        
+        evaluations = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        return [evaluations[key] for key in keys]
+
 
 if __name__ == "__main__":
     import asyncio
@@ -0,0 +1,270 @@
+# app/services/weather_providers.py
+import abc
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherProvider(abc.ABC):
+    """
+    Źródło surowych danych pogodowych
+    
+    Wszyscy dostawcy zwracają odpowiedzi w formacie WeatherAPI.com (forecast.json
+    i astronomy.json), więc WeatherService interpretuje je jednym kodem. Dostawca bez
+    fetch_forecast lub fetch_astronomy nie da się utworzyć (TypeError).
+    """
+    
+    name = "Base"
+    
+    def covers(self, time_utc: datetime) -> bool:
+        """Czy dostawca ma prognozę (z blokiem astro) dla danej daty"""
+        return True
+    
+    @abc.abstractmethod
+    async def fetch_forecast(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        """Zwraca odpowiedź forecast.json dla punktu i dnia (YYYY-MM-DD) lub None"""
+    
+    @abc.abstractmethod
+    async def fetch_astronomy(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        """Zwraca odpowiedź astronomy.json dla punktu i dnia (YYYY-MM-DD) lub None"""
+
+
+class WeatherAPIProvider(WeatherProvider):
+    """Dostawca WeatherAPI.com - zapytania HTTP przez współdzielonego klienta"""
+    
+    name = "WeatherAPI"
+    BASE_URL = "https://api.weatherapi.com/v1"
+    
+    def __init__(self, api_key: str, get_client: Callable[[], httpx.AsyncClient]):
+        self.api_key = api_key
+        self.get_client = get_client
+    
+    def covers(self, time_utc: datetime) -> bool:
+        if not self.api_key:
+            return False
+        days_ahead = (time_utc.date() - datetime.utcnow().date()).days
+        return 0 <= days_ahead < settings.WEATHER_FORECAST_DAYS
+    
+    async def fetch_forecast(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        if not self.api_key:
+            return None
+        
+        url = f"{self.BASE_URL}/forecast.json?key={self.api_key}&q={lat},{lon}&days={settings.WEATHER_FORECAST_DAYS}&dt={date_str}"
+        return await self._get_json(url)
+    
+    async def fetch_astronomy(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        if not self.api_key:
+            return None
+        
+        url = f"{self.BASE_URL}/astronomy.json?key={self.api_key}&q={lat},{lon}&dt={date_str}"
+        return await self._get_json(url)
+    
+    async def _get_json(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Zapytanie GET - treść JSON tylko dla odpowiedzi 200
+        
+        Błędy serwera i limit zapytań (429) są błędami upstreamu (wyjątek: ponowienie,
+        wyłącznik obwodu), pozostałe kody (np. 401/403 - zły klucz) dają brak danych.
+        """
+        response = await self.get_client().get(url)
+        if response.status_code >= 500 or response.status_code == 429:
+            response.raise_for_status()
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+
+class SyntheticWeatherProvider(WeatherProvider):
+    """
+    Deterministyczny dostawca syntetycznej pogody (bez sieci)
+    
+    Dane zależą tylko od ziarna, współrzędnych i daty, więc kolejne uruchomienia
+    testów obciążeniowych widzą dokładnie te same warunki.
+    """
+    
+    name = "Synthetic"
+    CONDITIONS = [(20, "Sunny"), (50, "Partly cloudy"), (80, "Cloudy"), (101, "Overcast")]
+    
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+    
+    def _rng(self, lat: float, lon: float, date_str: str) -> random.Random:
+        # crc32 zamiast hash() - hash napisów jest losowany przy każdym starcie procesu
+        return random.Random(zlib.crc32(f"{self.seed}:{lat:.4f}:{lon:.4f}:{date_str}".encode()))
+    
+    async def fetch_forecast(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        start = datetime.strptime(date_str, '%Y-%m-%d')
+        days = []
+        for offset in range(settings.WEATHER_FORECAST_DAYS):
+            day = (start + timedelta(days=offset)).strftime('%Y-%m-%d')
+            days.append(self._forecast_day(lat, lon, day))
+        return {"forecast": {"forecastday": days}}
+    
+    async def fetch_astronomy(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        return {"astronomy": {"astro": self._astro(lat, lon, date_str)}}
+    
+    def _forecast_day(self, lat: float, lon: float, date_str: str) -> Dict[str, Any]:
+        rng = self._rng(lat, lon, date_str)
+        
+        # zachmurzenie zmienia się płynnie w ciągu dnia (sinusoida z losową fazą)
+        base_cloud = rng.uniform(0, 100)
+        amplitude = rng.uniform(0, 40)
+        phase = rng.uniform(0, 2 * math.pi)
+        base_temp = 25 - abs(lat) * 0.5 + rng.uniform(-5, 5)
+        
+        hours = []
+        for hour in range(24):
+            cloud = int(min(100, max(0, base_cloud + amplitude * math.sin(phase + hour * math.pi / 12))))
+            description = next(text for limit, text in self.CONDITIONS if cloud < limit)
+            hours.append({
+                "time": f"{date_str} {hour:02d}:00",
+                "cloud": cloud,
+                "chance_of_rain": int(max(0, cloud - 50) * 1.6),
+                "vis_km": round(10.0 - cloud / 20, 1),
+                "temp_c": round(base_temp + 5 * math.sin((hour - 9) * math.pi / 12), 1),
+                "condition": {"text": description}
+            })
+        
+        return {
+            "date": date_str,
+            "astro": self._astro(lat, lon, date_str),
+            "hour": hours
+        }
+    
+    def _astro(self, lat: float, lon: float, date_str: str) -> Dict[str, str]:
+        """Wschód i zachód słońca (UTC) z uproszczonego równania wschodu słońca"""
+        day = datetime.strptime(date_str, '%Y-%m-%d')
+        n = (day - datetime(2000, 1, 1, 12)).days + 1
+        j_star = n - lon / 360
+        
+        mean_anomaly = math.radians((357.5291 + 0.98560028 * j_star) % 360)
+        center = 1.9148 * math.sin(mean_anomaly) + 0.02 * math.sin(2 * mean_anomaly) + 0.0003 * math.sin(3 * mean_anomaly)
+        ecliptic_lon = math.radians((math.degrees(mean_anomaly) + center + 180 + 102.9372) % 360)
+        transit = j_star + 0.0053 * math.sin(mean_anomaly) - 0.0069 * math.sin(2 * ecliptic_lon)
+        
+        sin_dec = math.sin(ecliptic_lon) * math.sin(math.radians(23.4397))
+        cos_dec = math.cos(math.asin(sin_dec))
+        phi = math.radians(lat)
+        cos_hour_angle = (math.sin(math.radians(-0.833)) - math.sin(phi) * sin_dec) / (math.cos(phi) * cos_dec)
+        # dzień/noc polarna - słońce "wschodzi" i "zachodzi" w momencie górowania
+        hour_angle = math.degrees(math.acos(max(-1.0, min(1.0, cos_hour_angle))))
+        
+        noon_hours = ((transit % 1) * 24 + 12) % 24
+        return {
+            "sunrise": self._format_12h(noon_hours - hour_angle / 15),
+            "sunset": self._format_12h(noon_hours + hour_angle / 15)
+        }
+    
+    @staticmethod
+    def _format_12h(hours: float) -> str:
+        minutes = int(round((hours % 24) * 60)) % (24 * 60)
+        hour, minute = divmod(minutes, 60)
+        suffix = "AM" if hour < 12 else "PM"
+        return f"{(hour % 12) or 12:02d}:{minute:02d} {suffix}"
+
+
+class ReplayWeatherProvider(WeatherProvider):
+    """
+    Dostawca odtwarzający zapisane odpowiedzi JSON z dysku
+    
+    Każda odpowiedź jest plikiem {rodzaj}_{lat}_{lon}_{dzień}.json w katalogu fixtures.
+    Z podanym dostawcą źródłowym brakujące pliki są pobierane i zapisywane (nagrywanie).
+    Opcjonalne sztuczne opóźnienie symuluje czas odpowiedzi prawdziwego API.
+    """
+    
+    name = "Replay"
+    
+    def __init__(self,
+                 directory: str,
+                 latency_seconds: float = 0.0,
+                 record_from: Optional[WeatherProvider] = None):
+        self.directory = directory
+        self.latency_seconds = latency_seconds
+        self.record_from = record_from
+    
+    def _path(self, kind: str, lat: float, lon: float, date_str: str) -> str:
+        return os.path.join(self.directory, f"{kind}_{lat:.4f}_{lon:.4f}_{date_str}.json")
+    
+    async def _replay(self, kind: str, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+        
+        path = self._path(kind, lat, lon, date_str)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        
+        if self.record_from is None:
+            return None
+        
+        if kind == "forecast":
+            data = await self.record_from.fetch_forecast(lat, lon, date_str)
+        else:
+            data = await self.record_from.fetch_astronomy(lat, lon, date_str)
+        
+        if data is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        return data
+    
+    async def fetch_forecast(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        return await self._replay("forecast", lat, lon, date_str)
+    
+    async def fetch_astronomy(self, lat: float, lon: float, date_str: str) -> Optional[Dict[str, Any]]:
+        return await self._replay("astronomy", lat, lon, date_str)
+
+
+PROVIDERS: List[str] = ["weatherapi", "synthetic", "replay"]
+
+
+def create_weather_provider(get_client: Callable[[], httpx.AsyncClient]) -> WeatherProvider:
+    """
+    Tworzy dostawcę pogody wybranego w ustawieniach (WEATHER_PROVIDER)
+    
+    Args:
+        get_client: Funkcja zwracająca współdzielonego klienta HTTP
+    
+    Returns:
+        Instancja dostawcy pogody
+    
+    Raises:
+        ValueError: Nieznany dostawca lub brak WEATHERAPI_KEY dla dostawcy, który go wymaga -
+            dane syntetyczne tylko po jawnym wyborze WEATHER_PROVIDER="synthetic"
+    """
+    name = settings.WEATHER_PROVIDER.lower()
+    
+    if name == "weatherapi" or (name == "replay" and settings.WEATHER_REPLAY_RECORD):
+        if not settings.WEATHERAPI_KEY:
+            raise ValueError(
+                "Brak WEATHERAPI_KEY (zmienna środowiskowa lub .env) - ustaw klucz "
+                "albo wybierz jawnie WEATHER_PROVIDER=synthetic"
+            )
+    
+    if name == "weatherapi":
+        return WeatherAPIProvider(settings.WEATHERAPI_KEY, get_client)
+    if name == "synthetic":
+        return SyntheticWeatherProvider(settings.WEATHER_SYNTHETIC_SEED)
+    if name == "replay":
+        record_from = None
+        if settings.WEATHER_REPLAY_RECORD:
+            record_from = WeatherAPIProvider(settings.WEATHERAPI_KEY, get_client)
+        return ReplayWeatherProvider(
+            settings.WEATHER_REPLAY_DIR,
+            settings.WEATHER_REPLAY_LATENCY_MS / 1000.0,
+            record_from
+        )
+    
+    raise ValueError(f"Nieznany dostawca pogody: {settings.WEATHER_PROVIDER} (dostępne: {', '.join(PROVIDERS)})")
\ No newline at end of file
@@ -0,0 +1,282 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarki gorących ścieżek: trasa, pozycja słońca, wydarzenia słoneczne i pełna rekomendacja
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json --update-baseline
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json
+
+Linia bazowa nie jest częścią repozytorium - czasy zależą od maszyny, więc zapisuje
+się ją lokalnie (--update-baseline) przed zmianą i porównuje z nią po zmianie.
+
+Przypadki są sparametryzowane parami lotnisk (krótki, średni i ultradługi dystans)
+oraz liczbą punktów trasy. Pogoda pochodzi z deterministycznego dostawcy syntetycznego
+(bez sieci), a lotniska z tabeli zdefiniowanej poniżej (niezależnej od pliku CSV).
+
+Wyniki są zapisywane jako JSON. Z podaną linią bazową każdy przypadek, którego mediana
+jest wolniejsza o więcej niż --tolerance, jest zgłaszany jako regresja (kod wyjścia 1).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.executor import compute_executor
+from app.models.schemas import DepartureSearchRequest, FlightRequest
+from app.services.airport import AirportService, AirportTable
+from app.services.flight import FlightRouteService
+from app.services.flight_route import FlightRouteCalculator
+from app.services.sun import SunCalculationService
+from app.services.weather import WeatherService
+from app.services.weather_providers import SyntheticWeatherProvider
+
+# lotniska używane w benchmarkach: (IATA, nazwa, miasto, kraj, szerokość, długość, strefa czasowa)
+AIRPORTS = [
+    ("WAW", "Warsaw Chopin Airport", "Warsaw", "Poland", 52.1657, 20.9671, "Europe/Warsaw"),
+    ("KRK", "Kraków Airport", "Kraków", "Poland", 50.0777, 19.7848, "Europe/Warsaw"),
+    ("LHR", "London Heathrow", "London", "United Kingdom", 51.4700, -0.4543, "Europe/London"),
+    ("JFK", "John F. Kennedy International Airport", "New York", "United States", 40.6413, -73.7781, "America/New_York"),
+    ("SIN", "Singapore Changi Airport", "Singapore", "Singapore", 1.3644, 103.9915, "Asia/Singapore"),
+]
+
+# pary lotnisk: nazwa przypadku -> (wylot, przylot)
+PAIRS: Dict[str, Tuple[str, str]] = {
+    "short": ("WAW", "KRK"),
+    "medium": ("LHR", "JFK"),
+    "ultra_long": ("SIN", "JFK"),
+}
+
+STEPS = (20, 100, 500)
+DEPARTURE = datetime(2026, 3, 20, 5, 30)
+
+
+def install_fixtures() -> None:
+    """Podmienia lotniska na tabelę benchmarków i pogodę na dostawcę syntetycznego"""
+    columns = {
+        "code": np.array([a[0] for a in AIRPORTS], dtype=str),
+        "icao_code": np.array([""] * len(AIRPORTS), dtype=str),
+        "name": np.array([a[1] for a in AIRPORTS], dtype=str),
+        "city": np.array([a[2] for a in AIRPORTS], dtype=str),
+        "country": np.array([a[3] for a in AIRPORTS], dtype=str),
+        "latitude": np.array([a[4] for a in AIRPORTS], dtype=np.float64),
+        "longitude": np.array([a[5] for a in AIRPORTS], dtype=np.float64),
+        "timezone": np.array([a[6] for a in AIRPORTS], dtype=str),
+    }
+    AirportService.set_table(AirportTable(columns))
+    WeatherService.set_provider(SyntheticWeatherProvider(seed=0))
+
+
+def measure(fn: Callable[[], Any], min_time: float, rounds: int) -> Dict[str, Any]:
+    """
+    Mierzy czas wywołania fn (jak timeit): liczba wywołań w rundzie dobierana tak,
+    aby runda trwała co najmniej min_time, wynik to czasy jednego wywołania w µs
+    """
+    fn()  # rozgrzanie (cache, leniwe inicjalizacje)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        "rounds": len(samples),
+        "number": number,
+    }
+
+
+def build_cases(loop: asyncio.AbstractEventLoop) -> Dict[str, Tuple[Callable[[], Any], Dict[str, Any]]]:
+    """Przypadki benchmarków: nazwa -> (funkcja bez argumentów, parametry)"""
+    calculator = FlightRouteCalculator()
+    sun_service = SunCalculationService()
+    flight_service = FlightRouteService()
+    cases: Dict[str, Tuple[Callable[[], Any], Dict[str, Any]]] = {}
+    
+    for pair_name, (departure_code, arrival_code) in PAIRS.items():
+        departure = AirportService.get_airport(departure_code)
+        arrival = AirportService.get_airport(arrival_code)
+        params = {"pair": pair_name, "route": f"{departure_code}-{arrival_code}"}
+        
+        for steps in STEPS:
+            route = calculator.calculate_route_arrays(
+                departure.latitude, departure.longitude, arrival.latitude, arrival.longitude, steps
+            )
+            route_points = route.to_route_points()
+            step_params = dict(params, steps=steps)
+            
+            cases[f"route.calculate_route[{pair_name}-{steps}]"] = (
+                lambda d=departure, a=arrival, s=steps: calculator.calculate_route(
+                    d.latitude, d.longitude, a.latitude, a.longitude, DEPARTURE, s
+                ),
+                step_params,
+            )
+            cases[f"sun.calculate_sun_position[{pair_name}-{steps}]"] = (
+                lambda points=route_points: [
+                    sun_service.calculate_sun_position(
+                        p.latitude, p.longitude, p.altitude,
+                        DEPARTURE + timedelta(hours=p.time_from_departure)
+                    )
+                    for p in points
+                ],
+                dict(step_params, unit="cała trasa"),
+            )
+            cases[f"sun.find_sun_events[{pair_name}-{steps}]"] = (
+                lambda points=route_points: sun_service.find_sun_events(points, DEPARTURE, "sunrise"),
+                step_params,
+            )
+            cases[f"sun.get_sun_events_for_flight[{pair_name}-{steps}]"] = (
+                lambda points=route_points, r=route: sun_service.get_sun_events_for_flight(points, DEPARTURE, route=r),
+                step_params,
+            )
+        
+        request = FlightRequest(
+            departure_airport=departure_code,
+            arrival_airport=arrival_code,
+            departure_date=DEPARTURE.date(),
+            departure_time=DEPARTURE.time(),
+            sun_preference="sunrise",
+        )
+        profile_request = request.model_copy(update={"weather_profile": True})
+        
+        cases[f"flight.get_seat_recommendation[{pair_name}]"] = (
+            lambda r=request: loop.run_until_complete(flight_service.get_seat_recommendation(r)),
+            dict(params, steps=20, weather_profile=False),
+        )
+        cases[f"flight.get_seat_recommendation[{pair_name}-profile]"] = (
+            lambda r=profile_request: loop.run_until_complete(flight_service.get_seat_recommendation(r)),
+            dict(params, steps=20, weather_profile=True),
+        )
+    
+        search_request = DepartureSearchRequest(
+            departure_airport=departure_code,
+            arrival_airport=arrival_code,
+            start_date=DEPARTURE.date(),
+            end_date=DEPARTURE.date() + timedelta(days=6),
+            step_minutes=15,
+            sun_preference="sunset",
+        )
+        cases[f"flight.rank_departures[{pair_name}-7d-15min]"] = (
+            lambda r=search_request: flight_service._rank_departures(r),
+            dict(params, steps=20, candidates=len(FlightRouteService.departure_offsets(search_request))),
+        )
+    
+    return cases
+
+
+def compare(results: Dict[str, Dict[str, Any]],
+            baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    Porównuje mediany z linią bazową i uzupełnia wyniki o stosunek czasów
+    
+    Returns:
+        Nazwy przypadków wolniejszych od linii bazowej o więcej niż tolerance
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("median_us"):
+            continue
+        ratio = result["median_us"] / base["median_us"]
+        result["baseline_median_us"] = base["median_us"]
+        result["ratio"] = ratio
+        result["regression"] = ratio > 1.0 + tolerance
+        if result["regression"]:
+            regressions.append(name)
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    width = max(len(name) for name in results)
+    print(f"{'przypadek':<{width}}  {'mediana µs':>12}  {'min µs':>12}  {'vs baza':>8}")
+    for name, result in results.items():
+        ratio = result.get("ratio")
+        marker = "" if ratio is None else f"{ratio:7.2f}x" + ("  REGRESJA" if result["regression"] else "")
+        print(f"{name:<{width}}  {result['median_us']:12.1f}  {result['min_us']:12.1f}  {marker}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarki tras, słońca i rekomendacji miejsc")
+    parser.add_argument("--output", help="Plik JSON z wynikami")
+    parser.add_argument("--baseline", help="Plik JSON z wynikami linii bazowej do porównania")
+    parser.add_argument("--update-baseline", action="store_true", help="Zapisz wyniki jako nową linię bazową")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Dopuszczalne spowolnienie (0.25 = 25%%)")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Minimalny czas jednej rundy w sekundach")
+    parser.add_argument("--rounds", type=int, default=5, help="Liczba rund pomiaru")
+    parser.add_argument("--filter", default="", help="Uruchom tylko przypadki zawierające ten tekst")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if compute_executor.mode == "process":
+        # procesy robocze nie widzą podmienionych lotnisk ani dostawcy pogody
+        print("Benchmarki wymagają COMPUTE_EXECUTOR_MODE=thread lub inline", file=sys.stderr)
+        return 2
+    
+    install_fixtures()
+    loop = asyncio.new_event_loop()
+    cases = {name: case for name, case in build_cases(loop).items() if args.filter in name}
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, (fn, params) in cases.items():
+        result = measure(fn, args.min_time, args.rounds)
+        results[name] = dict(result, params=params)
+        print(f"{name}: {result['median_us']:.1f} µs", file=sys.stderr)
+    
+    loop.close()
+    compute_executor.shutdown()
+    
+    regressions: List[str] = []
+    if args.baseline and not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+    
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "executor": compute_executor.mode,
+            "tolerance": args.tolerance,
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+    
+    print_table(results)
+    for path in filter(None, [args.output, args.baseline if args.update_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    if regressions:
+        print(f"\nREGRESJA w {len(regressions)} przypadkach: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,108 @@
+# tests/conftest.py
+"""
+Wspólne dane testowe
+
+Testy uruchamia się z katalogu backend (ścieżki danych w ustawieniach są względne):
+    python -m pytest -q
+
+Pogoda pochodzi z deterministycznego dostawcy syntetycznego (bez sieci), a lotniska -
+z tabeli zdefiniowanej poniżej (niezależnej od pliku CSV) lub, w testach API, z pliku
+data/airports.csv ładowanego przez lifespan aplikacji.
+"""
+from types import SimpleNamespace
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from app.services.airport import AirportService, AirportTable
+from app.services.weather import WeatherService
+from app.services.weather_providers import SyntheticWeatherProvider
+
+# lotniska testowe: (IATA, ICAO, nazwa, miasto, kraj, szerokość, długość, strefa czasowa)
+AIRPORTS: List[Tuple[str, str, str, str, str, float, float, str]] = [
+    ("WAW", "EPWA", "Warsaw Chopin Airport", "Warsaw", "Poland", 52.1657, 20.9671, "Europe/Warsaw"),
+    ("KRK", "EPKK", "Kraków John Paul II International Airport", "Kraków", "Poland", 50.0777, 19.7848, "Europe/Warsaw"),
+    ("LHR", "EGLL", "London Heathrow Airport", "London", "United Kingdom", 51.4700, -0.4543, "Europe/London"),
+    ("JFK", "KJFK", "John F. Kennedy International Airport", "New York", "United States", 40.6413, -73.7781, "America/New_York"),
+    ("SIN", "WSSS", "Singapore Changi Airport", "Singapore", "Singapore", 1.3644, 103.9915, "Asia/Singapore"),
+    ("LYR", "ENSB", "Svalbard Airport Longyear", "Longyearbyen", "Norway", 78.2461, 15.4656, "Arctic/Longyearbyen"),
+    ("ANC", "PANC", "Ted Stevens Anchorage International Airport", "Anchorage", "United States", 61.1743, -149.9962, "America/Anchorage"),
+]
+
+
+def make_table(rows=AIRPORTS) -> AirportTable:
+    """Tabela lotnisk z listy krotek w formacie AIRPORTS"""
+    rows = list(rows)
+    columns = {
+        "code": np.array([r[0] for r in rows], dtype=str),
+        "icao_code": np.array([r[1] for r in rows], dtype=str),
+        "name": np.array([r[2] for r in rows], dtype=str),
+        "city": np.array([r[3] for r in rows], dtype=str),
+        "country": np.array([r[4] for r in rows], dtype=str),
+        "latitude": np.array([r[5] for r in rows], dtype=np.float64),
+        "longitude": np.array([r[6] for r in rows], dtype=np.float64),
+        "timezone": np.array([r[7] for r in rows], dtype=str),
+    }
+    return AirportTable(columns)
+
+
+@pytest.fixture(autouse=True)
+def synthetic_weather() -> Iterator[None]:
+    """Pogoda bez sieci w każdym teście (cache pogody czyszczony przy podmianie dostawcy)"""
+    WeatherService.set_provider(SyntheticWeatherProvider(seed=0))
+    yield
+    WeatherService.set_provider(None)
+
+
+@pytest.fixture
+def airports() -> Iterator[AirportTable]:
+    """Podmienia lotniska na tabelę testową i przywraca poprzednie po teście"""
+    previous = AirportService._table
+    table = make_table()
+    AirportService.set_table(table)
+    yield table
+    if previous is not None:
+        AirportService.set_table(previous)
+    else:
+        AirportService._table = None
+        AirportService._index = None
+        AirportService._spatial = None
+
+
+class FakeClock:
+    """Zegar monotoniczny przesuwany ręcznie (zamiast time.monotonic w testowanym module)"""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch) -> FakeClock:
+    """Podmienia zegar w modułach cache, cache odpowiedzi i odporności wywołań"""
+    from app.core import cache, resilience, response_cache
+    
+    clock = FakeClock()
+    # tylko w tych modułach - pętla asyncio nadal korzysta z prawdziwego zegara
+    for module in (cache, resilience, response_cache):
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def client():
+    """Klient testowy aplikacji (z lifespan - lotniska z data/airports.csv) z pustym cache odpowiedzi"""
+    from fastapi.testclient import TestClient
+    from app.api.routes import seat_response_cache
+    from app.main import app
+    
+    seat_response_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+    seat_response_cache.clear()
\ No newline at end of file
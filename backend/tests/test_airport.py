@@ -0,0 +1,81 @@
+# tests/test_airport.py
+import logging
+import os
+
+import pytest
+
+from app.services.airport import AirportService, AirportTable
+
+CSV = """iata_code,icao_code,name,city,country,latitude,longitude,timezone
+WAW,EPWA,Warsaw Chopin Airport,Warsaw,Poland,52.1657,20.9671,Europe/Warsaw
+ krk ,epkk,Kraków Airport,Kraków,Poland,50.0777,19.7848,Europe/Warsaw
+,,No Code Airport,Nowhere,Poland,50.0,20.0,Europe/Warsaw
+WAW,,Duplicate Warsaw,Warsaw,Poland,10.0,10.0,Europe/Warsaw
+BAD,,Bad Latitude,Nowhere,Poland,95.0,20.0,Europe/Warsaw
+LON,,Bad Longitude,Nowhere,Poland,50.0,-181.0,Europe/Warsaw
+NAN,,Not A Number,Nowhere,Poland,abc,20.0,Europe/Warsaw
+EMP,,Empty Latitude,Nowhere,Poland,,20.0,Europe/Warsaw
+GDN,,Broken Gdańsk,Gdańsk,Poland,154.3776,18.4662,Europe/Warsaw
+GDN,EPGD,Gdańsk Lech Wałęsa Airport,Gdańsk,Poland,54.3776,18.4662,Europe/Warsaw
+LHR,,London Heathrow,London,United Kingdom,51.47,-0.4543,Europe/London
+"""
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "airports.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_from_csv_drops_invalid_rows(csv_path, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.services.airport"):
+        table = AirportTable.from_csv(csv_path)
+    
+    assert table.code.tolist() == ["WAW", "KRK", "GDN", "LHR"]
+    assert "Pominięto 7 " in caplog.text
+    # dla powtórzonego kodu zostaje pierwszy poprawny wiersz
+    assert table.airport(table.row_for_code("WAW")).name == "Warsaw Chopin Airport"
+    assert table.airport(table.row_for_code("GDN")).name == "Gdańsk Lech Wałęsa Airport"
+
+
+def test_rows_are_valid_airports(csv_path):
+    table = AirportTable.from_csv(csv_path)
+    for row in range(len(table)):
+        airport = table.airport(row)
+        # model_construct pomija walidację - sprawdzamy, że pełna walidacja daje to samo
+        assert type(airport).model_validate(airport.model_dump()) == airport
+        assert -90 <= airport.latitude <= 90 and -180 <= airport.longitude <= 180
+    
+    krk = table.airport(table.row_for_code("epkk"))
+    assert (krk.code, krk.icao_code) == ("KRK", "EPKK")
+    assert table.airport(table.row_for_code("LHR")).icao_code is None
+
+
+def test_csv_without_icao_column():
+    table = AirportTable.from_csv("data/airports.csv")
+    assert len(table) > 0
+    assert all(code == "" for code in table.icao_code.tolist())
+
+
+def test_npz_cache_round_trip_and_invalidation(csv_path, tmp_path):
+    cache_path = str(tmp_path / "airports.npz")
+    first = AirportTable.load(csv_path, cache_path)
+    assert os.path.exists(cache_path)
+    
+    cached = AirportTable.load(csv_path, cache_path)
+    for name in AirportTable.STRING_COLUMNS + AirportTable.FLOAT_COLUMNS:
+        assert cached.columns[name].tolist() == first.columns[name].tolist()
+    
+    # zmiana pliku CSV unieważnia cache
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("JFK,,John F. Kennedy,New York,United States,40.6413,-73.7781,America/New_York\n")
+    reloaded = AirportTable.load(csv_path, cache_path)
+    assert reloaded.code.tolist() == ["WAW", "KRK", "GDN", "LHR", "JFK"]
+
+
+def test_service_lookups(airports):
+    assert AirportService.get_airport("waw").city == "Warsaw"
+    assert AirportService.get_airport("EGLL").code == "LHR"
+    assert AirportService.get_airport("XXX") is None
+    assert [a.code for a in AirportService.search_airports("krak")] == ["KRK"]
@@ -0,0 +1,95 @@
+# tests/test_airport_index.py
+import random
+import string
+
+import pytest
+
+from app.services.airport_index import AirportSearchIndex, fold_text
+
+SYLLABLES = ["war", "saw", "kra", "kow", "lon", "don", "par", "is", "ber", "lin", "new", "york", "san", "ta", "mar", "ia"]
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Losowe lotniska (kody, nazwy i miasta ze wspólnych sylab - dużo częściowych dopasowań)"""
+    rng = random.Random(15)
+    codes, names, cities = [], [], []
+    while len(codes) < 600:
+        code = "".join(rng.choice(string.ascii_uppercase) for _ in range(3))
+        if code in codes:
+            continue
+        city = random_word(rng)
+        codes.append(code)
+        cities.append(city)
+        names.append(f"{city} {random_word(rng)} Airport" if rng.random() < 0.7 else f"{random_word(rng)} International")
+    index = AirportSearchIndex(codes, [""] * len(codes), names, cities)
+    return codes, names, cities, index
+
+
+def linear_search(codes, names, cities, query):
+    """Przeszukiwanie liniowe z pierwotnej wersji search_airports (bez limitu)"""
+    query = query.lower()
+    return [
+        row for row in range(len(codes))
+        if query in codes[row].lower() or query in names[row].lower() or query in cities[row].lower()
+    ]
+
+
+def queries(codes, names, cities):
+    rng = random.Random(7)
+    result = set(SYLLABLES) | {"airport", "international", "xyz", "qqq"}
+    for _ in range(300):
+        text = rng.choice([codes, names, cities])[rng.randrange(len(codes))].lower()
+        start = rng.randrange(len(text))
+        result.add(text[start:start + rng.randint(2, 8)].strip())
+    return sorted(q for q in result if len(q) >= 2)
+
+
+def test_index_finds_the_same_airports_as_linear_search(dataset):
+    codes, names, cities, index = dataset
+    for query in queries(codes, names, cities):
+        expected = set(linear_search(codes, names, cities, query))
+        found = index.search(query, limit=len(codes))
+        assert len(found) == len(set(found))
+        folded = fold_text(query)
+        if " " in folded:
+            # kilka słów - każde jako prefiks dowolnego słowa (także całe zapytanie w tekście)
+            assert set(found) >= expected, query
+        elif len(folded) >= 3:
+            assert set(found) == expected, query
+        else:
+            # krótkie zapytania - tylko prefiksy słów (podzbiór dopasowań w środku tekstu)
+            assert set(found) <= expected, query
+
+
+def test_limit_returns_best_ranked_prefix(dataset):
+    codes, names, cities, index = dataset
+    for query in ["war", "lon", "airport", "sa"]:
+        everything = index.search(query, limit=len(codes))
+        for limit in (1, 5, 10):
+            assert index.search(query, limit) == everything[:limit]
+
+
+def test_exact_code_is_ranked_first(dataset):
+    codes, names, cities, index = dataset
+    for row in range(0, len(codes), 37):
+        assert index.search(codes[row].lower(), limit=5)[0] == row
+
+
+def test_search_ignores_case_and_diacritics():
+    index = AirportSearchIndex(
+        ["KRK", "GDN", "WAW"], ["EPKK", "EPGD", "EPWA"],
+        ["Kraków John Paul II International Airport", "Gdańsk Lech Wałęsa Airport", "Warsaw Chopin Airport"],
+        ["Kraków", "Gdańsk", "Warsaw"]
+    )
+    assert index.search("krakow") == [0]
+    assert index.search("KRAKÓW") == [0]
+    assert index.search("walesa") == [1]
+    assert index.search("epwa") == [2]
+    assert index.lookup_code("epgd") == 1
+    assert index.search("") == []
+    assert index.search("airport", limit=0) == []
@@ -0,0 +1,86 @@
+# tests/test_airport_spatial.py
+import numpy as np
+import pytest
+
+from app.services.airport import AirportService
+from app.services.airport_spatial import EARTH_RADIUS_KM, AirportSpatialIndex
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(17)
+    # równomiernie na sferze, z dodatkowymi punktami przy biegunach i południku 180
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+    lon = rng.uniform(-180, 180, 2000)
+    lat = np.concatenate([lat, rng.uniform(85, 90, 50), rng.uniform(-60, 60, 50)])
+    lon = np.concatenate([lon, rng.uniform(-180, 180, 50), rng.choice([-179.9, 179.9], 50)])
+    return lat, lon
+
+
+QUERIES = [(52.17, 20.97), (0.0, 0.0), (89.9, 45.0), (-89.9, -120.0), (10.0, 179.99), (-33.9, -180.0)]
+
+
+@pytest.mark.parametrize("lat, lon", QUERIES)
+def test_nearest_matches_brute_force(points, lat, lon):
+    index = AirportSpatialIndex(*points)
+    rows, distances = index.nearest(lat, lon, 10)
+    
+    brute = haversine_km(lat, lon, *points)
+    order = np.argsort(brute)[:10]
+    np.testing.assert_allclose(distances, brute[order], atol=1e-6)
+    np.testing.assert_allclose(brute[rows], distances, atol=1e-6)
+    assert np.all(np.diff(distances) >= 0)
+
+
+@pytest.mark.parametrize("lat, lon", QUERIES)
+@pytest.mark.parametrize("radius_km", [0.0, 300.0, 1500.0, 25000.0])
+def test_within_matches_brute_force(points, lat, lon, radius_km):
+    index = AirportSpatialIndex(*points)
+    rows, distances = index.within(lat, lon, radius_km)
+    
+    brute = haversine_km(lat, lon, *points)
+    expected = np.flatnonzero(brute <= radius_km)
+    # punkty dokładnie na granicy promienia mogą wypaść przez zaokrąglenia
+    boundary = np.abs(brute - radius_km) < 1e-6
+    assert set(rows.tolist()) ^ set(expected.tolist()) <= set(np.flatnonzero(boundary).tolist())
+    np.testing.assert_allclose(distances, brute[rows], atol=1e-6)
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_batch_nearest_matches_single_queries(points):
+    index = AirportSpatialIndex(*points)
+    lats = np.array([q[0] for q in QUERIES])
+    lons = np.array([q[1] for q in QUERIES])
+    
+    rows, distances = index.nearest(lats, lons, 3)
+    assert rows.shape == distances.shape == (len(QUERIES), 3)
+    for i, (lat, lon) in enumerate(QUERIES):
+        single_rows, single_distances = index.nearest(lat, lon, 3)
+        np.testing.assert_array_equal(rows[i], single_rows)
+        np.testing.assert_allclose(distances[i], single_distances)
+
+
+def test_empty_index():
+    index = AirportSpatialIndex(np.array([]), np.array([]))
+    rows, distances = index.nearest(52.0, 21.0, 5)
+    assert len(index) == 0 and rows.size == 0 and distances.size == 0
+    rows, distances = index.within(52.0, 21.0, 1000.0)
+    assert rows.size == 0 and distances.size == 0
+
+
+def test_service_nearest_and_within(airports):
+    nearest = AirportService.nearest_airports(52.0, 20.0, limit=2)
+    assert [a.code for a in nearest] == ["WAW", "KRK"]
+    assert nearest[0].distance_km == pytest.approx(haversine_km(52.0, 20.0, 52.1657, 20.9671), abs=1e-6)
+    
+    within = AirportService.airports_within(51.0, 0.0, 1500.0)
+    assert [a.code for a in within] == ["LHR", "KRK", "WAW"]
+    assert AirportService.nearest_airport_rows(np.array([40.0, 1.0]), np.array([-74.0, 104.0])).tolist() == [
+        AirportService.get_table().row_for_code("JFK"), AirportService.get_table().row_for_code("SIN")
+    ]
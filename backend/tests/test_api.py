@@ -0,0 +1,180 @@
+# tests/test_api.py
+import pytest
+
+from app.core.config import settings
+from app.services.airport import AirportDataNotLoadedError, AirportService
+
+API = settings.API_V1_STR
+
+SEAT_REQUESTS = [
+    {"departure_airport": "WAW", "arrival_airport": "LHR", "departure_date": "2026-06-01",
+     "departure_time": "18:30", "sun_preference": "sunset"},
+    {"departure_airport": "LHR", "arrival_airport": "KRK", "departure_date": "2026-01-10",
+     "departure_time": "05:30", "sun_preference": "sunrise"},
+    {"departure_airport": "XXX", "arrival_airport": "KRK", "departure_date": "2026-01-10",
+     "departure_time": "05:30", "sun_preference": "sunrise"},
+]
+
+
+def test_batch_matches_single_requests(client):
+    singles = [client.post(f"{API}/calculate-seat", json=body) for body in SEAT_REQUESTS]
+    assert [r.status_code for r in singles] == [200, 200, 500]
+    
+    response = client.post(f"{API}/calculate-seat/batch", json={"requests": SEAT_REQUESTS * 2})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == list(range(6))
+    for item in results:
+        single = singles[item["index"] % 3]
+        if single.status_code == 200:
+            assert item["error"] is None
+            assert item["result"] == single.json()
+        else:
+            assert item["result"] is None
+            assert "Invalid departure or arrival airport" in item["error"]
+
+
+def test_airport_endpoints_wait_for_loaded_data(client, monkeypatch):
+    # bez danych z lifespan - 503 zamiast ładowania pliku na ścieżce żądania
+    monkeypatch.setattr(AirportService, "_table", None)
+    with pytest.raises(AirportDataNotLoadedError):
+        AirportService.get_table()
+    assert client.get(f"{API}/airports/WAW").status_code == 503
+    assert client.get(f"{API}/airports/search", params={"query": "war"}).status_code == 503
+    assert client.post(f"{API}/calculate-seat", json=SEAT_REQUESTS[0]).status_code == 503
+    assert client.post(f"{API}/calculate-seat/batch", json={"requests": SEAT_REQUESTS[:1]}).status_code == 503
+    assert not AirportService.is_loaded()
+
+
+def test_batch_rejects_empty_and_oversized_lists(client):
+    assert client.post(f"{API}/calculate-seat/batch", json={"requests": []}).status_code == 400
+    
+    oversized = {"requests": SEAT_REQUESTS[:1] * (settings.BATCH_MAX_SIZE + 1)}
+    assert client.post(f"{API}/calculate-seat/batch", json=oversized).status_code == 413
+
+
+def test_batch_validates_every_request(client):
+    invalid = dict(SEAT_REQUESTS[0], sun_preference="noon")
+    response = client.post(f"{API}/calculate-seat/batch", json={"requests": [SEAT_REQUESTS[0], invalid]})
+    assert response.status_code == 422
+
+
+def test_seat_response_etag_and_not_modified(client):
+    body = SEAT_REQUESTS[0]
+    first = client.post(f"{API}/calculate-seat", json=body)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    
+    # klucz cache jest znormalizowany - kod małymi literami trafia w ten sam wpis
+    same = client.post(f"{API}/calculate-seat", json=dict(body, departure_airport="waw"))
+    assert same.headers["etag"] == etag and same.content == first.content
+    
+    not_modified = client.post(f"{API}/calculate-seat", json=body, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    
+    changed = client.post(f"{API}/calculate-seat", json=body, headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200 and changed.json() == first.json()
+    
+    other = client.post(f"{API}/calculate-seat", json=dict(body, sun_preference="sunrise"))
+    assert other.headers["etag"] != etag
+
+
+def test_seat_response_expires_with_weather_data(client):
+    from app.api.routes import seat_response_cache
+    from app.services.weather import WeatherService
+    from app.services.weather_providers import SyntheticWeatherProvider
+    
+    class ForecastProvider(SyntheticWeatherProvider):
+        # prognoza dla każdej daty - odpowiedź korzysta z cache pogody
+        def covers(self, time_utc):
+            return True
+    
+    WeatherService.set_provider(ForecastProvider(seed=0))
+    body = SEAT_REQUESTS[0]
+    fresh = client.post(f"{API}/calculate-seat", json=body)
+    assert len(WeatherService._cache) > 0
+    max_age = int(fresh.headers["cache-control"].split("max-age=")[1])
+    assert seat_response_cache.ttl - 5 <= max_age <= seat_response_cache.ttl
+    
+    # te same dane pogodowe, którym zostało 60 s życia
+    for key, (_, value) in list(WeatherService._cache._data.items()):
+        WeatherService._cache.set(key, value, ttl=60.0)
+    seat_response_cache.clear()
+    aged = client.post(f"{API}/calculate-seat", json=body)
+    assert 55 <= int(aged.headers["cache-control"].split("max-age=")[1]) <= 60
+    assert aged.headers["etag"] == fresh.headers["etag"]
+
+
+def test_fallback_weather_response_is_cached_briefly(client, fake_clock):
+    from app.services.weather import WeatherService
+    from app.services.weather_providers import SyntheticWeatherProvider
+    
+    class ForecastProvider(SyntheticWeatherProvider):
+        def covers(self, time_utc):
+            return True
+    
+    class FailingProvider(ForecastProvider):
+        async def fetch_forecast(self, lat, lon, date_str):
+            raise RuntimeError("upstream niedostępny")
+    
+    # odpowiedź z pogodą zastępczą żyje tylko WEATHER_FALLBACK_TTL_SECONDS
+    WeatherService.set_provider(FailingProvider(seed=0))
+    body = SEAT_REQUESTS[0]
+    degraded = client.post(f"{API}/calculate-seat", json=body)
+    assert degraded.status_code == 200
+    assert degraded.headers["cache-control"] == f"private, max-age={int(settings.WEATHER_FALLBACK_TTL_SECONDS)}"
+    
+    # po odzyskaniu dostawcy i wygaśnięciu wpisu - odpowiedź z prawdziwą prognozą
+    WeatherService.set_provider(ForecastProvider(seed=0))
+    fake_clock.advance(settings.WEATHER_FALLBACK_TTL_SECONDS)
+    recovered = client.post(f"{API}/calculate-seat", json=body)
+    assert recovered.headers["etag"] != degraded.headers["etag"]
+    assert int(recovered.headers["cache-control"].split("max-age=")[1]) > settings.WEATHER_FALLBACK_TTL_SECONDS
+
+
+SEARCH = {"departure_airport": "WAW", "arrival_airport": "LHR", "start_date": "2026-10-18",
+          "end_date": "2026-10-19", "step_minutes": 60, "sun_preference": "sunset", "limit": 48}
+
+
+def test_departure_search_endpoint(client):
+    response = client.post(f"{API}/departure-times/search", json=SEARCH)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["candidates_evaluated"] == 48
+    assert len(data["results"]) == 48
+    assert all(0 <= r["quality_score"] <= 100 for r in data["results"])
+    
+    # najlepsza godzina wylotu - wydarzenie widoczne także w pojedynczej rekomendacji
+    top = data["results"][0]
+    assert top["sun_event_visible"]
+    seat = client.post(f"{API}/calculate-seat", json={
+        "departure_airport": "WAW", "arrival_airport": "LHR", "sun_preference": "sunset",
+        "departure_date": top["departure_time"][:10], "departure_time": top["departure_time"][11:16]
+    }).json()
+    assert seat["sun_events_visible"]
+
+
+def test_departure_search_quality_is_bounded(client):
+    # WAW-LHR 18.10.2026 15:00 (zachód) - ranking dawniej zwracał quality_score 277.6
+    body = {"departure_airport": "WAW", "arrival_airport": "LHR", "departure_date": "2026-10-18",
+            "departure_time": "15:00", "sun_preference": "sunset"}
+    single = client.post(f"{API}/calculate-seat", json=body).json()
+    batch = client.post(f"{API}/calculate-seat/batch", json={"requests": [body]}).json()
+    search = client.post(f"{API}/departure-times/search", json=SEARCH).json()
+    
+    assert batch["results"][0]["result"]["recommendation"]["quality_score"] == single["recommendation"]["quality_score"]
+    assert all(0 <= r["quality_score"] <= 100 for r in search["results"])
+    candidate = next(r for r in search["results"] if r["departure_time"] == "2026-10-18T15:00:00")
+    assert 0 <= candidate["quality_score"] <= 100
+
+
+def test_departure_search_validation(client):
+    url = f"{API}/departure-times/search"
+    assert client.post(url, json=dict(SEARCH, end_date="2026-10-01")).status_code == 422
+    assert client.post(url, json=dict(SEARCH, sun_preference="noon")).status_code == 422
+    assert client.post(url, json=dict(SEARCH, step_minutes=1)).status_code == 422
+    assert client.post(url, json=dict(SEARCH, limit=0)).status_code == 422
+    assert client.post(url, json=dict(SEARCH, end_date="2027-10-18", step_minutes=5)).status_code == 413
+    assert client.post(url, json=dict(SEARCH, departure_airport="XXX")).status_code == 500
\ No newline at end of file
@@ -0,0 +1,150 @@
+# tests/test_cache.py
+import asyncio
+import pickle
+
+from app.core.cache import LRUCache, SingleFlight, TTLCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" staje się najnowszy
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_overwrite_refreshes_entry():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_lru_stats_and_clear():
+    cache = LRUCache(maxsize=4)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "entries": 1, "maxsize": 4}
+    cache.clear()
+    assert cache.stats()["entries"] == cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+
+def test_lru_with_zero_size_stores_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_pickles_empty():
+    cache = LRUCache(maxsize=4)
+    cache.set("a", 1)
+    cache.get("a")
+    
+    copy = pickle.loads(pickle.dumps(cache))
+    assert len(copy) == 0 and copy.hits == 0 and copy.maxsize == 4
+    copy.set("b", 2)
+    assert copy.get("b") == 2
+
+
+def test_ttl_entry_expires(fake_clock):
+    cache = TTLCache(maxsize=4, ttl=10.0)
+    cache.set("a", 1)
+    
+    fake_clock.advance(9.9)
+    assert cache.get("a") == 1
+    fake_clock.advance(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_ttl_per_entry_override(fake_clock):
+    cache = TTLCache(maxsize=4, ttl=10.0)
+    cache.set("short", 1, ttl=2.0)
+    cache.set("default", 2)
+    
+    fake_clock.advance(5.0)
+    assert cache.get("short") is None
+    assert cache.get("default") == 2
+
+
+def test_ttl_expires_at_does_not_touch_stats_or_order(fake_clock):
+    cache = TTLCache(maxsize=2, ttl=10.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    
+    assert cache.expires_at("a") == fake_clock.now + 10.0
+    assert cache.expires_at("missing") is None
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+    # "a" nadal najstarszy - wypada przy dodaniu trzeciego wpisu
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    
+    fake_clock.advance(10.0)
+    assert cache.expires_at("b") is None
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "data"
+    
+    async def main():
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)), flight.do("other", fetch))
+        # po zakończeniu klucz jest zapominany - kolejne wywołanie wykonuje fetch ponownie
+        results.append(await flight.do("key", fetch))
+        return results
+    
+    assert asyncio.run(main()) == ["data"] * 7
+    assert len(calls) == 3
+    assert flight.stats() == {"calls": 3, "coalesced": 4, "inflight": 0}
+
+
+def test_single_flight_shares_exception():
+    flight = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+    
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+    
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["calls"] == 1
+
+
+def test_single_flight_cancelled_waiter_does_not_cancel_others():
+    flight = SingleFlight()
+    
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "data"
+    
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return first, await second
+    
+    first, result = asyncio.run(main())
+    assert first.cancelled()
+    assert result == "data"
\ No newline at end of file
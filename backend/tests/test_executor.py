@@ -0,0 +1,109 @@
+# tests/test_executor.py
+import asyncio
+import threading
+from datetime import date, time
+
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.executor import ComputeExecutor, ExecutorBusyError
+from app.core.log import request_id_var
+from app.models.schemas import FlightRequest
+from app.services import flight
+from app.services.flight import FlightRouteService, init_compute_worker
+
+API = settings.API_V1_STR
+
+REQUEST = FlightRequest(
+    departure_airport="WAW", arrival_airport="LHR",
+    departure_date=date(2026, 6, 1), departure_time=time(18, 30), sun_preference="sunset"
+)
+
+
+def test_executor_rejects_when_queue_is_full():
+    executor = ComputeExecutor("thread", max_workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+    
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "done"
+    
+    async def main():
+        first = asyncio.ensure_future(executor.run(blocking))
+        await asyncio.to_thread(started.wait, 5)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(blocking)
+        release.set()
+        return await first
+    
+    try:
+        assert asyncio.run(main()) == "done"
+    finally:
+        executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["completed"] == 1
+    assert executor.stats()["pending"] == 0
+
+
+def test_thread_mode_keeps_request_context():
+    executor = ComputeExecutor("thread", max_workers=2)
+    
+    def work():
+        with metrics.stage("work"):
+            return request_id_var.get()
+    
+    async def main():
+        request_id_var.set("req-123")
+        stages = {}
+        metrics._request_stages.set(stages)
+        return await executor.run(work), stages
+    
+    try:
+        request_id, stages = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    # identyfikator żądania w logach i czasy etapów (Server-Timing) z wątku puli
+    assert request_id == "req-123"
+    assert "work" in stages
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_modes_match_inline(airports, monkeypatch, mode):
+    service = FlightRouteService()
+    monkeypatch.setattr(flight, "compute_executor", ComputeExecutor("inline"))
+    inline = asyncio.run(service.get_seat_recommendation(REQUEST))
+    
+    executor = ComputeExecutor(mode, max_workers=2)
+    if mode == "process":
+        # procesy robocze ładują te same lotniska co test (zamiast data/airports.csv)
+        executor.set_initializer(_init_worker_with_table, airports)
+    monkeypatch.setattr(flight, "compute_executor", executor)
+    try:
+        pooled = asyncio.run(service.get_seat_recommendation(REQUEST))
+    finally:
+        executor.shutdown()
+    assert pooled.model_dump() == inline.model_dump()
+
+
+def _init_worker_with_table(table):
+    from app.services.airport import AirportService
+    
+    init_compute_worker()
+    AirportService.set_table(table)
+
+
+def test_busy_executor_returns_503(client, monkeypatch):
+    busy = ComputeExecutor("thread", max_workers=1, max_queue=0)
+    busy._pending = busy.max_workers + busy.max_queue
+    monkeypatch.setattr(flight, "compute_executor", busy)
+    
+    body = {"departure_airport": "WAW", "arrival_airport": "LHR", "departure_date": "2026-06-01",
+            "departure_time": "18:30", "sun_preference": "sunset"}
+    search = {"departure_airport": "WAW", "arrival_airport": "LHR", "start_date": "2026-06-01",
+              "end_date": "2026-06-01", "step_minutes": 60, "sun_preference": "sunset"}
+    assert client.post(f"{API}/calculate-seat", json=body).status_code == 503
+    assert client.post(f"{API}/calculate-seat/batch", json={"requests": [body]}).status_code == 503
+    assert client.post(f"{API}/departure-times/search", json=search).status_code == 503
+    assert busy.stats()["rejected"] == 3
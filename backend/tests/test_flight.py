@@ -0,0 +1,132 @@
+# tests/test_flight.py
+import asyncio
+from datetime import date, time, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import DepartureSearchRequest, FlightRequest
+from app.services.airport import AirportService
+from app.services.flight import FlightRouteService
+from app.services.weather import WeatherService
+
+
+@pytest.mark.parametrize("altitude, expected", [
+    (-30.0, 240.0), (-0.5, 122.0), (0.0, 80.0), (1.0, 85.0), (2.0, 94.0), (5.0, 100.0),
+    (10.0, 90.0), (15.0, 60.0), (30.0, 0.0), (90.0, 0.0),
+])
+def test_view_quality_scale(altitude, expected):
+    # skala rekomendacji miejsca (/calculate-seat) - bez zmian względem wersji skalarnej
+    assert FlightRouteService._view_quality(np.array([altitude]))[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("altitude, expected", [
+    (-30.0, 0.0), (-0.5, 0.0), (0.0, 0.0), (1.0, 85.0), (5.0, 100.0), (15.0, 60.0), (90.0, 0.0),
+])
+def test_departure_view_quality_scale(altitude, expected):
+    assert FlightRouteService._departure_view_quality(np.array([altitude]))[0] == pytest.approx(expected)
+
+
+def test_departure_view_quality_is_bounded():
+    altitude = np.linspace(-90, 90, 3601)
+    quality = FlightRouteService._departure_view_quality(altitude)
+    assert np.all((quality >= 0) & (quality <= 100))
+    assert np.all(quality[altitude <= 0] == 0)
+
+
+def search_request(**overrides) -> DepartureSearchRequest:
+    fields = dict(
+        departure_airport="WAW", arrival_airport="LHR",
+        start_date=date(2026, 6, 1), end_date=date(2026, 6, 3),
+        step_minutes=30, sun_preference="sunset", limit=100
+    )
+    fields.update(overrides)
+    return DepartureSearchRequest(**fields)
+
+
+def test_departure_offsets_cover_whole_days():
+    offsets = FlightRouteService.departure_offsets(search_request(step_minutes=45))
+    assert offsets[0] == 0 and offsets[-1] < 3 * 1440
+    assert len(offsets) == len(range(0, 3 * 1440, 45))
+
+
+@pytest.mark.parametrize("preference", ["sunrise", "sunset"])
+def test_ranking_order_and_bounds(airports, preference):
+    service = FlightRouteService()
+    request = search_request(sun_preference=preference)
+    response = asyncio.run(service.search_departure_times(request))
+    
+    assert response.candidates_evaluated == 3 * 48
+    results = response.results
+    assert len(results) == request.limit
+    assert all(0 <= r.quality_score <= 100 for r in results)
+    assert [r.sun_event_visible for r in results] == sorted((r.sun_event_visible for r in results), reverse=True)
+    visible = [r for r in results if r.sun_event_visible]
+    assert visible
+    qualities = [r.quality_score for r in visible]
+    assert qualities == sorted(qualities, reverse=True)
+    for r in visible:
+        assert r.departure_time <= r.event_time <= r.arrival_time
+        assert r.departure_time <= r.best_time <= r.arrival_time
+        assert r.arrival_time - r.departure_time == timedelta(hours=response.flight_duration)
+
+
+def test_event_times_match_terminator_crossings(airports):
+    service = FlightRouteService()
+    request = search_request(sun_preference="sunset", limit=10)
+    response = asyncio.run(service.search_departure_times(request))
+    route = service.calculate_flight_route_arrays(AirportService.get_airport("WAW"), AirportService.get_airport("LHR"))
+    
+    for candidate in response.results:
+        events = service.sun_service.find_terminator_crossings(route, candidate.departure_time)
+        sunsets = [e.event_time for e in events if e.event_type == "sunset"]
+        assert bool(sunsets) == candidate.sun_event_visible
+        if sunsets:
+            # interpolacja liniowa między punktami trasy - zgodność do kilku minut
+            assert abs((sunsets[0] - candidate.event_time).total_seconds()) < 300
+
+
+def test_search_rejects_unknown_airport(airports):
+    service = FlightRouteService()
+    with pytest.raises(ValueError):
+        asyncio.run(service.search_departure_times(search_request(departure_airport="XXX")))
+
+
+def test_route_weather_scores_interpolate_profile(airports, monkeypatch):
+    requested = []
+    
+    async def profile(points, semaphore=None):
+        requested.extend(points)
+        return [{"viewing_score": 100.0 * i / (len(points) - 1)} for i in range(len(points))]
+    
+    monkeypatch.setattr(WeatherService, "get_weather_profile", profile)
+    service = FlightRouteService()
+    request = FlightRequest(
+        departure_airport="WAW", arrival_airport="JFK", departure_date=date(2026, 6, 21),
+        departure_time=time(20, 40), sun_preference="sunset", weather_profile=True
+    )
+    context = service._prepare_flight(request)
+    scores = asyncio.run(service._route_weather_scores(context))
+    
+    route_points = context["route_points"]
+    assert len(requested) == settings.WEATHER_PROFILE_POINTS
+    assert requested[0][2] == context["departure_time"]
+    assert len(scores) == len(route_points)
+    assert scores[0] == 0.0 and scores[-1] == 100.0
+    assert np.all(np.diff(scores) >= 0)
+
+
+def test_uniform_weather_profile_keeps_recommendation(airports, monkeypatch):
+    async def clear_sky(points, semaphore=None):
+        return [{"viewing_score": 100}] * len(points)
+    
+    service = FlightRouteService()
+    request = FlightRequest(
+        departure_airport="WAW", arrival_airport="JFK", departure_date=date(2026, 6, 21),
+        departure_time=time(20, 40), sun_preference="sunset"
+    )
+    plain = asyncio.run(service.get_seat_recommendation(request))
+    monkeypatch.setattr(WeatherService, "get_weather_profile", clear_sky)
+    profiled = asyncio.run(service.get_seat_recommendation(request.model_copy(update={"weather_profile": True})))
+    assert profiled.model_dump() == plain.model_dump()
\ No newline at end of file
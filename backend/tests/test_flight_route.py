@@ -0,0 +1,126 @@
+# tests/test_flight_route.py
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.flight_route import FlightRouteCalculator
+from tests.conftest import AIRPORTS
+
+COORDS = {a[0]: (a[5], a[6]) for a in AIRPORTS}
+PAIRS = [("WAW", "KRK"), ("LHR", "JFK"), ("SIN", "JFK"), ("LYR", "ANC")]
+DEPARTURE = datetime(2026, 3, 20, 5, 30)
+
+
+def scalar_route(calc: FlightRouteCalculator, dep_lat, dep_lon, arr_lat, arr_lon, departure_time, steps):
+    """Trasa liczona punkt po punkcie - pętla z pierwotnej wersji calculate_route (wzorzec)"""
+    distance_km = calc._haversine_distance(dep_lat, dep_lon, arr_lat, arr_lon)
+    flight_time_hours = calc._estimate_flight_time(distance_km)
+    climb_time_hours = calc.typical_cruise_altitude / (calc.climb_rate * 3600)
+    descent_time_hours = calc.typical_cruise_altitude / (calc.descent_rate * 3600)
+    cruise_time_hours = flight_time_hours - climb_time_hours - descent_time_hours
+    climb_distance = (climb_time_hours * calc.typical_cruise_speed) / 2
+    descent_distance = (descent_time_hours * calc.typical_cruise_speed) / 2
+    cruise_distance = distance_km - climb_distance - descent_distance
+    
+    points = []
+    for i in range(steps + 1):
+        fraction = i / steps
+        time_elapsed = flight_time_hours * fraction
+        if time_elapsed <= climb_time_hours:
+            phase_fraction = time_elapsed / climb_time_hours
+            altitude = calc.typical_cruise_altitude * phase_fraction
+            distance_fraction = (climb_distance / distance_km) * phase_fraction
+        elif time_elapsed >= flight_time_hours - descent_time_hours:
+            phase_fraction = (time_elapsed - (flight_time_hours - descent_time_hours)) / descent_time_hours
+            altitude = calc.typical_cruise_altitude * (1 - phase_fraction)
+            distance_fraction = (climb_distance + cruise_distance) / distance_km + \
+                (descent_distance / distance_km) * phase_fraction
+        else:
+            altitude = calc.typical_cruise_altitude
+            cruise_phase_fraction = (time_elapsed - climb_time_hours) / cruise_time_hours
+            distance_fraction = climb_distance / distance_km + (cruise_distance / distance_km) * cruise_phase_fraction
+        
+        position = calc._intermediate_point(dep_lat, dep_lon, arr_lat, arr_lon, distance_fraction)
+        points.append({
+            "lat": float(position["lat"]),
+            "lon": float(position["lon"]),
+            "alt": altitude,
+            "time": departure_time + timedelta(hours=time_elapsed),
+            "time_fraction": fraction,
+            "total_duration_hours": flight_time_hours
+        })
+    return points
+
+
+@pytest.mark.parametrize("pair", PAIRS)
+@pytest.mark.parametrize("steps", [1, 20, 137])
+def test_vectorized_route_matches_scalar_loop(pair, steps):
+    calc = FlightRouteCalculator()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS[pair[0]], COORDS[pair[1]]
+    
+    expected = scalar_route(calc, dep_lat, dep_lon, arr_lat, arr_lon, DEPARTURE, steps)
+    actual = calc.calculate_route(dep_lat, dep_lon, arr_lat, arr_lon, DEPARTURE, steps)
+    
+    assert len(actual) == len(expected) == steps + 1
+    for got, want in zip(actual, expected):
+        assert set(got) == set(want)
+        assert got["lat"] == pytest.approx(want["lat"], abs=1e-9)
+        assert got["lon"] == pytest.approx(want["lon"], abs=1e-9)
+        assert got["alt"] == pytest.approx(want["alt"], abs=1e-6)
+        assert abs((got["time"] - want["time"]).total_seconds()) < 1e-3
+        assert got["time_fraction"] == pytest.approx(want["time_fraction"])
+        assert got["total_duration_hours"] == pytest.approx(want["total_duration_hours"])
+
+
+def test_route_arrays_endpoints_and_time_axis():
+    calc = FlightRouteCalculator()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS["LHR"], COORDS["JFK"]
+    route = calc.calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, 50)
+    
+    assert len(route) == 51
+    assert (route.latitude[0], route.longitude[0]) == pytest.approx((dep_lat, dep_lon))
+    assert (route.latitude[-1], route.longitude[-1]) == pytest.approx((arr_lat, arr_lon))
+    assert route.time_offset[0] == 0.0
+    assert route.time_offset[-1] == pytest.approx(route.duration_hours)
+    assert np.all(np.diff(route.time_offset) > 0)
+    assert route.altitude.max() == pytest.approx(calc.typical_cruise_altitude)
+    assert route.distance_km == pytest.approx(5540, rel=0.01)
+
+
+@pytest.mark.parametrize("pair", PAIRS)
+def test_position_at_matches_route_points(pair):
+    calc = FlightRouteCalculator()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS[pair[0]], COORDS[pair[1]]
+    route = calc.calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, 40)
+    
+    lat, lon, alt = route.position_at(route.time_offset)
+    np.testing.assert_allclose(lat, route.latitude, atol=1e-9)
+    np.testing.assert_allclose(lon, route.longitude, atol=1e-9)
+    np.testing.assert_allclose(alt, route.altitude, atol=1e-6)
+
+
+@pytest.mark.parametrize("pair", PAIRS)
+def test_phase_segments_reproduce_distance_fraction(pair):
+    calc = FlightRouteCalculator()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS[pair[0]], COORDS[pair[1]]
+    route = calc.calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, 20)
+    knots, fraction_start, rate = route.phase_segments()
+    
+    # ułamek odległości jest liniowy w każdym odcinku
+    times = np.linspace(0.0, route.duration_hours, 997)
+    expected, _ = calc._phase_profile(route.distance_km, route.duration_hours, times)
+    segment = np.clip(np.searchsorted(knots, times, side="right") - 1, 0, len(rate) - 1)
+    actual = fraction_start[segment] + rate[segment] * (times - knots[segment])
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+    assert route.phase_segments() is route.phase_segments()
+
+
+def test_route_cache_returns_same_geometry():
+    calc = FlightRouteCalculator()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS["WAW"], COORDS["LHR"]
+    first = calc.get_route_arrays(("WAW", "LHR", 20), dep_lat, dep_lon, arr_lat, arr_lon, 20)
+    second = calc.get_route_arrays(("WAW", "LHR", 20), dep_lat, dep_lon, arr_lat, arr_lon, 20)
+    
+    assert first is second
+    assert calc.route_cache.stats()["hits"] == 1
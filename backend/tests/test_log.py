@@ -0,0 +1,75 @@
+# tests/test_log.py
+import logging
+import queue
+
+import pytest
+
+from app.core import log
+from app.core.config import settings
+from app.core.log import DebugSamplingFilter, RequestContextFilter, _AsyncQueueHandler, redact, request_id_var
+
+API = settings.API_V1_STR
+
+
+def make_record(level: int = logging.INFO, msg: str = "wpis", *args) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("GET /forecast.json?key=abc123&q=52.1,21.0", "GET /forecast.json?key=***&q=52.1,21.0"),
+    ('{"token": "xyz", "q": "WAW"}', '{"token": "***", "q": "WAW"}'),
+    ("Authorization: Bearer", "Authorization: ***"),
+    ("monkey=banana", "monkey=banana"),
+])
+def test_redact_secret_parameters(text, expected):
+    assert redact(text) == expected
+
+
+def test_redact_configured_api_key(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHERAPI_KEY", "s3cr3t-key")
+    assert redact("błąd dla klucza s3cr3t-key") == "błąd dla klucza ***"
+
+
+def test_debug_sampling_keeps_whole_requests():
+    def passes(sampling: DebugSamplingFilter, request_id: str, level: int = logging.DEBUG) -> bool:
+        record = make_record(level)
+        record.request_id = request_id
+        return sampling.filter(record)
+    
+    request_ids = [f"req-{i}" for i in range(200)]
+    assert not any(passes(DebugSamplingFilter(0.0), r) for r in request_ids)
+    assert all(passes(DebugSamplingFilter(1.0), r) for r in request_ids)
+    assert all(passes(DebugSamplingFilter(0.0), r, logging.INFO) for r in request_ids)
+    
+    sampling = DebugSamplingFilter(0.25)
+    sampled = [r for r in request_ids if passes(sampling, r)]
+    assert 20 <= len(sampled) <= 80
+    # ta sama decyzja dla wszystkich wpisów żądania
+    assert sampled == [r for r in request_ids if passes(sampling, r)]
+
+
+def test_queue_handler_redacts_and_drops_when_full():
+    handler = _AsyncQueueHandler(queue.Queue(maxsize=1))
+    handler.addFilter(RequestContextFilter())
+    dropped = log.LOG_RECORDS_DROPPED._values.get((), 0.0)
+    
+    token = request_id_var.set("req-1")
+    try:
+        handler.handle(make_record(logging.WARNING, "zapytanie %s nieudane", "forecast.json?key=abc123"))
+        handler.handle(make_record(logging.WARNING, "drugi wpis"))
+    finally:
+        request_id_var.reset(token)
+    
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "zapytanie forecast.json?key=*** nieudane"
+    assert record.request_id == "req-1"
+    assert handler.queue.empty()
+    assert log.LOG_RECORDS_DROPPED._values[()] == dropped + 1
+
+
+def test_request_id_header(client):
+    given = client.get(f"{API}/health", headers={"X-Request-ID": "abc-123"})
+    assert given.headers["x-request-id"] == "abc-123"
+    
+    generated = client.get(f"{API}/health").headers["x-request-id"]
+    assert len(generated) == 32 and generated != client.get(f"{API}/health").headers["x-request-id"]
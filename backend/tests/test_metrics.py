@@ -0,0 +1,86 @@
+# tests/test_metrics.py
+import asyncio
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry, server_timing
+
+API = settings.API_V1_STR
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Żądania", ("route",))
+    duration = registry.histogram("app_duration_seconds", "Czas", buckets=(0.1, 1.0))
+    registry.add_collector(lambda: [("app_entries", "gauge", "Wpisy", [({}, 3)])])
+    
+    requests.inc(route="/a")
+    requests.inc(2, route='/"b"')
+    for value in (0.05, 0.1, 0.5, 5.0):
+        duration.observe(value)
+    
+    lines = registry.render().splitlines()
+    assert lines == [
+        "# HELP app_requests_total Żądania",
+        "# TYPE app_requests_total counter",
+        'app_requests_total{route="/a"} 1',
+        'app_requests_total{route="/\\"b\\""} 2',
+        "# HELP app_duration_seconds Czas",
+        "# TYPE app_duration_seconds histogram",
+        'app_duration_seconds_bucket{le="0.1"} 2',
+        'app_duration_seconds_bucket{le="1"} 3',
+        'app_duration_seconds_bucket{le="+Inf"} 4',
+        "app_duration_seconds_sum 5.65",
+        "app_duration_seconds_count 4",
+        "# HELP app_entries Wpisy",
+        "# TYPE app_entries gauge",
+        "app_entries 3",
+    ]
+
+
+def test_stage_sums_durations_of_current_request():
+    async def main():
+        stages = {}
+        metrics._request_stages.set(stages)
+        for _ in range(2):
+            with metrics.stage("weather"):
+                await asyncio.sleep(0.01)
+        return stages
+    
+    stages = asyncio.run(main())
+    assert list(stages) == ["weather"]
+    assert stages["weather"] >= 0.02
+    # poza żądaniem etap trafia tylko do histogramu
+    with metrics.stage("weather"):
+        pass
+    assert metrics._request_stages.get() is None
+
+
+def test_server_timing_header_value():
+    assert server_timing({"route": 0.0012, "weather": 0.25}, 0.3) == "route;dur=1.20, weather;dur=250.00, total;dur=300.00"
+
+
+def test_seat_response_has_server_timing(client):
+    body = {"departure_airport": "WAW", "arrival_airport": "LHR", "departure_date": "2026-06-01",
+            "departure_time": "18:30", "sun_preference": "sunset"}
+    response = client.post(f"{API}/calculate-seat", json=body)
+    assert response.status_code == 200
+    entries = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+    assert {"weather", "build_response", "total"} <= set(entries)
+    assert all(float(value) >= 0 for value in entries.values())
+
+
+def test_metrics_endpoint(client):
+    client.get(f"{API}/airports/WAW")
+    response = client.get(f"{API}/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    
+    text = response.text
+    # etykieta route to szablon ścieżki, a nie konkretny kod lotniska
+    requests = [line for line in text.splitlines() if line.startswith("sunflight_http_requests_total{")]
+    assert any('/airports/{code}",status="200"}' in line for line in requests)
+    assert not any("WAW" in line for line in requests)
+    assert "# TYPE sunflight_http_request_duration_seconds histogram" in text
+    assert 'sunflight_cache_entries{cache="route"}' in text
+    assert "sunflight_compute_pending " in text
@@ -0,0 +1,84 @@
+# tests/test_readiness.py
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.readiness import Readiness, readiness
+from app.services import warmup
+from app.services.flight import FlightRouteService
+
+
+def test_ready_only_after_required_stages_succeed():
+    state = Readiness()
+    assert not state.ready
+    
+    state.register("data")
+    state.register("cache", required=False)
+    state.start("data")
+    assert not state.ready
+    state.complete("data")
+    # etap opcjonalny jeszcze nie zakończony
+    assert not state.ready
+    
+    state.start("cache")
+    state.fail("cache", RuntimeError("brak pamięci"))
+    assert state.ready
+    
+    snapshot = state.snapshot()
+    assert snapshot["ready"]
+    assert snapshot["stages"]["data"]["status"] == Readiness.DONE
+    assert snapshot["stages"]["cache"]["status"] == Readiness.FAILED
+    assert snapshot["stages"]["cache"]["error"] == "brak pamięci"
+    assert "started_at" not in snapshot["stages"]["data"]
+
+
+def test_failed_required_stage_is_not_ready():
+    state = Readiness()
+    state.register("data")
+    state.start("data")
+    state.fail("data", RuntimeError("brak pliku"))
+    assert not state.ready
+
+
+def test_warm_caches_completes_stages(airports, monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "WARMUP_ROUTE_PAIRS", ["WAW-LHR", "krk-jfk", "WAW-XXX"])
+    monkeypatch.setattr(settings, "WARMUP_EPHEMERIS_DAYS", 1)
+    service = FlightRouteService()
+    
+    warmup.register_stages()
+    try:
+        assert not readiness.ready
+        asyncio.run(warmup.run_stage(warmup.STAGE_AIRPORTS, lambda: None))
+        asyncio.run(warmup.warm_caches(service))
+        snapshot = readiness.snapshot()
+    finally:
+        readiness.reset()
+    
+    assert snapshot["ready"]
+    assert {name: stage["status"] for name, stage in snapshot["stages"].items()} == {
+        warmup.STAGE_AIRPORTS: Readiness.DONE,
+        warmup.STAGE_SEARCH_INDEX: Readiness.DONE,
+        warmup.STAGE_ROUTES: Readiness.DONE,
+        warmup.STAGE_EPHEMERIS: Readiness.DONE,
+    }
+    # nieznane lotnisko pominięte, pozostałe trasy w cache
+    assert service.route_calculator.route_cache.stats()["entries"] == 2
+
+
+def test_ready_endpoint_reports_stages(client):
+    deadline = time.monotonic() + 10
+    while client.get(f"{settings.API_V1_STR}/ready").status_code != 200 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    response = client.get(f"{settings.API_V1_STR}/ready")
+    assert response.status_code == 200
+    assert response.json()["stages"][warmup.STAGE_AIRPORTS]["status"] == Readiness.DONE
+    
+    # nowy etap w toku - proces przestaje przyjmować ruch
+    readiness.register("reload")
+    response = client.get(f"{settings.API_V1_STR}/ready")
+    assert response.status_code == 503
+    assert not response.json()["ready"]
+    readiness.start("reload")
+    readiness.complete("reload")
+    assert client.get(f"{settings.API_V1_STR}/ready").status_code == 200
@@ -0,0 +1,182 @@
+# tests/test_resilience.py
+import asyncio
+
+import pytest
+
+from app.core.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, RetryBudget
+
+
+class UpstreamError(Exception):
+    pass
+
+
+def make_caller(breaker=None, budget=None, max_attempts=3, timeout=1.0) -> ResilientCaller:
+    return ResilientCaller(
+        timeout=timeout,
+        max_attempts=max_attempts,
+        base_delay=0.0,
+        max_delay=0.0,
+        breaker=breaker or CircuitBreaker(failure_threshold=100, recovery_timeout=30.0),
+        budget=budget or RetryBudget(ratio=0.1, max_tokens=10.0),
+        retry_on=(UpstreamError, asyncio.TimeoutError)
+    )
+
+
+def flaky(failures: int, calls: list):
+    """Funkcja, która failures razy rzuca UpstreamError, a potem zwraca "ok" """
+    async def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise UpstreamError()
+        return "ok"
+    return fn
+
+
+def test_breaker_opens_after_consecutive_failures(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # sukces zeruje licznik kolejnych błędów
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    fake_clock.advance(29.9)
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 2
+    assert breaker.stats()["opened_count"] == 1
+
+
+def test_breaker_half_open_allows_single_probe(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30.0)
+    breaker.record_failure()
+    fake_clock.advance(30.0)
+    
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # próba już trwa
+    
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=5, recovery_timeout=30.0)
+    for _ in range(5):
+        breaker.record_failure()
+    fake_clock.advance(30.0)
+    assert breaker.allow()
+    
+    # w stanie half-open wystarczy jeden błąd
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    fake_clock.advance(30.0)
+    assert breaker.allow()
+    assert breaker.stats()["opened_count"] == 2
+
+
+def test_breaker_released_probe_can_be_retried(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30.0)
+    breaker.record_failure()
+    fake_clock.advance(30.0)
+    assert breaker.allow()
+    
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, max_tokens=2.0)
+    assert budget.try_withdraw() and budget.try_withdraw()
+    assert not budget.try_withdraw()
+    
+    budget.deposit()
+    assert not budget.try_withdraw()  # 0.5 tokenu to za mało
+    budget.deposit()
+    assert budget.try_withdraw()
+    assert budget.stats() == {"tokens": 0.0, "retries": 3, "exhausted": 2}
+
+
+def test_retry_budget_is_capped():
+    budget = RetryBudget(ratio=1.0, max_tokens=2.0)
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2.0
+
+
+def test_caller_retries_until_success():
+    calls = []
+    caller = make_caller(max_attempts=3)
+    
+    assert asyncio.run(caller.call(flaky(2, calls))) == "ok"
+    assert len(calls) == 3
+    assert caller.breaker.stats()["failures"] == 2
+    assert caller.breaker.stats()["successes"] == 1
+    assert caller.budget.retries == 2
+
+
+def test_caller_gives_up_after_max_attempts():
+    calls = []
+    caller = make_caller(max_attempts=2)
+    
+    with pytest.raises(UpstreamError):
+        asyncio.run(caller.call(flaky(5, calls)))
+    assert len(calls) == 2
+
+
+def test_caller_stops_retrying_when_budget_is_empty():
+    calls = []
+    caller = make_caller(budget=RetryBudget(ratio=0.1, max_tokens=1.0), max_attempts=5)
+    caller.budget.tokens = 0.0
+    
+    with pytest.raises(UpstreamError):
+        asyncio.run(caller.call(flaky(5, calls)))
+    assert len(calls) == 1
+    assert caller.budget.exhausted == 1
+
+
+def test_caller_does_not_retry_other_errors():
+    calls = []
+    
+    async def broken():
+        calls.append(1)
+        raise KeyError("bug")
+    
+    caller = make_caller()
+    with pytest.raises(KeyError):
+        asyncio.run(caller.call(broken))
+    assert len(calls) == 1
+    assert caller.breaker.stats()["failures"] == 0
+
+
+def test_caller_counts_timeouts():
+    async def slow():
+        await asyncio.sleep(1.0)
+    
+    caller = make_caller(max_attempts=2, timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(caller.call(slow))
+    assert caller.timeouts == 2
+
+
+def test_caller_rejects_when_circuit_is_open(fake_clock):
+    calls = []
+    caller = make_caller(breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=30.0), max_attempts=1)
+    
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            asyncio.run(caller.call(flaky(10, calls)))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(caller.call(flaky(10, calls)))
+    assert len(calls) == 2
+    
+    # po czasie odnowienia próba half-open się udaje i obwód się zamyka
+    fake_clock.advance(30.0)
+    assert asyncio.run(caller.call(flaky(0, []))) == "ok"
+    assert caller.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,108 @@
+# tests/test_response_cache.py
+import asyncio
+
+import pytest
+
+from app.core.cache import ExpiryTracker
+from app.core.response_cache import ResponseCache
+
+
+def computing(body: bytes, fresh_for=None, calls=None):
+    async def compute():
+        if calls is not None:
+            calls.append(1)
+        await asyncio.sleep(0)
+        return body, fresh_for
+    return compute
+
+
+def test_cached_entry_is_reused(fake_clock):
+    cache = ResponseCache(maxsize=8, ttl=600.0)
+    calls = []
+    
+    first = asyncio.run(cache.get_or_compute("key", computing(b'{"a":1}', calls=calls)))
+    second = asyncio.run(cache.get_or_compute("key", computing(b'{"a":2}', calls=calls)))
+    assert second is first
+    assert len(calls) == 1
+    assert first.etag == ResponseCache.etag_for(b'{"a":1}') != ResponseCache.etag_for(b'{"a":2}')
+    assert first.expires_at == fake_clock.now + 600.0
+
+
+def test_entry_lives_no_longer_than_its_data(fake_clock):
+    cache = ResponseCache(maxsize=8, ttl=600.0)
+    entry = asyncio.run(cache.get_or_compute("key", computing(b"{}", fresh_for=60.0)))
+    assert entry.expires_at == fake_clock.now + 60.0
+    
+    fake_clock.advance(60.0)
+    calls = []
+    asyncio.run(cache.get_or_compute("key", computing(b"{}", calls=calls)))
+    assert len(calls) == 1
+
+
+def test_expired_data_is_served_but_not_stored():
+    cache = ResponseCache(maxsize=8, ttl=600.0)
+    calls = []
+    for _ in range(2):
+        entry = asyncio.run(cache.get_or_compute("key", computing(b"{}", fresh_for=0.0, calls=calls)))
+        assert entry.body == b"{}"
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_errors_are_not_cached():
+    cache = ResponseCache(maxsize=8, ttl=600.0)
+    
+    async def fail():
+        raise ValueError("boom")
+    
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get_or_compute("key", fail))
+    assert asyncio.run(cache.get_or_compute("key", computing(b"{}"))).body == b"{}"
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache(maxsize=8, ttl=600.0)
+    calls = []
+    
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("key", computing(b"{}", calls=calls)) for _ in range(5)))
+    
+    entries = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(entry is entries[0] for entry in entries)
+
+
+@pytest.mark.parametrize("if_none_match, status", [
+    (None, 200),
+    ('"other"', 200),
+    ("ETAG", 304),
+    ("W/ETAG", 304),
+    ('"other", ETAG', 304),
+    ("*", 304),
+])
+def test_respond_with_validators(fake_clock, if_none_match, status):
+    cache = ResponseCache(maxsize=8, ttl=600.0)
+    entry = asyncio.run(cache.get_or_compute("key", computing(b'{"a":1}', fresh_for=120.0)))
+    fake_clock.advance(20.0)
+    
+    header = if_none_match.replace("ETAG", entry.etag) if if_none_match else None
+    response = cache.respond(entry, header)
+    assert response.status_code == status
+    assert response.headers["etag"] == entry.etag
+    assert response.headers["cache-control"] == "private, max-age=100"
+    assert response.body == (b"" if status == 304 else b'{"a":1}')
+    assert cache.stats()["not_modified"] == (status == 304)
+
+
+def test_expiry_tracker_keeps_earliest(fake_clock):
+    tracker = ExpiryTracker()
+    assert tracker.remaining() is None
+    
+    tracker.note(None)
+    tracker.note(fake_clock.now + 300.0)
+    tracker.note(fake_clock.now + 60.0)
+    tracker.note(fake_clock.now + 120.0)
+    assert tracker.remaining() == 60.0
+    
+    fake_clock.advance(90.0)
+    assert tracker.remaining() == 0.0
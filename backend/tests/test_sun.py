@@ -0,0 +1,333 @@
+# tests/test_sun.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.flight_route import FlightRouteCalculator, RouteArrays
+from app.services.sun import SolarEphemeris, SunCalculationService
+from tests.conftest import AIRPORTS
+
+COORDS = {a[0]: (a[5], a[6]) for a in AIRPORTS}
+
+
+def epoch(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def route_between(departure_code: str, arrival_code: str, steps: int = 20):
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS[departure_code], COORDS[arrival_code]
+    return FlightRouteCalculator().calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, steps)
+
+
+def test_vectorized_positions_match_single_point():
+    sun = SunCalculationService()
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(-89, 89, 200)
+    lons = rng.uniform(-180, 180, 200)
+    epochs = epoch(2026, 1, 1) + rng.uniform(0, 365 * 86400, 200)
+    
+    altitude, azimuth = sun.calculate_sun_positions(lats, lons, epochs)
+    for i in range(0, 200, 17):
+        position = sun.calculate_sun_position(
+            lats[i], lons[i], 0.0, datetime.fromtimestamp(epochs[i], tz=timezone.utc)
+        )
+        assert position.altitude == pytest.approx(altitude[i], abs=1e-6)
+        assert position.azimuth == pytest.approx(azimuth[i], abs=1e-6)
+        assert position.is_visible == (altitude[i] > 0)
+
+
+def test_sun_table_matches_single_point_positions():
+    sun = SunCalculationService()
+    points = route_between("WAW", "JFK").to_route_points()
+    departure = datetime(2026, 6, 1, 18, 0, tzinfo=timezone.utc)
+    
+    table = sun.build_sun_table(points, departure)
+    assert len(table) == len(points)
+    for idx, point in enumerate(points):
+        expected = sun.calculate_sun_position(
+            point.latitude, point.longitude, 0.0, departure + timedelta(hours=point.time_from_departure)
+        )
+        position = table.position(idx)
+        assert position.altitude == pytest.approx(expected.altitude, abs=1e-6)
+        assert position.azimuth == pytest.approx(expected.azimuth, abs=1e-6)
+        assert position.is_visible == expected.is_visible
+        assert abs((position.datetime - expected.datetime).total_seconds()) < 1e-3
+
+
+@pytest.mark.parametrize("pair, departure", [
+    (("WAW", "JFK"), datetime(2026, 6, 21, 18, 40)),
+    (("LHR", "SIN"), datetime(2026, 1, 10, 5, 30)),
+])
+def test_shared_sun_table_gives_same_results(pair, departure):
+    sun = SunCalculationService()
+    points = route_between(*pair).to_route_points()
+    table = sun.build_sun_table(points, departure)
+    
+    for preference in ("sunrise", "sunset"):
+        assert sun.find_sun_events(points, departure, preference, sun_table=table) == \
+            sun.find_sun_events(points, departure, preference)
+    assert sun.get_sun_events_for_flight(points, departure, sun_table=table) == \
+        sun.get_sun_events_for_flight(points, departure)
+
+
+def test_weather_scores_move_best_point():
+    sun = SunCalculationService()
+    points = route_between("WAW", "JFK").to_route_points()
+    departure = datetime(2026, 6, 21, 18, 40)
+    table = sun.build_sun_table(points, departure)
+    best, _ = sun.find_sun_events(points, departure, "sunset", sun_table=table)
+    
+    clear = np.full(len(points), 100.0)
+    assert sun.find_sun_events(points, departure, "sunset", sun_table=table, weather_scores=clear)[0] == best
+    clouded = clear.copy()
+    clouded[best] = 0.0
+    moved, position = sun.find_sun_events(points, departure, "sunset", sun_table=table, weather_scores=clouded)
+    assert moved != best
+    assert position == table.position(moved)
+
+
+def test_sun_grid_matches_row_by_row():
+    sun = SunCalculationService()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS["WAW"], COORDS["LHR"]
+    route = FlightRouteCalculator().calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, 20)
+    departures = epoch(2026, 6, 1) + np.arange(0, 86400, 3600 * 5, dtype=float)
+    
+    altitude, azimuth, epochs = sun.sun_grid(route, departures)
+    assert altitude.shape == azimuth.shape == epochs.shape == (len(departures), len(route))
+    for row, departure in enumerate(departures):
+        table = sun.build_sun_table([], datetime.fromtimestamp(departure, tz=timezone.utc), route)
+        np.testing.assert_allclose(altitude[row], table.altitude, atol=1e-9)
+        np.testing.assert_allclose(azimuth[row], table.azimuth, atol=1e-9)
+
+
+def test_ephemeris_lookup_matches_exact_computation():
+    ephemeris = SolarEphemeris(max_days=8)
+    epochs = epoch(2026, 3, 1) + np.random.default_rng(3).uniform(0, 5 * 86400, 1000)
+    
+    dec, eq_time = ephemeris.lookup(epochs)
+    exact_dec, exact_eq_time = SolarEphemeris.compute(epochs)
+    np.testing.assert_allclose(dec, exact_dec, atol=1e-8)
+    np.testing.assert_allclose(eq_time, exact_eq_time, atol=1e-5)
+    assert ephemeris.stats()["entries"] == 5
+
+
+def test_positions_from_ephemeris_match_direct_computation(monkeypatch):
+    sun = SunCalculationService()
+    rng = np.random.default_rng(11)
+    lats = rng.uniform(-89, 89, 500)
+    lons = rng.uniform(-180, 180, 500)
+    epochs = epoch(2026, 1, 1) + rng.uniform(0, 3 * 86400, 500)
+    
+    altitude, azimuth = sun.calculate_sun_positions(lats, lons, epochs)
+    monkeypatch.setattr(sun, "_ephemeris", SimpleNamespace(lookup=SolarEphemeris.compute))
+    exact_altitude, exact_azimuth = sun.calculate_sun_positions(lats, lons, epochs)
+    np.testing.assert_allclose(altitude, exact_altitude, atol=1e-4)
+    # azymut nieokreślony przy słońcu w zenicie - porównanie z dala od niego
+    steady = exact_altitude < 89
+    np.testing.assert_allclose(azimuth[steady], exact_azimuth[steady], atol=1e-3)
+
+
+def test_ephemeris_keeps_limited_number_of_days():
+    ephemeris = SolarEphemeris(max_days=2)
+    for day in range(4):
+        ephemeris.lookup(np.array([epoch(2026, 3, 1 + day, 12)]))
+    ephemeris.lookup(np.array([epoch(2026, 3, 4, 18)]))
+    stats = ephemeris.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 4
+
+
+@pytest.mark.parametrize("day, expected_minutes", [
+    ((2026, 2, 11), -14.2),
+    ((2026, 4, 15), 0.0),
+    ((2026, 7, 26), -6.5),
+    ((2026, 11, 3), 16.4),
+])
+def test_equation_of_time(day, expected_minutes):
+    _, eq_time = SolarEphemeris.compute(np.array([epoch(*day, 12)]))
+    assert eq_time[0] == pytest.approx(expected_minutes, abs=0.3)
+
+
+def test_declination_at_solstices():
+    dec, _ = SolarEphemeris.compute(np.array([epoch(2026, 6, 21, 9), epoch(2026, 12, 21, 20)]))
+    assert np.degrees(dec) == pytest.approx([23.44, -23.44], abs=0.01)
+
+
+def test_sun_due_south_at_solar_noon_over_greenwich():
+    sun = SunCalculationService()
+    _, eq_time = SolarEphemeris.compute(np.array([epoch(2026, 6, 21, 12)]))
+    noon = datetime(2026, 6, 21, 12, tzinfo=timezone.utc) - timedelta(minutes=float(eq_time[0]))
+    
+    position = sun.calculate_sun_position(51.48, 0.0, 0.0, noon)
+    assert position.azimuth == pytest.approx(180.0, abs=0.05)
+    assert position.altitude == pytest.approx(90 - 51.48 + 23.44, abs=0.05)
+
+
+def test_london_midsummer_sunrise_in_the_north_east():
+    sun = SunCalculationService()
+    times = [datetime(2026, 6, 21, 3, 40, tzinfo=timezone.utc) + timedelta(minutes=m) for m in range(30)]
+    altitude, azimuth = sun.calculate_sun_positions(
+        np.full(30, 51.47), np.full(30, -0.45), np.array([t.timestamp() for t in times])
+    )
+    rise = int(np.argmax(altitude > 0))
+    # geometryczny wschód (środek tarczy, bez refrakcji) ok. 03:55 UTC
+    assert 0 < rise and times[rise] - times[0] == pytest.approx(timedelta(minutes=15), abs=timedelta(minutes=4))
+    assert 40 < azimuth[rise] < 60
+
+
+def brute_force_crossings(sun: SunCalculationService, route, departure_time: datetime, samples: int = 20001):
+    """Wschody i zachody z gęstego próbkowania ciągłej trasy: [(czas, typ)]"""
+    offsets = np.linspace(0.0, route.duration_hours, samples)
+    lat, lon, _ = route.position_at(offsets)
+    altitude, _ = sun.calculate_sun_positions(lat, lon, sun._to_epoch(departure_time) + offsets * 3600.0)
+    visible = altitude > 0
+    return [
+        (departure_time + timedelta(hours=(offsets[i] + offsets[i + 1]) / 2), "sunrise" if visible[i + 1] else "sunset")
+        for i in np.flatnonzero(visible[:-1] != visible[1:])
+    ]
+
+
+@pytest.mark.parametrize("f, a, b, root", [
+    (lambda x: x ** 3 - 2 * x - 5, 2.0, 3.0, 2.0945514815423265),
+    (lambda x: np.cos(x) - x, 0.0, 1.0, 0.7390851332151607),
+    (lambda x: x - 0.25, 0.0, 1.0, 0.25),
+    (lambda x: np.exp(x) - 10, 0.0, 4.0, np.log(10)),
+])
+def test_brent_root(f, a, b, root):
+    calls = []
+    
+    def counted(x):
+        calls.append(x)
+        return f(x)
+    
+    found = SunCalculationService._brent_root(counted, a, b, f(a), f(b), 1e-10)
+    assert found == pytest.approx(root, abs=1e-9)
+    assert len(calls) < 20
+
+
+def test_brent_root_returns_endpoint_root():
+    assert SunCalculationService._brent_root(lambda x: x, 0.0, 1.0, 0.0, 1.0, 1e-9) == 0.0
+    assert SunCalculationService._brent_root(lambda x: x - 1, 0.0, 1.0, -1.0, 0.0, 1e-9) == 1.0
+
+
+@pytest.mark.parametrize("pair, departure", [
+    (("LHR", "JFK"), datetime(2026, 3, 20, 5, 30)),
+    (("WAW", "LHR"), datetime(2026, 10, 18, 15, 0)),
+    (("SIN", "JFK"), datetime(2026, 6, 1, 9, 0)),
+])
+def test_sun_crossings_refine_sampled_sign_changes(pair, departure):
+    sun = SunCalculationService()
+    (dep_lat, dep_lon), (arr_lat, arr_lon) = COORDS[pair[0]], COORDS[pair[1]]
+    route = FlightRouteCalculator().calculate_route_arrays(dep_lat, dep_lon, arr_lat, arr_lon, 20)
+    
+    events = sun.find_sun_crossings(route, departure, tolerance_seconds=1.0)
+    expected = brute_force_crossings(sun, route, departure)
+    assert events
+    # zmiany znaku widoczne na punktach trasy (tu - wszystkie przecięcia)
+    assert [e.event_type for e in events] == [kind for _, kind in expected]
+    for event, (when, _) in zip(events, expected):
+        assert abs((event.event_time - when).total_seconds()) < 2 * route.duration_hours * 3600 / 20000 + 1
+        lat, lon, _ = route.position_at((event.event_time - departure).total_seconds() / 3600)
+        altitude, _ = sun.calculate_sun_positions(lat, lon, sun._to_epoch(event.event_time))
+        assert abs(float(altitude)) < 0.01
+
+@pytest.mark.parametrize("pair", [("SIN", "JFK"), ("JFK", "SIN"), ("LHR", "JFK"), ("JFK", "LHR")])
+@pytest.mark.parametrize("day", [(2026, 3, 20), (2026, 6, 21), (2026, 12, 21)])
+def test_terminator_matches_sun_crossings_within_one_second(pair, day):
+    sun = SunCalculationService()
+    route = route_between(*pair)
+    found = 0
+    for hour in range(0, 24, 3):
+        departure = datetime(*day, hour)
+        sampled = sun.find_sun_crossings(route, departure)
+        events = sun.find_terminator_crossings(route, departure)
+        assert [e.event_type for e in events] == [e.event_type for e in sampled]
+        for event, expected in zip(events, sampled):
+            assert abs((event.event_time - expected.event_time).total_seconds()) < 1.0
+            assert event.event_location["latitude"] == pytest.approx(expected.event_location["latitude"], abs=0.01)
+            assert event.event_location["longitude"] == pytest.approx(expected.event_location["longitude"], abs=0.01)
+        found += len(events)
+    assert found > 0
+
+
+@pytest.mark.parametrize("pair, departure, expected", [
+    (("SIN", "JFK"), datetime(2026, 9, 22, 1, 40), ["sunset", "sunrise"]),
+    (("LYR", "SIN"), datetime(2026, 4, 25, 20, 40), ["sunset", "sunrise"]),
+    (("WAW", "JFK"), datetime(2026, 6, 21, 18, 40), ["sunset", "sunrise", "sunset"]),
+])
+def test_terminator_finds_crossings_between_route_points(pair, departure, expected):
+    sun = SunCalculationService()
+    route = route_between(*pair)
+    events = sun.find_terminator_crossings(route, departure)
+    brute = brute_force_crossings(sun, route, departure, samples=100001)
+    
+    # para przecięć między punktami trasy - niewidoczna dla próbkowania
+    assert len(sun.find_sun_crossings(route, departure)) < len(expected)
+    assert [e.event_type for e in events] == [kind for _, kind in brute] == expected
+    for event, (when, _) in zip(events, brute):
+        assert abs((event.event_time - when).total_seconds()) < 1.0
+
+
+def test_terminator_reports_jump_at_phase_boundary():
+    # WAW-KRK: wznoszenie i opadanie dłuższe niż lot - pozycja skacze na końcu wznoszenia
+    sun = SunCalculationService()
+    route = route_between("WAW", "KRK")
+    departure = datetime(2026, 6, 21, 2, 0)
+    knots, _, _ = route.phase_segments()
+    
+    events = sun.find_terminator_crossings(route, departure)
+    assert [e.event_type for e in events] == ["sunrise"]
+    assert events[0].event_time == departure + timedelta(hours=float(knots[1]))
+    sampled = sun.find_sun_crossings(route, departure)
+    assert abs((events[0].event_time - sampled[0].event_time).total_seconds()) < 1.0
+
+
+def test_terminator_matches_brute_force_on_all_pairs():
+    sun = SunCalculationService()
+    rng = np.random.default_rng(24)
+    codes = list(COORDS)
+    for departure_code in codes:
+        for arrival_code in codes:
+            if departure_code == arrival_code:
+                continue
+            route = route_between(departure_code, arrival_code)
+            for _ in range(4):
+                departure = datetime(2026, 1, 1) + timedelta(minutes=int(rng.integers(0, 365 * 1440)))
+                events = sun.find_terminator_crossings(route, departure)
+                brute = brute_force_crossings(sun, route, departure)
+                assert [e.event_type for e in events] == [kind for _, kind in brute], (departure_code, arrival_code, departure)
+                for event, (when, _) in zip(events, brute):
+                    assert abs((event.event_time - when).total_seconds()) < 5.0
+
+
+def test_flight_without_crossing_has_no_events():
+    sun = SunCalculationService()
+    route = route_between("WAW", "KRK")
+    points = route.to_route_points()
+    departure = datetime(2026, 6, 21, 10, 0)
+    
+    assert sun.find_terminator_crossings(route, departure) == []
+    assert sun.get_sun_events_for_flight(points, departure, route=route, default_events=False) == []
+    night = datetime(2026, 12, 21, 19, 30)
+    assert sun.get_sun_events_for_flight(points, night, route=route, default_events=False) == []
+    
+    # domyślnie - jak dotychczas - zachód o 20:00, gdy wypada w czasie lotu
+    events = sun.get_sun_events_for_flight(points, night, route=route)
+    assert [(e.event_type, e.event_time) for e in events] == [("sunset", datetime(2026, 12, 21, 20, 0))]
+    assert sun.get_sun_events_for_flight(points, departure, route=route) == []
+
+
+def test_route_without_geometry_falls_back_to_sampling():
+    sun = SunCalculationService()
+    source = route_between("LHR", "JFK")
+    route = RouteArrays(
+        source.latitude, source.longitude, source.altitude, source.time_offset, source.bearing,
+        source.distance_km, source.duration_hours
+    )
+    departure = datetime(2026, 3, 20, 5, 30)
+    
+    assert route.phase_segments() is None
+    events = sun.find_terminator_crossings(route, departure)
+    assert events and events == sun.find_sun_crossings(route, departure)
\ No newline at end of file
@@ -0,0 +1,102 @@
+# tests/test_weather.py
+import asyncio
+from datetime import datetime
+
+from app.services.weather import WeatherService
+from app.services.weather_providers import SyntheticWeatherProvider
+
+WHEN = datetime(2026, 6, 1, 18, 0)
+
+
+class CountingProvider(SyntheticWeatherProvider):
+    """Dostawca syntetyczny zapisujący wywołania (horizon - czy data mieści się w prognozie)"""
+    
+    def __init__(self, horizon: bool = True, astro: bool = True):
+        super().__init__(seed=0)
+        self.horizon = horizon
+        self.astro = astro
+        self.calls = []
+    
+    def covers(self, time_utc):
+        return self.horizon
+    
+    async def fetch_forecast(self, lat, lon, date_str):
+        self.calls.append("forecast")
+        data = await super().fetch_forecast(lat, lon, date_str)
+        if not self.astro:
+            for day in data["forecast"]["forecastday"]:
+                del day["astro"]
+        return data
+    
+    async def fetch_astronomy(self, lat, lon, date_str):
+        self.calls.append("astronomy")
+        return await super().fetch_astronomy(lat, lon, date_str)
+
+
+def test_http_client_is_shared_and_closed_on_shutdown():
+    async def main():
+        await WeatherService.shutdown()
+        await WeatherService.startup()
+        client = WeatherService.get_client()
+        assert WeatherService.get_client() is client
+        await WeatherService.shutdown()
+        return client
+    
+    client = asyncio.run(main())
+    assert client.is_closed
+    assert WeatherService._client is None
+    
+    # poza lifespan klient jest tworzony leniwie i również współdzielony
+    lazy = WeatherService.get_client()
+    try:
+        assert WeatherService.get_client() is lazy and not lazy.is_closed
+    finally:
+        asyncio.run(WeatherService.shutdown())
+
+
+def test_forecast_astro_replaces_astronomy_call():
+    provider = CountingProvider()
+    WeatherService.set_provider(provider)
+    result = asyncio.run(WeatherService.evaluate_conditions_for_sun_viewing(52.2, 21.0, WHEN))
+    assert provider.calls == ["forecast"]
+    
+    # te same czasy co z osobnego zapytania astronomicznego
+    expected = asyncio.run(WeatherService.get_sun_events(52.2, 21.0, WHEN))
+    assert provider.calls == ["forecast", "astronomy"]
+    assert result["sun_times"] == {key: value.isoformat() for key, value in expected.items()}
+
+
+def test_astronomy_call_beyond_forecast_horizon():
+    provider = CountingProvider(horizon=False)
+    WeatherService.set_provider(provider)
+    result = asyncio.run(WeatherService.evaluate_conditions_for_sun_viewing(52.2, 21.0, WHEN))
+    assert sorted(provider.calls) == ["astronomy", "forecast"]
+    assert result["sun_times"]["sunrise"] and result["sun_times"]["sunset"]
+
+
+def test_astronomy_call_when_forecast_has_no_astro():
+    provider = CountingProvider(astro=False)
+    WeatherService.set_provider(provider)
+    result = asyncio.run(WeatherService.evaluate_conditions_for_sun_viewing(52.2, 21.0, WHEN))
+    assert provider.calls == ["forecast", "astronomy"]
+    assert result["sun_times"]["sunset"].startswith("2026-06-01T")
+
+
+def test_weather_profile_evaluates_each_cell_and_hour_once(monkeypatch):
+    evaluated = []
+    
+    async def counting(lat, lon, time_utc):
+        evaluated.append((lat, lon, time_utc))
+        return {"viewing_score": 50}
+    
+    monkeypatch.setattr(WeatherService, "evaluate_conditions_for_sun_viewing", counting)
+    points = [
+        (52.21, 21.01, WHEN),
+        (52.22, 21.02, WHEN.replace(minute=40)),
+        (52.21, 21.01, WHEN.replace(hour=19)),
+        (40.6, -73.8, WHEN),
+    ]
+    profile = asyncio.run(WeatherService.get_weather_profile(points))
+    
+    assert len(profile) == len(points) and len(evaluated) == 3
+    assert profile[0] is profile[1]
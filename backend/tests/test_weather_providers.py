@@ -0,0 +1,110 @@
+# tests/test_weather_providers.py
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.weather import WeatherService
+from app.services.weather_providers import (
+    SyntheticWeatherProvider, WeatherAPIProvider, WeatherProvider, create_weather_provider
+)
+
+
+def provider_returning(status_code: int, requests=None) -> WeatherAPIProvider:
+    """Dostawca WeatherAPI z klientem, który na każde zapytanie odpowiada status_code"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        return httpx.Response(status_code, json={"forecast": {"forecastday": []}})
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return WeatherAPIProvider("test-key", lambda: client)
+
+
+def test_weatherapi_returns_json_for_200():
+    requests = []
+    provider = provider_returning(200, requests)
+    
+    data = asyncio.run(provider.fetch_forecast(52.25, 21.0, "2026-10-18"))
+    assert data == {"forecast": {"forecastday": []}}
+    assert requests[0].url.params["key"] == "test-key"
+    assert requests[0].url.params["dt"] == "2026-10-18"
+
+
+@pytest.mark.parametrize("status_code", [201, 204, 301, 400, 401, 403, 404])
+def test_weatherapi_non_200_gives_no_data(status_code):
+    provider = provider_returning(status_code)
+    assert asyncio.run(provider.fetch_forecast(52.25, 21.0, "2026-10-18")) is None
+    assert asyncio.run(provider.fetch_astronomy(52.25, 21.0, "2026-10-18")) is None
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 502, 503])
+def test_weatherapi_rate_limit_and_server_errors_raise(status_code):
+    provider = provider_returning(status_code)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(provider.fetch_forecast(52.25, 21.0, "2026-10-18"))
+
+
+def test_weatherapi_without_key_makes_no_calls():
+    requests = []
+    provider = provider_returning(200, requests)
+    provider.api_key = ""
+    
+    assert not provider.covers(datetime.utcnow())
+    assert asyncio.run(provider.fetch_forecast(52.25, 21.0, "2026-10-18")) is None
+    assert requests == []
+
+
+def test_missing_key_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHERAPI_KEY", "")
+    monkeypatch.setattr(settings, "WEATHER_PROVIDER", "weatherapi")
+    with pytest.raises(ValueError):
+        create_weather_provider(lambda: None)
+    
+    monkeypatch.setattr(settings, "WEATHER_PROVIDER", "replay")
+    monkeypatch.setattr(settings, "WEATHER_REPLAY_RECORD", True)
+    with pytest.raises(ValueError):
+        create_weather_provider(lambda: None)
+    
+    # dane syntetyczne tylko po jawnym wyborze
+    monkeypatch.setattr(settings, "WEATHER_PROVIDER", "synthetic")
+    assert isinstance(create_weather_provider(lambda: None), SyntheticWeatherProvider)
+    
+    monkeypatch.setattr(settings, "WEATHER_PROVIDER", "weatherapi")
+    monkeypatch.setattr(settings, "WEATHERAPI_KEY", "test-key")
+    assert isinstance(create_weather_provider(lambda: None), WeatherAPIProvider)
+
+
+def test_missing_key_fails_startup(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_PROVIDER", "weatherapi")
+    monkeypatch.setattr(settings, "WEATHERAPI_KEY", "")
+    WeatherService.set_provider(None)
+    
+    with pytest.raises(ValueError):
+        asyncio.run(WeatherService.startup())
+
+
+def test_incomplete_provider_cannot_be_created():
+    class ForecastOnly(WeatherProvider):
+        async def fetch_forecast(self, lat, lon, date_str):
+            return None
+    
+    with pytest.raises(TypeError):
+        ForecastOnly()
+
+
+def test_unknown_provider_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_PROVIDER", "nope")
+    with pytest.raises(ValueError):
+        create_weather_provider(lambda: None)
+
+
+def test_synthetic_provider_is_deterministic():
+    first = asyncio.run(SyntheticWeatherProvider(seed=1).fetch_forecast(52.25, 21.0, "2026-10-18"))
+    second = asyncio.run(SyntheticWeatherProvider(seed=1).fetch_forecast(52.25, 21.0, "2026-10-18"))
+    other = asyncio.run(SyntheticWeatherProvider(seed=2).fetch_forecast(52.25, 21.0, "2026-10-18"))
+    
+    assert first == second
+    assert first != other
\ No newline at end of file